@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Add many code variants to codeVariants.ts in one write.
+
+This script reads a manifest of component/variant/language entries,
+applies all of them in memory against the parsed codeVariants.ts, and
+writes the file once, atomically (temp file + rename).
+
+Usage:
+    python3 scripts/add-code-variants-batch.py <manifest.json|yaml> [--dry-run] [--daemon]
+
+Example manifest:
+    {
+      "variants": [
+        {
+          "component": "mediacard",
+          "variant": "landscape",
+          "react": "import { MediaCard } from '@shopify/polaris'; ...",
+          "vanilla": {"file": "snippets/landscape.html"},
+          "extjs": "...",
+          "typescript": "..."
+        }
+      ]
+    }
+
+See scripts/code_variants/batch.py for the full manifest format. Adding a
+component's ten variants costs one read and one write, not ten. With
+--daemon the manifest is applied by a running code-variants-daemon.py,
+whose catalog is already parsed.
+"""
+
+import argparse
+import sys
+
+from code_variants.batch import ManifestError, batch_from_manifest, load_manifest
+from code_variants.catalog import CatalogError, load_catalog
+from code_variants.paths import VARIANTS_FILE
+
+ACTION_ICONS = {'created': '🆕', 'added': '✅', 'replaced': '♻️ ', 'skipped': '⏭️ '}
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Apply a manifest of code variants in one write.')
+    parser.add_argument('manifest', help='JSON or YAML manifest file')
+    parser.add_argument('--file', default=str(VARIANTS_FILE), help='codeVariants.ts to edit')
+    parser.add_argument('--dry-run', action='store_true', help='report changes without writing')
+    parser.add_argument('--daemon', action='store_true',
+                        help="apply through a running code-variants-daemon.py (edits the daemon's file)")
+    args = parser.parse_args()
+
+    try:
+        manifest = load_manifest(args.manifest)
+        changes = None
+        if args.daemon:
+            from code_variants.daemon import DaemonError, DaemonUnavailable, request
+            try:
+                changes = request('batch', manifest=manifest, dry_run=args.dry_run)
+            except DaemonUnavailable as e:
+                print(f"⚠️  {e}; applying locally")
+            except DaemonError as e:
+                raise ManifestError(str(e))
+        if changes is None:
+            catalog = load_catalog(args.file)
+            batch = batch_from_manifest(catalog, manifest)
+            changes = batch.commit(dry_run=args.dry_run)
+    except FileNotFoundError as e:
+        print(f"\n❌ Error: File not found: {e.filename}")
+        return 1
+    except (ManifestError, CatalogError, ValueError) as e:
+        print(f"\n❌ Error: {e}")
+        return 1
+
+    print(f"\n📝 {'Planned' if args.dry_run else 'Applied'} manifest: {args.manifest}\n")
+    for change in changes:
+        label = change['component'] if change['variant'] is None else f"{change['component']}/{change['variant']}"
+        print(f"{ACTION_ICONS[change['action']]} {change['action']:<9} {label:<50} {change['bytes']:+,} bytes")
+
+    counts = {}
+    for change in changes:
+        counts[change['action']] = counts.get(change['action'], 0) + 1
+    summary = ', '.join(f"{count} {action}" for action, count in counts.items()) or 'nothing to do'
+    print(f"\n{'🔍 Dry run' if args.dry_run else '✅ Done'}: {summary}")
+    if not args.dry_run and len(changes) > counts.get('skipped', 0):
+        print(f"📁 File: {args.file} (written once)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -3,12 +3,19 @@
 Bulk add code variants to Storybook stories.
 
 This script adds `parameters: { codeVariants: getCodeVariants(...) }`
-to multiple stories in a single .stories.tsx file.
+to multiple stories in one or many .stories.tsx files.
 
 Usage:
     python3 scripts/add-code-variants-bulk.py \
         <file_path> <component_key> <story_names...>
 
+    python3 scripts/add-code-variants-bulk.py --manifest <manifest.json> [--jobs N] [--dry-run]
+    python3 scripts/add-code-variants-bulk.py --discover [DIR] [--jobs N] [--dry-run]
+
+Any mode takes --profile [TRACE] to time reading, scanning, locating,
+rebuilding and writing per file (files are then processed in this
+process) and write a Chrome trace.
+
 Example:
     python3 scripts/add-code-variants-bulk.py \
         storybook/stories/components/forms/TextField.stories.tsx \
@@ -19,17 +26,204 @@ This will add code variant parameters to the Default, WithValue,
 WithError, and Required stories in TextField.stories.tsx, using
 the 'textfield' component key.
 
+Each story gets the example matching its name when codeVariants.ts has
+one (WithError -> getCodeVariants('textfield', 'withError')), and
+'default' otherwise.
+
+Manifest mode processes many files in a worker pool:
+    {
+      "files": [
+        {"file": "storybook/stories/components/forms/TextField.stories.tsx",
+         "component": "textfield",
+         "stories": ["Default", "WithError"]}
+      ]
+    }
+"stories" is optional (default: every story without code variants) and
+so is "component" (default: inferred, as in --discover). Paths are
+relative to the repository root.
+
+Discover mode finds every story file under DIR (default:
+storybook/stories/components) whose stories lack code variants, infers
+the component key from the file name or the file's existing
+getCodeVariants() calls, and fills them in.
+
 The script:
 - Safely checks if code variants already exist (skips if present)
-- Handles complex story structures (render functions, etc.)
-- Automatically fixes double commas
-- Reports success for each story processed
+- Finds each story object's exact braces with a linear-time lexer, so
+  render functions, JSX and nested objects cannot misplace the edit
+- Adds to an existing `parameters` object instead of duplicating it
+- Adds the `getCodeVariants` import after the file's last import when
+  the file does not import it yet
+- Writes each file once, atomically (temp file + rename)
+- Reports success for each story processed, or one aggregated summary
 """
 
+import argparse
+import json
+import os
 import re
 import sys
 
-def add_code_variants(file_path, component_key, story_names):
+from code_variants import lexer, tracing
+from code_variants.fileio import atomic_write
+from code_variants.paths import BLOCKS_DIR, REPO_ROOT, STORIES_DIR
+from code_variants.stories import normalize, scan_stories, story_object
+from code_variants.xref import matching_example, variant_index
+
+DEFAULT_DISCOVER_DIR = STORIES_DIR / 'components'
+# `parameters:` at the end of a run of code, right before its '{'
+_PARAMETERS_KEY = re.compile(rb'(?:^|[\s,])parameters\s*:\s*$')
+# An import statement starting in a run of top-level code
+_IMPORT = re.compile(rb'(?m)^import\s')
+# An import of getCodeVariants, default or named
+_IMPORTS_GET_CODE_VARIANTS = re.compile(rb'(?m)^import\s[^;]*?\bgetCodeVariants\b[^;]*?\bfrom\s')
+
+
+def resolve_example(index, component_key, story_name):
+    """
+    Return the example key for a story: its own variant if defined, else 'default'.
+
+    The story's variant is looked up by normalized name (xref.matching_example),
+    so `WithHelpText` finds `withHelpText`, `with-help-text` or `withhelptext`.
+
+    Args:
+        index: {component key: set of example names} (xref.variant_index),
+            or None to always use 'default'
+    """
+    if index is None:
+        return 'default'
+    return matching_example(index, component_key, story_name) or 'default'
+
+
+def code_variants_module(file_path):
+    """Module specifier of codeVariants.ts as imported from `file_path`."""
+    specifier = os.path.relpath(BLOCKS_DIR / 'codeVariants', os.path.dirname(os.path.abspath(file_path)))
+    specifier = specifier.replace(os.sep, '/')
+    return specifier if specifier.startswith('.') else './' + specifier
+
+
+def _import_edit(data, module):
+    """
+    Return the (offset, text) insertion of the getCodeVariants import, or
+    None when the file already imports it.
+
+    The import goes after the last top-level import statement (which ends
+    at its module specifier string), or at the top of a file with none.
+    """
+    if _IMPORTS_GET_CODE_VARIANTS.search(data):
+        return None
+    statement = f"import {{ getCodeVariants }} from '{module}';"
+    in_import = False
+    last_end = None
+    for token in lexer.tokenize(data, jsx=True):
+        if token.depth != 0:
+            continue
+        if token.kind == lexer.CODE and _IMPORT.search(data, token.start, token.end):
+            in_import = True
+        elif token.kind == lexer.STRING and in_import:
+            in_import = False
+            last_end = token.end + (data[token.end:token.end + 1] == b';')
+    if last_end is None:
+        return 0, statement + '\n\n'
+    return last_end, '\n' + statement
+
+
+def insert_code_variants(content, component_key, stories, log=print, module=None):
+    """
+    Add codeVariants parameters to the given stories in a file's text.
+
+    Story objects are located with the shared lexer, so each edit lands
+    inside the exact braces of its own story no matter how the object is
+    formatted, and the file is scanned once however many stories change.
+    A story that already has a `parameters` object gets `codeVariants`
+    added to it rather than a second `parameters` key.
+
+    Args:
+        content: Source of the .stories.tsx file
+        component_key: Component key for getCodeVariants (e.g., 'button')
+        stories: List of (story_name, example_key) pairs
+        module: Specifier to import getCodeVariants from when a story is
+            added and the file does not import it (None: never import)
+
+    Returns:
+        (new_content, results) where results maps each story name to
+        'added', 'skipped' or 'missing'
+    """
+    data = content.encode()
+    with tracing.phase('scan', nbytes=len(data)):
+        records = {story.name: story for story in scan_stories(data)[1]}
+    results = {}
+    edits = []
+    for story, example in stories:
+        with tracing.phase('locate') as timing:
+            timing['bytes'] = _locate(data, records, story, example, component_key, results, edits, log)
+    if edits and module is not None:
+        edit = _import_edit(data, module)
+        if edit is not None:
+            edits.append(edit)
+            log(f"📥 Imported getCodeVariants from '{module}'")
+
+    with tracing.phase('rebuild', nbytes=len(data)):
+        pieces = []
+        previous = 0
+        for offset, text in sorted(edits):
+            pieces += [data[previous:offset], text.encode()]
+            previous = offset
+        pieces.append(data[previous:])
+        return b''.join(pieces).decode(), results
+
+
+def _locate(data, records, story, example, component_key, results, edits, log):
+    """Queue the edit for one story; return the size of its object in bytes."""
+    call = f"getCodeVariants('{component_key}', '{example}')"
+    span = story_object(data, records[story]) if story in records else None
+    if span is None:
+        results[story] = 'missing'
+        log(f"⚠️  Story '{story}' not found or has unexpected format")
+        return 0
+    if data.find(b'codeVariants', *span) != -1:
+        results[story] = 'skipped'
+        log(f"⏭️  Skipped {story} (already has codeVariants)")
+    else:
+        edits.append(_story_edit(data, span, call))
+        results[story] = 'added'
+        log(f"✅ Added to {story} ('{example}')")
+    return span[1] - span[0]
+
+
+def _story_edit(data, span, call):
+    """
+    Return the (offset, text) insertion that adds `call` to a story object.
+
+    Goes into the story's top-level `parameters: {` when there is one,
+    otherwise adds a `parameters` property after the last one.
+    """
+    open_pos, close_pos = span
+    last_end = open_pos + 1     # end of the last property's source
+    params_open = None
+    for token in lexer.tokenize(data, open_pos + 1, close_pos, jsx=True):
+        if token.kind == lexer.COMMENT:
+            continue
+        text = data[token.start:token.end]
+        if token.kind == lexer.CODE:
+            if not text.strip():
+                continue
+            if token.depth == 0 and _PARAMETERS_KEY.search(text):
+                params_open = token.end
+            last_end = token.start + len(text.rstrip())
+            continue
+        if token.kind == lexer.OPEN and token.depth == 0 and params_open == token.start:
+            return token.end, f"\n    codeVariants: {call},"
+        params_open = None
+        last_end = token.end
+
+    block = f"\n  parameters: {{\n    codeVariants: {call},\n  }},"
+    if last_end == open_pos + 1:
+        return last_end, block + '\n'      # empty story object
+    return last_end, ('' if data[last_end - 1] == ord(',') else ',') + block
+
+
+def add_code_variants(file_path, component_key, story_names, index=None):
     """
     Add codeVariants parameters to specified stories in a file.
 
@@ -37,47 +231,199 @@ def add_code_variants(file_path, component_key, story_names):
         file_path: Path to the .stories.tsx file
         component_key: Component key for getCodeVariants (e.g., 'button')
         story_names: List of story names to add code variants to
+        index: Variant index used to pick each story's example key
 
     Returns:
         Number of stories successfully updated
     """
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    params_block = f'''  parameters: {{
-    codeVariants: getCodeVariants('{component_key}', 'default'),
-  }},
-'''
-
-    count = 0
-    for story in story_names:
-        # Simple replacement: find story closing and add parameters before it
-        pattern = f'(export const {story}: Story = {{[\\s\\S]*?)(\\n}};)'
-
-        # Check if already has codeVariants
-        match = re.search(pattern, content)
-        if match and 'codeVariants' not in match.group(1):
-            content = re.sub(pattern, r'\1,' + '\n' + params_block + r'\2', content, count=1)
-            count += 1
-            print(f"✅ Added to {story}")
-        elif match and 'codeVariants' in match.group(1):
-            print(f"⏭️  Skipped {story} (already has codeVariants)")
-        else:
-            print(f"⚠️  Story '{story}' not found or has unexpected format")
+    with tracing.phase('file', file_path) as timing:
+        with tracing.phase('read', file_path):
+            with open(file_path, 'r') as f:
+                content = f.read()
+        timing['bytes'] = len(content)
 
-    # Fix double commas
-    content = re.sub(r'  },,\n', '  },\n', content)
+        stories = [(story, resolve_example(index, component_key, story)) for story in story_names]
+        content, results = insert_code_variants(content, component_key, stories,
+                                                module=code_variants_module(file_path))
+        count = sum(1 for result in results.values() if result == 'added')
 
-    with open(file_path, 'w') as f:
-        f.write(content)
+        if count:
+            with tracing.phase('write', file_path, len(content)):
+                atomic_write(file_path, content.encode())
 
     print(f"\n✅ Total: Added codeVariants to {count} stories")
     return count
 
+
+def infer_component_key(file_path, data, index):
+    """
+    Guess the component key of a story file.
+
+    Tries the file name (`TextField.stories.tsx` -> 'textfield'), then the
+    key of the file's first literal getCodeVariants() call.
+    """
+    name = os.path.basename(file_path).split('.')[0].lower()
+    if name in index:
+        return name
+    meta, _, calls = scan_stories(data, calls=True)
+    for key in [meta.variant_key] + [call.variant_key for call in calls]:
+        if key and key.lower() in index:
+            return key.lower()
+    return None
+
+
+def process_file(job):
+    """
+    Fill in code variants for one file (runs in a worker process).
+
+    Args:
+        job: Dict with 'file', optional 'component' and 'stories', plus
+            'index' and 'dry_run'
+
+    Returns:
+        Dict with the file, component key, per-story results and the
+        examples used, or an 'error'
+    """
+    with tracing.phase('file', job['file']) as timing:
+        return _process_file(job, timing)
+
+
+def _process_file(job, timing):
+    file_path = job['file']
+    index = job['index']
+    try:
+        with tracing.phase('read', file_path) as span, open(file_path, 'rb') as f:
+            data = f.read()
+            span['bytes'] = timing['bytes'] = len(data)
+    except OSError as e:
+        return {'file': file_path, 'error': str(e)}
+
+    # One malformed file is reported, not raised: the pool would die with it
+    try:
+        content = data.decode()
+        component_key = job.get('component') or infer_component_key(file_path, data, index)
+        if component_key is None:
+            return {'file': file_path, 'error': 'no component key (none given or inferred)'}
+
+        meta, stories = scan_stories(data)
+        story_names = job.get('stories')
+        if story_names is None:
+            if meta.has_variants:
+                story_names = []
+            else:
+                story_names = [story.name for story in stories if not story.has_variants]
+
+        pairs = [(story, resolve_example(index, component_key, story)) for story in story_names]
+        content, results = insert_code_variants(content, component_key, pairs, log=lambda _: None,
+                                                module=code_variants_module(file_path))
+    except (lexer.LexError, UnicodeDecodeError) as e:
+        return {'file': file_path, 'error': str(e)}
+    added = [story for story, result in results.items() if result == 'added']
+    if added and not job['dry_run']:
+        with tracing.phase('write', file_path, len(content)):
+            atomic_write(file_path, content.encode())
+    return {'file': file_path, 'component': component_key, 'results': results,
+            'examples': dict(pairs)}
+
+
+def run_jobs(jobs, workers=None):
+    """Run process_file over all jobs, in a process pool when there are several."""
+    if len(jobs) > 1 and workers != 1 and not tracing.enabled():
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(process_file, jobs))
+    return [process_file(job) for job in jobs]
+
+
+def load_jobs(args, index):
+    """Build the per-file job list from --manifest or --discover."""
+    if args.manifest:
+        with open(args.manifest) as f:
+            manifest = json.load(f)
+        entries = manifest.get('files', [])
+        jobs = [{'file': os.path.join(REPO_ROOT, entry['file']),
+                 'component': entry.get('component'),
+                 'stories': entry.get('stories')} for entry in entries]
+    else:
+        from code_variants.coverage import find_story_files
+        jobs = [{'file': path} for path in sorted(find_story_files(args.discover))]
+    for job in jobs:
+        job['index'] = index
+        job['dry_run'] = args.dry_run
+    return jobs
+
+
+def print_summary(outcomes, dry_run):
+    """Print one line per touched file and the aggregated totals."""
+    totals = {'added': 0, 'skipped': 0, 'missing': 0}
+    exact = 0
+    files_changed = 0
+    errors = []
+
+    for outcome in outcomes:
+        rel_path = os.path.relpath(outcome['file'], REPO_ROOT)
+        if 'error' in outcome:
+            errors.append((rel_path, outcome['error']))
+            continue
+        results = outcome['results']
+        counts = {result: sum(1 for r in results.values() if r == result) for result in totals}
+        for result, count in counts.items():
+            totals[result] += count
+        exact += sum(1 for story, result in results.items()
+                     if result == 'added' and normalize(outcome['examples'][story]) == normalize(story))
+        if counts['added']:
+            files_changed += 1
+        if counts['added'] or counts['missing']:
+            print(f"📄 {rel_path} ['{outcome['component']}']: "
+                  f"{counts['added']} added, {counts['skipped']} skipped, {counts['missing']} not found")
+
+    if errors:
+        print(f"\n⚠️  {len(errors)} files skipped:")
+        for rel_path, error in errors:
+            print(f"   {rel_path}: {error}")
+
+    print(f"\n{'🔍 Dry run' if dry_run else '✅ Done'}: {len(outcomes)} files, "
+          f"{files_changed} {'would change' if dry_run else 'written'}")
+    print(f"   Stories added:    {totals['added']} ({exact} with their own example, "
+          f"{totals['added'] - exact} falling back to 'default')")
+    print(f"   Already present:  {totals['skipped']}")
+    print(f"   Not found:        {totals['missing']}")
+    return totals
+
+
 def main():
     """Main entry point for the script."""
-    if len(sys.argv) < 4:
+    parser = argparse.ArgumentParser(description='Add getCodeVariants() parameters to stories.')
+    parser.add_argument('args', nargs='*', metavar='file_path component_key story_names',
+                        help='single-file mode')
+    parser.add_argument('--manifest', help='JSON manifest of files, component keys and stories')
+    parser.add_argument('--discover', nargs='?', const=str(DEFAULT_DISCOVER_DIR), metavar='DIR',
+                        help=f'process every story file under DIR (default: {DEFAULT_DISCOVER_DIR})')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--dry-run', action='store_true', help='report without writing')
+    tracing.add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.profile is not None:
+        tracing.enable('add-code-variants-bulk', args.profile or None)
+
+    from code_variants.catalog import load_catalog
+    with tracing.phase('load-catalog'):
+        index = variant_index(load_catalog())
+
+    if args.manifest or args.discover:
+        try:
+            jobs = load_jobs(args, index)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"\n❌ Error: invalid manifest: {e}")
+            return 1
+        print(f"\n📝 Processing {len(jobs)} story files...\n")
+        print_summary(run_jobs(jobs, args.jobs), args.dry_run)
+        return 0
+
+    if len(args.args) < 3:
         print("Usage: python3 add-code-variants-bulk.py <file_path> <component_key> <story_names...>")
+        print("       python3 add-code-variants-bulk.py --manifest <manifest.json> | --discover [DIR]")
         print("\nExample:")
         print("  python3 add-code-variants-bulk.py \\")
         print("    storybook/stories/components/forms/TextField.stories.tsx \\")
@@ -85,16 +431,16 @@ def main():
         print("    Default WithValue WithError Required")
         sys.exit(1)
 
-    file_path = sys.argv[1]
-    component_key = sys.argv[2]
-    story_names = sys.argv[3:]
+    file_path = args.args[0]
+    component_key = args.args[1]
+    story_names = args.args[2:]
 
     print(f"\n📝 Processing: {file_path}")
     print(f"🔑 Component key: '{component_key}'")
     print(f"📚 Stories: {', '.join(story_names)}\n")
 
     try:
-        stories_updated = add_code_variants(file_path, component_key, story_names)
+        stories_updated = add_code_variants(file_path, component_key, story_names, index)
 
         if stories_updated > 0:
             print(f"\n✅ Success! Updated {stories_updated} stories")
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Attribute the shipped bytes of a Storybook build to code variants and stories.
+
+Reads storybook-static and its source maps and reports, for a chosen
+level, how many minified and gzip bytes each piece costs: examples
+objects of codeVariants.ts (by component key), their variants and
+language tabs, story files, any source file, or output chunks. With
+--baseline it shows the change against a previous build's report.
+
+Source maps are off in normal builds; build with them first:
+
+    cd storybook && STORYBOOK_SOURCEMAP=true npm run build
+
+Usage:
+    python3 scripts/analyze-variant-bundle.py [--build DIR] [--by LEVEL] [--sort KEY] [--top N]
+                                              [--json REPORT] [--baseline REPORT] [--jobs N]
+                                              [--profile [TRACE]]
+
+Options:
+    --build     Build directory (default: storybook/storybook-static)
+    --by        component, variant, language, tab, story, source or chunk
+                (default: component)
+    --sort      gzip, min, key or delta (default: gzip; delta needs --baseline)
+    --top       Rows to print, 0 for all (default: 25)
+    --json      Save the full report (every level can be rebuilt from it)
+    --baseline  A report saved with --json from an earlier build
+    --jobs      Worker processes (default: CPU count)
+    --profile   Record phase timings and write a Chrome trace
+
+Examples:
+    python3 scripts/analyze-variant-bundle.py --by language --top 40
+    python3 scripts/analyze-variant-bundle.py --json bundle-before.json
+    python3 scripts/analyze-variant-bundle.py --baseline bundle-before.json --sort delta
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from code_variants import tracing
+from code_variants.bundle import (LEVELS, STATIC_DIR, aggregate, analyze_build, diff,
+                                  is_variants_source, load_report)
+
+
+def _kb(size):
+    return f"{size / 1024:,.1f}"
+
+
+def _delta(size):
+    return f"{size / 1024:+,.1f}" if size else '0.0'
+
+
+def print_table(rows, total_gzip, args, changes=None):
+    """Print the rows of one level; with `changes`, include the deltas."""
+    width = max([len(row.key) for row in rows] + [len(args.by)])
+    width = min(width, 70)
+    header = f"{args.by.capitalize():<{width}} {'Min KB':>10} {'Gzip KB':>9} {'% gzip':>7}"
+    if changes is not None:
+        header += f" {'Δ Min KB':>10} {'Δ Gzip KB':>10}"
+    print(header)
+    print("-" * len(header))
+    for row in rows:
+        key = row.key if len(row.key) <= width else '...' + row.key[-(width - 3):]
+        line = (f"{key:<{width}} {_kb(row.min):>10} {_kb(row.gzip):>9} "
+                f"{row.gzip / (total_gzip or 1) * 100:>6.1f}%")
+        if changes is not None:
+            delta_min, delta_gzip, status = changes[row.key]
+            line += f" {_delta(delta_min):>10} {_delta(delta_gzip):>10}" + (f"  {status}" if status else '')
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Attribute Storybook bundle bytes to code variants.')
+    parser.add_argument('--build', default=str(STATIC_DIR), help='storybook-static directory')
+    parser.add_argument('--by', choices=LEVELS, default='component', help='level to report')
+    parser.add_argument('--sort', choices=('gzip', 'min', 'key', 'delta'), default='gzip',
+                        help='sort column (default: gzip)')
+    parser.add_argument('--top', type=int, default=25, help='rows to print, 0 for all')
+    parser.add_argument('--json', metavar='REPORT', help='save the full report as JSON')
+    parser.add_argument('--baseline', metavar='REPORT', help='report of an earlier build to diff against')
+    parser.add_argument('--jobs', type=int, default=None, help='worker processes (default: CPU count)')
+    tracing.add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.sort == 'delta' and not args.baseline:
+        parser.error('--sort delta needs --baseline')
+    if args.profile is not None:
+        tracing.enable('analyze-variant-bundle', args.profile or None)
+
+    baseline = None
+    if args.baseline:
+        try:
+            baseline = load_report(args.baseline)
+        except (OSError, ValueError) as e:
+            print(f"❌ Cannot read baseline: {e}")
+            return 1
+
+    start = time.perf_counter()
+    try:
+        report = analyze_build(args.build, jobs=args.jobs)
+    except FileNotFoundError as e:
+        print(f"❌ {e}")
+        return 1
+    elapsed = time.perf_counter() - start
+    totals = report['totals']
+
+    print("=" * 80)
+    print(f"📦 BUNDLE ATTRIBUTION: {report['build']}")
+    print("=" * 80)
+    print(f"Chunks: {totals['files']} ({totals['mapped']} with source maps), "
+          f"{_kb(totals['min'])} KB minified, {_kb(totals['gzip'])} KB gzip ({elapsed:.1f}s)")
+    variants = [piece for piece in report['pieces'] if is_variants_source(piece['source'])]
+    if variants:
+        size = sum(piece['min'] for piece in variants)
+        packed = sum(piece['gzip'] for piece in variants)
+        print(f"codeVariants.ts: {_kb(size)} KB minified, {_kb(packed)} KB gzip "
+              f"({packed / (totals['gzip'] or 1) * 100:.1f}% of the build)")
+    if not totals['mapped']:
+        print("\n⚠️  No source maps found; everything is unmapped. Rebuild with:")
+        print("   cd storybook && STORYBOOK_SOURCEMAP=true npm run build")
+    for entry in report['files']:
+        if 'error' in entry:
+            print(f"⚠️  {entry['file']}: {entry['error']}")
+
+    rows = aggregate(report['pieces'], args.by)
+    changes = None
+    if baseline is not None:
+        changes = {}
+        previous_rows = aggregate(baseline['pieces'], args.by)
+        for key, (row, previous) in diff(rows, previous_rows).items():
+            if row is None:
+                row = previous._replace(min=0, gzip=0)
+                rows.append(row)
+            changes[key] = (row.min - (previous.min if previous else 0),
+                            row.gzip - (previous.gzip if previous else 0),
+                            'new' if previous is None else 'removed' if not row.min else '')
+        previous_total = baseline['totals']
+        print(f"Baseline: {baseline['build']} from {baseline['created']}: "
+              f"{_delta(totals['min'] - previous_total['min'])} KB minified, "
+              f"{_delta(totals['gzip'] - previous_total['gzip'])} KB gzip")
+
+    sort_keys = {
+        'gzip': lambda row: (-row.gzip, row.key),
+        'min': lambda row: (-row.min, row.key),
+        'key': lambda row: row.key,
+        'delta': lambda row: (-abs(changes[row.key][1]), -abs(changes[row.key][0]), row.key),
+    }
+    rows.sort(key=sort_keys[args.sort])
+    shown = rows[:args.top] if args.top else rows
+
+    print()
+    if shown:
+        print_table(shown, totals['gzip'], args, changes)
+        if len(shown) < len(rows):
+            print(f"... {len(rows) - len(shown)} more (use --top 0 for all)")
+    else:
+        print(f"Nothing to report at the '{args.by}' level")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=1)
+        print(f"\n💾 Report saved to: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Benchmark the code variant tooling on synthetic inputs of growing size.
+
+This script generates a codeVariants.ts and a story tree at 1x, 5x, 10x and
+50x today's size, times parsing, verifying, bulk-adding and inserting on
+each (every phase in a fresh interpreter, so its peak RSS is its own), and
+appends one compact line per run to a history file.
+
+Usage:
+    python3 scripts/benchmark-code-variants.py [--scales 1,5,10,50] [--phases parse,verify,bulk,insert]
+                                               [--repeat N] [--history FILE] [--no-record]
+                                               [--time-tolerance F] [--rss-tolerance F]
+                                               [--keep DIR] [--json REPORT]
+
+Options:
+    --scales          Comma-separated size multipliers (default: 1,5,10,50)
+    --phases          Phases to time (default: all)
+    --repeat          Timed runs per phase; the fastest is kept (default: 3)
+    --history         History file (default: .cache/code-variants/bench-history.jsonl)
+    --no-record       Compare with the history but do not append this run
+    --time-tolerance  Allowed throughput drop vs the baseline (default: 0.25)
+    --rss-tolerance   Allowed peak RSS growth vs the baseline (default: 0.15)
+    --keep            Generate the inputs in DIR and keep them
+    --json            Write this run's record as JSON
+
+The baseline is the median of the last 5 runs on the same host. Exit code
+is 1 when any phase regresses; a regressing run is not appended, so it
+never becomes part of the baseline.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from code_variants.bench import (DEFAULT_SCALES, HISTORY_FILE, PHASES, append_history,
+                                 find_regressions, generate_story_tree, generate_variants_file,
+                                 load_history, new_record, run_phase, run_phase_process)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the code variant tooling at scale.')
+    parser.add_argument('--scales', default=','.join(map(str, DEFAULT_SCALES)),
+                        help='comma-separated size multipliers')
+    parser.add_argument('--phases', default=','.join(PHASES), help='comma-separated phases')
+    parser.add_argument('--repeat', type=int, default=3, help='timed runs per phase (best is kept)')
+    parser.add_argument('--history', default=str(HISTORY_FILE), help='history file')
+    parser.add_argument('--no-record', action='store_true', help='do not append this run')
+    parser.add_argument('--time-tolerance', type=float, default=0.25,
+                        help='allowed throughput drop (fraction)')
+    parser.add_argument('--rss-tolerance', type=float, default=0.15,
+                        help='allowed peak RSS growth (fraction)')
+    parser.add_argument('--keep', metavar='DIR', help='generate inputs in DIR and keep them')
+    parser.add_argument('--json', metavar='REPORT', help="write this run's record as JSON")
+    # Internal: time one phase in this process (used for the per-phase children)
+    parser.add_argument('--phase', choices=PHASES, help=argparse.SUPPRESS)
+    parser.add_argument('--variants-file', help=argparse.SUPPRESS)
+    parser.add_argument('--stories-dir', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.phase:
+        print(json.dumps(run_phase(args.phase, args.variants_file, args.stories_dir, args.repeat)))
+        return 0
+
+    scales = [int(scale) for scale in args.scales.split(',')]
+    phases = [phase for phase in args.phases.split(',') if phase]
+    unknown = set(phases) - set(PHASES)
+    if unknown:
+        print(f"❌ Unknown phases: {', '.join(sorted(unknown))} (choose from {', '.join(PHASES)})")
+        return 1
+
+    work_dir = args.keep or tempfile.mkdtemp(prefix='code-variants-bench-')
+    results = {}
+    print("=" * 80)
+    print("⏱️  CODE VARIANT TOOLING BENCHMARK")
+    print("=" * 80)
+    try:
+        for scale in scales:
+            scale_dir = os.path.join(work_dir, f'{scale}x')
+            os.makedirs(scale_dir, exist_ok=True)
+            start = time.perf_counter()
+            variants_file = os.path.join(scale_dir, 'codeVariants.ts')
+            stories_dir = os.path.join(scale_dir, 'stories')
+            variants_size = generate_variants_file(variants_file, scale)
+            stories_size = generate_story_tree(stories_dir, scale)
+            print(f"\n📐 {scale}x: {variants_size / 1e6:.1f} MB variants, "
+                  f"{stories_size / 1e6:.1f} MB stories "
+                  f"(generated in {time.perf_counter() - start:.1f}s)")
+
+            results[scale] = {}
+            for phase in phases:
+                result = run_phase_process(os.path.abspath(__file__), phase, variants_file,
+                                           stories_dir, args.repeat)
+                results[scale][phase] = result
+                print(f"   {phase:<8} {result['ms']:>10.1f} ms {result['mb_s']:>9.2f} MB/s "
+                      f"{result['rss_kb'] / 1024:>8.1f} MB peak RSS")
+            if not args.keep:
+                shutil.rmtree(scale_dir)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    record = new_record(results, args.repeat)
+    regressions = find_regressions(record, load_history(args.history),
+                                   args.time_tolerance, args.rss_tolerance)
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(record, f, indent=2)
+        print(f"\n💾 Report saved to: {args.json}")
+
+    if regressions:
+        print(f"\n❌ REGRESSIONS ({len(regressions)}) vs the median of previous runs:")
+        for scale, phase, metric, baseline, current in regressions:
+            if metric == 'mb_s':
+                print(f"   {scale}x {phase:<8} throughput: {baseline:.2f} -> {current:.2f} MB/s")
+            else:
+                print(f"   {scale}x {phase:<8} peak RSS:   {baseline / 1024:.1f} -> {current / 1024:.1f} MB")
+        print("❌ BENCHMARK FAILED - run not recorded")
+        return 1
+
+    if not args.no_record:
+        append_history(record, args.history)
+        print(f"\n📈 Recorded in {args.history}")
+    print("✅ BENCHMARK PASSED - no regressions")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Build content-hashed code variant assets and their manifest.
+
+This script reads storybook/.storybook/blocks/codeVariants.ts and writes
+one `<key>.<hash>.json` file per component to storybook/public/code-variants/
+assets/, a small manifest.json mapping component keys to those URLs, and
+the codeVariants.assets/ loader module (`getCodeVariants()`,
+`MultiLanguageCode`) that reads the manifest. A component's file name only
+changes when its examples do, so the assets can be cached `immutable` across
+deploys; only the manifest needs revalidating.
+
+Usage:
+    python3 scripts/build-code-variant-assets.py [--out DIR] [--json REPORT]
+
+Run it before `storybook build`; main.ts serves the directory at /code-variants/.
+"""
+
+import argparse
+import json
+import sys
+
+from code_variants.assets import ASSETS_DIR, write_assets
+from code_variants.catalog import load_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build content-hashed code variant assets.')
+    parser.add_argument('--out', default=str(ASSETS_DIR), help='output directory')
+    parser.add_argument('--json', metavar='REPORT', help='write the report as JSON')
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    report = write_assets(catalog, args.out)
+    components = report['components']
+    total = sum(entry['bytes'] for entry in components.values())
+    changed = sum(components[key]['bytes'] for key in report['changed'])
+
+    print(f"\n#️⃣  Built {len(components)} hashed component assets in {args.out}")
+    print(f"   ✍️  written:   {len(report['written'])}")
+    print(f"   ✓  unchanged: {len(report['unchanged'])}")
+    if report['removed']:
+        print(f"   🗑️  removed:   {len(report['removed'])}")
+
+    if report['changed']:
+        print(f"\n🔄 New URLs ({len(report['changed'])}): {', '.join(report['changed'])}")
+    if report['dropped']:
+        print(f"➖ Dropped: {', '.join(report['dropped'])}")
+    print(f"\n📦 {total:,} bytes of examples; {total - changed:,} "
+          f"({(total - changed) / (total or 1) * 100:.1f}%) keep their URLs and stay cached")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report saved to: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Build precompressed, per-component code variant blobs.
+
+This script reads storybook/.storybook/blocks/codeVariants.ts and writes
+storybook/.storybook/blocks/codeVariants.blobs/: one gzip blob per
+component, a manifest of segment offsets and sizes, and a MultiLanguageCode
+that decompresses only the tab the user opens.
+
+Usage:
+    python3 scripts/build-code-variant-blobs.py [--out DIR] [--repeat N] [--json REPORT]
+
+It ends with a size and decode-time benchmark of raw vs compressed text
+for every component.
+"""
+
+import argparse
+import json
+import sys
+
+from code_variants.blobs import BLOBS_DIR, benchmark, write_blobs
+from code_variants.catalog import load_catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build compressed code variant blobs.')
+    parser.add_argument('--out', default=str(BLOBS_DIR), help='output directory')
+    parser.add_argument('--repeat', type=int, default=5, help='timing runs per component (best is kept)')
+    parser.add_argument('--json', metavar='REPORT', help='write the benchmark as JSON')
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    report, components = write_blobs(catalog, args.out)
+
+    print(f"\n🗜️  Built {len(components)} component blobs in {args.out}")
+    print(f"   ✍️  written:   {len(report['written'])}")
+    print(f"   ✓  unchanged: {len(report['unchanged'])}")
+    if report['removed']:
+        print(f"   🗑️  removed:   {len(report['removed'])} ({', '.join(report['removed'])})")
+
+    results = benchmark(components, args.repeat)
+    print(f"\n⏱️  Raw vs compressed (best of {args.repeat}):\n")
+    print(f"   {'Component':<28} {'Raw':>10} {'Blob':>9} {'Whole gz':>9} {'Ratio':>6}"
+          f" {'Decode µs':>10} {'Inflate µs':>11} {'Per tab µs':>11}")
+    for key, result in sorted(results.items(), key=lambda item: item[1]['raw_bytes'], reverse=True):
+        print(f"   {key:<28} {result['raw_bytes']:>10,} {result['blob_bytes']:>9,}"
+              f" {result['whole_gzip_bytes']:>9,}"
+              f" {result['blob_bytes'] / result['raw_bytes'] * 100:>5.1f}%"
+              f" {result['raw_decode_us']:>10.0f} {result['inflate_us']:>11.0f}"
+              f" {result['inflate_us'] / result['segments']:>11.1f}")
+
+    totals = {field: sum(result[field] for result in results.values())
+              for field in ('raw_bytes', 'blob_bytes', 'whole_gzip_bytes', 'segments',
+                            'raw_decode_us', 'inflate_us')}
+    print(f"\n📦 Total: {totals['raw_bytes']:,} raw -> {totals['blob_bytes']:,} compressed "
+          f"({totals['blob_bytes'] / totals['raw_bytes'] * 100:.1f}%, "
+          f"{totals['whole_gzip_bytes']:,} if each component were one gzip stream)")
+    print(f"   Inflating all {totals['segments']} segments: {totals['inflate_us'] / 1000:.1f} ms "
+          f"({totals['inflate_us'] / totals['segments']:.0f} µs per tab)")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'components': results, 'totals': totals}, f, indent=2)
+        print(f"\n📄 Benchmark saved to: {args.json}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Build the full-text search index over every code example.
+
+This script reads storybook/.storybook/blocks/codeVariants.ts and writes
+storybook/public/code-variants/search-index.json: an inverted index of the
+identifiers, camelCase parts and dotted chains (`Ext.create`) in every
+variant's four language tabs. The manager's Code Search panel fetches it
+the first time the panel is opened. See scripts/code_variants/search.py
+for the format.
+
+Usage:
+    python3 scripts/build-code-variant-search.py [--out PATH] [--query TEXT ...]
+                                                 [--language LANG] [--top N]
+
+Options:
+    --out       Index file (default: storybook/public/code-variants/search-index.json)
+    --query     Search the index just built and print the hits; repeatable
+    --language  Only show hits in this language tab
+    --top       Hits to print per query, 0 for all (default: 20)
+
+Examples:
+    python3 scripts/build-code-variant-search.py
+    python3 scripts/build-code-variant-search.py --query "Ext.create" --language extjs
+    python3 scripts/build-code-variant-search.py --query createButton --query onAction
+
+Run it before `storybook build`; main.ts serves the directory at /code-variants/.
+"""
+
+import argparse
+import gzip
+import os
+import sys
+import time
+
+from code_variants.catalog import LANGUAGES, load_catalog
+from code_variants.paths import REPO_ROOT
+from code_variants.search import INDEX_FILE, dump_index, query_terms, search, write_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Build the code example search index.')
+    parser.add_argument('--out', default=str(INDEX_FILE), help='index file')
+    parser.add_argument('--query', action='append', default=[], help='search the built index')
+    parser.add_argument('--language', choices=LANGUAGES, help='only hits in this language')
+    parser.add_argument('--top', type=int, default=20, help='hits per query, 0 for all')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index, size, written = write_index(load_catalog(), args.out)
+    elapsed = time.perf_counter() - start
+    packed = len(gzip.compress(dump_index(index)))
+    postings = sum(len(deltas) for deltas in index['postings'])
+
+    print(f"\n🔎 {'Built' if written else 'Unchanged'}: {os.path.relpath(args.out, REPO_ROOT)} "
+          f"({elapsed * 1000:.0f} ms)")
+    print(f"   components: {len(index['components'])}")
+    print(f"   examples:   {len(index['examples'])} ({len(index['examples']) * len(LANGUAGES)} documents)")
+    print(f"   terms:      {len(index['terms']):,}")
+    print(f"   postings:   {postings:,}")
+    print(f"   size:       {size / 1024:,.1f} KB, {packed / 1024:,.1f} KB gzip")
+
+    for query in args.query:
+        start = time.perf_counter()
+        hits = search(index, query, language=args.language, limit=0)
+        elapsed = time.perf_counter() - start
+        shown = hits[:args.top] if args.top else hits
+        terms = len(query_terms(query))
+        print(f"\n\"{query}\": {len(hits)} hit(s) in {elapsed * 1000:.2f} ms")
+        for hit in shown:
+            print(f"   {hit.component + '/' + hit.example:<48} {hit.language:<11} "
+                  f"{hit.score}/{terms} whole")
+        if len(shown) < len(hits):
+            print(f"   ... {len(hits) - len(shown)} more (use --top 0 for all)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
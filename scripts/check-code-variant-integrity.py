@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Check every template literal in codeVariants.ts.
+
+Flags unescaped backticks, unintended ${...} interpolations, invalid
+escapes and unbalanced brackets in the code samples, each with its line
+and column, so a bad escape is caught before it breaks the whole module
+(and sets off Vite's recompile loop). The exports are checked in parallel;
+the full file takes well under a second.
+
+Usage:
+    python3 scripts/check-code-variant-integrity.py [--file PATH] [--jobs N] [--json REPORT]
+                                                    [--profile [TRACE]]
+
+Options:
+    --file     Variants file to check (default: storybook/.storybook/blocks/codeVariants.ts)
+    --jobs     Worker processes (default: CPU count; 1 checks in this process)
+    --json     Also write the findings as JSON
+    --profile  Record phase timings and write a Chrome trace
+
+Exit code is 1 when anything is found. The same check runs on every edit
+the catalog writes (add-* scripts, batch manifests), which refuse to write
+a statement that fails it.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+
+from code_variants import tracing
+from code_variants.integrity import check_file
+from code_variants.paths import REPO_ROOT, VARIANTS_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Check the template literals in codeVariants.ts.')
+    parser.add_argument('--file', default=str(VARIANTS_FILE), help='variants file to check')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes (default: CPU count)')
+    parser.add_argument('--json', metavar='REPORT', help='write the findings as JSON')
+    tracing.add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.profile is not None:
+        tracing.enable('check-code-variant-integrity', args.profile or None)
+
+    start = time.perf_counter()
+    with tracing.phase('check', args.file, os.path.getsize(args.file)):
+        findings = check_file(args.file, jobs=1 if tracing.enabled() else args.jobs)
+    elapsed = time.perf_counter() - start
+
+    path = os.path.relpath(args.file, REPO_ROOT)
+    print("=" * 80)
+    print("🔎 CODE VARIANT TEMPLATE INTEGRITY")
+    print("=" * 80)
+    for finding in findings:
+        where = '/'.join(part for part in (finding.export, finding.variant, finding.language) if part)
+        print(f"❌ {path}:{finding.line}:{finding.column}: {finding.kind}: {finding.message}"
+              + (f"  [{where}]" if where else ''))
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([finding._asdict() for finding in findings], f, indent=2)
+        print(f"\n💾 Report saved to: {args.json}")
+
+    if findings:
+        print(f"\n❌ {len(findings)} problem(s) in {path} ({elapsed * 1000:.0f} ms)")
+        return 1
+    print(f"✅ No problems in {path} ({elapsed * 1000:.0f} ms)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
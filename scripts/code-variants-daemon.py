@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Keep stories and code variants parsed in memory for fast repeated queries.
+
+This script parses storybook/.storybook/blocks/codeVariants.ts and every
+.stories.tsx file under storybook/stories once, then watches them (inotify,
+or mtime polling where inotify is unavailable) and re-parses only the files
+that change. Queries are answered over a Unix socket, or over stdin/stdout
+with --stdio.
+
+Usage:
+    python3 scripts/code-variants-daemon.py [--socket PATH] [--polling]
+    python3 scripts/code-variants-daemon.py --stdio
+    python3 scripts/code-variants-daemon.py --status | --stop
+
+While it runs, these return in milliseconds instead of re-parsing:
+    python3 scripts/verify-code-variants.py --daemon
+    python3 scripts/add-code-variants-batch.py manifest.json --daemon
+
+Protocol (one JSON object per line, see scripts/code_variants/daemon.py):
+    {"op": "lookup", "component": "button", "variant": "default"}
+    -> {"ok": true, "result": {"react": "...", ...}}
+"""
+
+import argparse
+import sys
+import time
+
+from code_variants.daemon import (SOCKET_PATH, DaemonError, DaemonUnavailable, Workspace,
+                                  make_watcher, request, serve, serve_stdio)
+from code_variants.paths import STORIES_DIR, VARIANTS_FILE
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Watch-mode daemon for code variant queries.')
+    parser.add_argument('--socket', default=str(SOCKET_PATH), help='Unix socket path')
+    parser.add_argument('--stdio', action='store_true', help='answer queries on stdin/stdout')
+    parser.add_argument('--polling', action='store_true', help='poll mtimes instead of using inotify')
+    parser.add_argument('--status', action='store_true', help='query a running daemon and exit')
+    parser.add_argument('--stop', action='store_true', help='stop a running daemon')
+    args = parser.parse_args()
+
+    if args.status or args.stop:
+        try:
+            result = request('stop' if args.stop else 'ping', args.socket)
+        except (DaemonUnavailable, DaemonError) as e:
+            print(f"❌ {e}")
+            return 1
+        if args.stop:
+            print("🛑 Daemon stopped")
+        else:
+            print(f"✅ Daemon pid {result['pid']}, up {result['uptime']:.0f}s, "
+                  f"{result['story_files']} story files, {result['reparsed']} re-parses"
+                  + (f", {result['errors']} file(s) failing to parse" if result.get('errors') else ''))
+        return 0
+
+    # In stdio mode stdout carries the protocol, so progress goes to stderr
+    log = (lambda message: print(message, file=sys.stderr)) if args.stdio else print
+
+    start = time.perf_counter()
+    watcher = make_watcher([STORIES_DIR], [VARIANTS_FILE], polling=args.polling)
+    workspace = Workspace()
+    log(f"👀 Watching {len(workspace.stories)} story files and {VARIANTS_FILE.name} "
+        f"({type(watcher).__name__}, loaded in {(time.perf_counter() - start) * 1000:.0f} ms)")
+
+    try:
+        if args.stdio:
+            serve_stdio(workspace, watcher, sys.stdin, sys.stdout)
+        else:
+            log(f"🔌 Listening on {args.socket} (stop with --stop or Ctrl+C)")
+            serve(workspace, watcher, args.socket, log)
+    except KeyboardInterrupt:
+        pass
+    except RuntimeError as e:
+        log(f"❌ {e}")
+        return 1
+    finally:
+        watcher.close()
+    log("👋 Daemon stopped")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
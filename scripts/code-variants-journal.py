@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Undo, roll back and inspect edits to codeVariants.ts.
+
+Every edit made through the shared catalog (the batch and add-* scripts)
+is appended to a journal of the spans it changed, so there is no need to
+copy the whole file to codeVariants.ts.backup-* before a risky change:
+label the current state, edit, and roll back if it goes wrong.
+
+Usage:
+    python3 scripts/code-variants-journal.py log [-n N]
+    python3 scripts/code-variants-journal.py label <name>
+    python3 scripts/code-variants-journal.py undo [N] [--dry-run]
+    python3 scripts/code-variants-journal.py rollback <name> [--dry-run]
+    python3 scripts/code-variants-journal.py compact [--keep N]
+
+Example:
+    python3 scripts/code-variants-journal.py label before-chart-fix
+    python3 scripts/add-code-variants-batch.py charts.json
+    python3 scripts/code-variants-journal.py rollback before-chart-fix
+
+Undo refuses to run if codeVariants.ts was changed outside the journal
+(e.g. edited by hand) since the last recorded edit.
+"""
+
+import argparse
+import sys
+
+from code_variants.journal import KEEP_EDITS, Journal, JournalError
+from code_variants.paths import VARIANTS_FILE
+
+
+def describe(record):
+    """One-line summary of a journal record."""
+    if record['op'] == 'label':
+        return f"🏷️  #{record['seq']:<5} {record['time']}  label '{record['label']}'"
+    added = sum(len(entry[3]) if isinstance(entry[3], str) else 0 for entry in record['edits'])
+    removed = sum(entry[1] for entry in record['edits'])
+    return (f"✏️  #{record['seq']:<5} {record['time']}  {len(record['edits'])} span(s), "
+            f"+{added:,} / -{removed:,} bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Undo journal for codeVariants.ts.')
+    parser.add_argument('--file', default=str(VARIANTS_FILE), help='codeVariants.ts to act on')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    log = commands.add_parser('log', help='list the edits and labels that can be undone')
+    log.add_argument('-n', type=int, default=20, help='show the last N entries (default: 20)')
+    label = commands.add_parser('label', help="name the file's current state")
+    label.add_argument('name')
+    undo = commands.add_parser('undo', help='revert the last N edits')
+    undo.add_argument('count', nargs='?', type=int, default=1)
+    undo.add_argument('--dry-run', action='store_true', help='check without writing')
+    rollback = commands.add_parser('rollback', help='revert every edit since a label')
+    rollback.add_argument('name')
+    rollback.add_argument('--dry-run', action='store_true', help='check without writing')
+    compact = commands.add_parser('compact', help='drop undone and old entries')
+    compact.add_argument('--keep', type=int, default=KEEP_EDITS,
+                         help=f'edits to keep (default: {KEEP_EDITS})')
+    args = parser.parse_args()
+
+    journal = Journal.for_file(args.file)
+    try:
+        if args.command == 'log':
+            stack = journal.stack()
+            print(f"📒 {journal.journal_path}: {sum(1 for r in stack if r['op'] == 'edit')} "
+                  f"undoable edits")
+            for record in stack[-args.n:]:
+                print(f"   {describe(record)}")
+        elif args.command == 'label':
+            record = journal.label(args.name)
+            print(f"🏷️  Labelled the current state '{args.name}' (#{record['seq']})")
+        elif args.command in ('undo', 'rollback'):
+            if args.command == 'undo':
+                undone = journal.undo(args.count, args.dry_run)
+            else:
+                undone = journal.rollback(args.name, args.dry_run)
+            verb = 'Would undo' if args.dry_run else 'Undid'
+            print(f"↩️  {verb} {len(undone)} edit(s)")
+            for record in undone:
+                print(f"   {describe(record)}")
+        else:
+            before, after = journal.compact(args.keep)
+            print(f"🗜️  Compacted {journal.journal_path}: {before} -> {after} entries")
+    except JournalError as e:
+        print(f"❌ {e}")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Code variant tooling behind one command.
+
+Usage:
+    python3 scripts/code-variants.py <command> [options]
+
+Commands:
+    add      Apply a manifest of variants (add-code-variants-batch.py)
+    bulk     Add getCodeVariants() calls to stories (add-code-variants-bulk.py)
+    verify   Story coverage, incremental by default; --full re-parses everything
+             (verify-code-variants.py)
+    shard    Per-component lazy modules (generate-code-variant-shards.py)
+    gc       Remove unreachable variants (gc-code-variants.py)
+    stats    Counts and sizes from the catalog index
+
+Each command takes the options of the script it runs; see
+scripts/code_variants/cli.py.
+"""
+
+import sys
+
+from code_variants.cli import main
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,53 @@
+"""
+Shared tooling for the Storybook code variants.
+
+The standalone scripts in `scripts/` and `storybook/` all edit or inspect
+`storybook/.storybook/blocks/codeVariants.ts`. This package holds the pieces
+they have in common so each script no longer re-reads and re-scans the
+whole file on its own:
+
+- `paths`     - repository root and well-known file locations
+- `lexer`     - linear-time scanner for the TypeScript and TSX sources
+- `catalog`   - byte-offset index of codeVariants.ts, cached on disk
+- `filecache` - per-file results keyed by (mtime, size, hash) fingerprints
+- `stories`   - single-pass story extractor for .stories.tsx files
+- `fileio`    - atomic file replacement
+- `batch`     - manifest-driven batch edits, applied in one write
+- `shards`    - per-component, lazily imported modules
+- `dedup`     - content-addressed store for lines shared across variants
+- `blobs`     - per-component gzip blobs, inflated one tab at a time
+- `assets`    - content-hashed per-component JSON and a manifest, for caching
+- `search`    - inverted index of identifiers and chains for example search
+- `coverage`  - which stories have code variants (verify script and daemon)
+- `daemon`    - watch-mode daemon holding the parsed state, and its client
+- `xref`      - story getCodeVariants() calls joined against defined variants
+- `bench`     - synthetic scale inputs, phase timings and benchmark history
+- `journal`   - append-only journal of span edits, with undo and rollback
+- `tracing`   - `--profile` phase timings, allocation peaks and Chrome traces
+- `integrity` - template-literal checks (backticks, `${`, escapes, brackets)
+- `splitter`  - import pruning and splitting of oversized story files
+- `bundle`    - build bytes attributed to variants and stories via source maps
+- `gc`        - reachability of variants from story call sites, and their removal
+- `layout`    - lossless split into per-category modules and merge back
+- `polaris`   - Polaris-documented variations joined against the catalog
+- `cli`       - `code-variants <command>` dispatcher (`python3 -m code_variants`)
+
+Scripts that live outside `scripts/` add this directory to `sys.path`
+before importing, e.g.:
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+    from code_variants.catalog import load_catalog
+"""
+
+from .paths import REPO_ROOT, VARIANTS_FILE
+
+__all__ = ['VariantCatalog', 'load_catalog', 'REPO_ROOT', 'VARIANTS_FILE']
+
+
+def __getattr__(name):
+    # Submodules are imported on first use so scripts that only need one
+    # piece (e.g. the file cache) do not pay for parsing code they skip.
+    if name in ('VariantCatalog', 'load_catalog'):
+        from . import catalog
+        return getattr(catalog, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
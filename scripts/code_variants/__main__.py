@@ -0,0 +1,7 @@
+"""`python3 -m code_variants <command>`; see cli.py."""
+
+import sys
+
+from .cli import main
+
+sys.exit(main())
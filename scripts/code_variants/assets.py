@@ -0,0 +1,266 @@
+"""
+Content-hashed code variant assets for long-lived HTTP caching.
+
+Every deploy rebuilds the whole preview bundle with fresh chunk names (see
+the cache-breaking `assetFileNames` in .storybook/main.ts), so the code
+examples inside it are downloaded again even when no component changed.
+`write_assets()` moves them out of the bundle into files whose names are
+their content hashes, served from a static directory Vite does not rename:
+
+- `storybook/public/code-variants/assets/<key>.<hash>.json`
+                          - one component's variants, `{example: {react,
+                            vanilla, extjs, typescript}}`; the name only
+                            changes when the content does, so these can be
+                            served `immutable`
+- `storybook/public/code-variants/manifest.json`
+                          - component key -> hashed URL and example names;
+                            small, and the only file that must be revalidated
+- `codeVariants.assets/index.ts`
+                          - the manifest bundled in, an async
+                            `getCodeVariants()` and `getCodeVariantLoaders()`
+                            that fetch a component's asset on first use
+- `codeVariants.assets/MultiLanguageCode.tsx`
+                          - same props as the eager block
+
+Storybook serves the public directory at `/code-variants/` (`staticDirs`
+in main.ts). Hashed files of components that changed or disappeared are
+removed; unchanged components keep their names, and their cached copies,
+across deploys.
+"""
+
+import hashlib
+import json
+import os
+
+from .blobs import collect_variants
+from .catalog import LANGUAGES
+from .fileio import write_if_changed
+from .paths import BLOCKS_DIR, STORYBOOK_DIR
+
+ASSETS_DIR = STORYBOOK_DIR / 'public' / 'code-variants'
+MODULE_DIR = BLOCKS_DIR / 'codeVariants.assets'
+MANIFEST_VERSION = 1
+# Hex digits of SHA-256 in each file name
+HASH_LENGTH = 10
+
+GENERATED_HEADER = (
+    '// Generated by scripts/build-code-variant-assets.py from codeVariants.ts.\n'
+    '// Do not edit by hand; re-run the build script instead.\n'
+)
+
+
+def asset_content(variants):
+    """
+    Serialize one component's variants.
+
+    Args:
+        variants: List of (variant_key, {language: code}) in file order
+
+    Returns:
+        Compact UTF-8 JSON; identical variants always give identical bytes
+    """
+    body = {key: {language: languages.get(language, '') for language in LANGUAGES}
+            for key, languages in variants}
+    return json.dumps(body, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def asset_name(key, content):
+    return f'{key}.{hashlib.sha256(content).hexdigest()[:HASH_LENGTH]}.json'
+
+
+def asset_sources(components):
+    """
+    Return ({path relative to ASSETS_DIR: bytes}, manifest) for the assets.
+
+    Args:
+        components: collect_variants() output
+    """
+    files = {}
+    manifest = {'version': MANIFEST_VERSION, 'components': {}}
+    for key, variants in components.items():
+        content = asset_content(variants)
+        url = f'assets/{asset_name(key, content)}'
+        files[url] = content
+        manifest['components'][key] = {
+            'url': url,
+            'bytes': len(content),
+            'examples': [variant_key for variant_key, _ in variants],
+        }
+    files['manifest.json'] = json.dumps(manifest, separators=(',', ':')).encode()
+    return files, manifest
+
+
+def module_sources(manifest_import):
+    """
+    Return {file name: bytes} for the generated loader module.
+
+    Args:
+        manifest_import: Import path of manifest.json from the module directory
+    """
+    return {
+        'index.ts': (GENERATED_HEADER + _INDEX_SOURCE
+                     .replace('{languages}', json.dumps(list(LANGUAGES)))
+                     .replace('{manifest}', manifest_import)).encode(),
+        'MultiLanguageCode.tsx': (GENERATED_HEADER + _COMPONENT_SOURCE).encode(),
+    }
+
+
+def _read_manifest(path):
+    try:
+        with open(path) as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get('version') == MANIFEST_VERSION else None
+
+
+def write_assets(catalog, out_dir=ASSETS_DIR, module_dir=MODULE_DIR):
+    """
+    Generate the hashed assets, manifest and loader module from a catalog.
+
+    Returns:
+        Report dict: 'written', 'unchanged' and 'removed' file lists,
+        'changed' (component keys whose URL changed or that are new),
+        'dropped' (keys no longer present) and 'components' (the manifest
+        entries)
+    """
+    out_dir = str(out_dir)
+    assets_dir = os.path.join(out_dir, 'assets')
+    previous = _read_manifest(os.path.join(out_dir, 'manifest.json')) or {'components': {}}
+    files, manifest = asset_sources(collect_variants(catalog))
+
+    os.makedirs(assets_dir, exist_ok=True)
+    os.makedirs(module_dir, exist_ok=True)
+    report = {'written': [], 'unchanged': [], 'removed': []}
+    # Assets before the manifest, so a published manifest never names a missing file
+    for name in sorted(files, key=lambda name: name == 'manifest.json'):
+        written = write_if_changed(os.path.join(out_dir, name), files[name])
+        report['written' if written else 'unchanged'].append(name)
+    manifest_import = os.path.relpath(os.path.join(out_dir, 'manifest.json'), module_dir).replace(os.sep, '/')
+    if not manifest_import.startswith('.'):
+        manifest_import = './' + manifest_import
+    for name, data in module_sources(manifest_import).items():
+        written = write_if_changed(os.path.join(module_dir, name), data)
+        report['written' if written else 'unchanged'].append(f'{os.path.basename(module_dir)}/{name}')
+
+    for name in sorted(os.listdir(assets_dir)):
+        if name.endswith('.json') and f'assets/{name}' not in files:
+            os.remove(os.path.join(assets_dir, name))
+            report['removed'].append(f'assets/{name}')
+
+    old = previous['components']
+    report['changed'] = sorted(key for key, entry in manifest['components'].items()
+                               if old.get(key, {}).get('url') != entry['url'])
+    report['dropped'] = sorted(set(old) - set(manifest['components']))
+    report['components'] = manifest['components']
+    return report
+
+
+_INDEX_SOURCE = '''
+import type { CodeVariant } from '../codeVariants';
+import type { LazyCodeVariant } from '../MultiLanguageCodeView';
+import manifest from '{manifest}';
+
+type Language = keyof CodeVariant;
+
+interface ComponentEntry {
+  url: string;
+  bytes: number;
+  examples: string[];
+}
+
+const languages = {languages} as Language[];
+const components = (manifest as unknown as { components: Record<string, ComponentEntry> }).components;
+
+// The static directory is served at /code-variants/ next to iframe.html (main.ts staticDirs).
+// File names are content hashes, so they bypass Vite's cache-breaking asset names.
+const baseUrl = new URL('code-variants/', document.baseURI);
+
+const assets = new Map<string, Promise<Record<string, CodeVariant>>>();
+const loaderSets = new Map<string, LazyCodeVariant>();
+
+function lookup(componentName: string, exampleName: string): ComponentEntry | null {
+  const component = components[componentName.toLowerCase()];
+  if (!component) {
+    console.warn(`No code examples found for component: ${componentName}`);
+    return null;
+  }
+  if (!component.examples.includes(exampleName)) {
+    console.warn(`No example "${exampleName}" found for component: ${componentName}`);
+    return null;
+  }
+  return component;
+}
+
+// Fetch (once) one component's hashed asset
+export function loadComponent(componentName: string): Promise<Record<string, CodeVariant>> {
+  const key = componentName.toLowerCase();
+  let asset = assets.get(key);
+  if (!asset) {
+    asset = fetch(new URL(components[key].url, baseUrl)).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Failed to load code examples for ${key}: ${response.status}`);
+      }
+      return response.json();
+    });
+    asset.catch(() => assets.delete(key));
+    assets.set(key, asset);
+  }
+  return asset;
+}
+
+// Async version of getCodeVariants() in codeVariants.ts
+export async function getCodeVariants(
+  componentName: string,
+  exampleName: string
+): Promise<CodeVariant | null> {
+  if (!lookup(componentName, exampleName)) {
+    return null;
+  }
+  return (await loadComponent(componentName))[exampleName];
+}
+
+// Same lookup as getCodeVariants(), answered from the manifest; each language is a loader
+export function getCodeVariantLoaders(
+  componentName: string,
+  exampleName: string
+): LazyCodeVariant | null {
+  if (!lookup(componentName, exampleName)) {
+    return null;
+  }
+
+  // Stable loader identities, so the Code block does not reload on re-render
+  const cacheKey = `${componentName.toLowerCase()}/${exampleName}`;
+  let loaders = loaderSets.get(cacheKey);
+  if (!loaders) {
+    loaders = {} as LazyCodeVariant;
+    for (const language of languages) {
+      loaders[language] = () =>
+        loadComponent(componentName).then((examples) => examples[exampleName][language]);
+    }
+    loaderSets.set(cacheKey, loaders);
+  }
+  return loaders;
+}
+'''
+
+_COMPONENT_SOURCE = '''
+import React from 'react';
+import { MultiLanguageCodeView } from '../MultiLanguageCodeView';
+import { getCodeVariantLoaders } from './index';
+
+interface MultiLanguageCodeProps {
+  componentName: string;
+  exampleName: string;
+}
+
+export function MultiLanguageCode({ componentName, exampleName }: MultiLanguageCodeProps) {
+  return (
+    <MultiLanguageCodeView
+      componentName={componentName}
+      exampleName={exampleName}
+      variants={getCodeVariantLoaders(componentName, exampleName)}
+    />
+  );
+}
+'''
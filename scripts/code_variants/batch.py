@@ -0,0 +1,199 @@
+"""
+Batch edits to codeVariants.ts.
+
+A `VariantBatch` collects many variant additions (and new components) and
+applies them against the parsed catalog in one transaction: one read, all
+edits spliced in memory, one atomic write (temp file + rename).
+
+Manifest format (JSON, or YAML when PyYAML is installed):
+
+    {
+      "components": [
+        {"key": "zed", "export": "zedExamples", "after": "avatar", "title": "Zed"}
+      ],
+      "variants": [
+        {
+          "component": "mediacard",
+          "variant": "landscape",
+          "react": "import { MediaCard } from '@shopify/polaris'; ...",
+          "vanilla": {"file": "snippets/landscape.html"},
+          "extjs": "...",
+          "typescript": "...",
+          "replace": false
+        }
+      ]
+    }
+
+Language values are the code itself (no template-literal escaping needed)
+or {"file": path} relative to the manifest. Existing variants are skipped
+unless "replace" is true.
+"""
+
+import json
+import os
+import re
+
+from . import lexer
+from .catalog import LANGUAGES, CatalogError
+
+_IDENTIFIER = re.compile(r'[A-Za-z_$][\w$]*$')
+
+
+class ManifestError(ValueError):
+    """Raised for malformed manifest entries."""
+
+
+def render_variant(key, languages, indent='  '):
+    """Return TypeScript for one `key: { react: `...`, ... }` entry."""
+    missing = [language for language in LANGUAGES if language not in languages]
+    if missing:
+        raise ManifestError(f"Variant '{key}' is missing: {', '.join(missing)}")
+    name = key if _IDENTIFIER.match(key) else "'" + key.replace("'", "\\'") + "'"
+    literals = [f'{indent}  {language}: {lexer.render_template(languages[language])}'
+                for language in LANGUAGES]
+    return f'{indent}{name}: {{\n' + ',\n\n'.join(literals) + f'\n{indent}}}'
+
+
+def render_export(export_name, title, variants):
+    """Return TypeScript for a new `export const xxxExamples = {...};` block."""
+    body = ',\n\n'.join(render_variant(key, languages) for key, languages in variants)
+    return (f'// {title} Component Examples\n'
+            f'export const {export_name}: Record<string, CodeVariant> = {{\n'
+            f'{body}\n}};')
+
+
+class VariantBatch:
+    """
+    Collects variant additions and commits them in one write.
+
+    Usage:
+        batch = VariantBatch(load_catalog())
+        batch.add_variant('mediacard', 'landscape', {'react': ..., ...})
+        changes = batch.commit()
+    """
+
+    def __init__(self, catalog):
+        self.catalog = catalog
+        self.components = {}    # component key -> {'export', 'after', 'title'}
+        self.variants = []      # (component, key, languages, replace)
+
+    def add_component(self, key, export_name, after, title=None):
+        """Queue a new `xxxExamples` export, registered under `key`."""
+        if key in self.catalog.mapping or key in self.components:
+            raise ManifestError(f"Component '{key}' already exists")
+        self.catalog.resolve(after)
+        self.components[key] = {'export': export_name, 'after': after,
+                                'title': title or export_name[:-len('Examples')] or key}
+
+    def add_variant(self, component, key, languages, replace=False):
+        """Queue a variant for an existing or queued component."""
+        if component not in self.components:
+            self.catalog.resolve(component)
+        self.variants.append((component, key, dict(languages), replace))
+
+    def plan(self):
+        """
+        Return (edits, changes) without touching the file.
+
+        `changes` lists one dict per manifest entry with its action
+        ('created', 'added', 'replaced' or 'skipped') and the bytes it adds.
+        """
+        edits = []
+        changes = []
+        appended = {}           # export name -> [rendered variant, ...]
+        new_variants = {key: [] for key in self.components}
+        seen = set()
+
+        for component, key, languages, replace in self.variants:
+            if (component, key) in seen:
+                raise ManifestError(f"Duplicate manifest entry {component}/{key}")
+            seen.add((component, key))
+            rendered = render_variant(key, languages)
+
+            if component in self.components:
+                new_variants[component].append((key, languages))
+                changes.append(_change('added', component, key, rendered))
+                continue
+
+            export_name, export = self.catalog.resolve(component)
+            variant = export['variants'].get(key)
+            if variant is None:
+                appended.setdefault(export_name, []).append(rendered)
+                changes.append(_change('added', component, key, rendered))
+            elif replace:
+                start, end = variant['start'], variant['close'] + 1
+                edits.append((start, end - start, rendered.lstrip().encode()))
+                changes.append(_change('replaced', component, key, rendered, end - start))
+            else:
+                changes.append(_change('skipped', component, key, ''))
+
+        for export_name, rendered in appended.items():
+            edits.append(self.catalog.variants_edit(export_name, ',\n\n'.join(rendered)))
+
+        for key, info in self.components.items():
+            source = render_export(info['export'], info['title'], new_variants[key])
+            edits.extend(self.catalog.export_edits(source, info['after'], key, info['export']))
+            # Variant bytes are reported on their own rows
+            variant_bytes = sum(c['bytes'] for c in changes if c['component'] == key)
+            changes.insert(0, _change('created', key, None, source, variant_bytes))
+
+        return edits, changes
+
+    def commit(self, dry_run=False):
+        """
+        Apply all queued entries with a single atomic write; return the changes.
+
+        Raises IntegrityError (also on a dry run) if a sample would break a
+        template literal or leave its brackets unbalanced.
+        """
+        edits, changes = self.plan()
+        if edits and dry_run:
+            self.catalog.check_edits(sorted(edits, key=lambda e: e[0]))
+        elif edits:
+            self.catalog.apply_edits(edits)
+        return changes
+
+
+def _change(action, component, variant, rendered, removed=0):
+    return {'action': action, 'component': component, 'variant': variant,
+            'bytes': len(rendered.encode()) - removed}
+
+
+def load_manifest(path):
+    """Read a JSON or YAML manifest and inline any {"file": ...} language values."""
+    with open(path) as f:
+        text = f.read()
+    if str(path).endswith(('.yaml', '.yml')):
+        try:
+            import yaml
+        except ImportError:
+            raise ManifestError("YAML manifests need PyYAML (pip install pyyaml); use JSON instead")
+        manifest = yaml.safe_load(text)
+    else:
+        manifest = json.loads(text)
+
+    base = os.path.dirname(os.path.abspath(path))
+    for entry in manifest.get('variants', []):
+        for language in LANGUAGES:
+            value = entry.get(language)
+            if isinstance(value, dict) and 'file' in value:
+                with open(os.path.join(base, value['file'])) as f:
+                    entry[language] = f.read()
+    return manifest
+
+
+def batch_from_manifest(catalog, manifest):
+    """Build a VariantBatch from a parsed manifest."""
+    batch = VariantBatch(catalog)
+    try:
+        for entry in manifest.get('components', []):
+            batch.add_component(entry['key'], entry['export'], entry['after'], entry.get('title'))
+        for entry in manifest.get('variants', []):
+            languages = {language: entry[language] for language in LANGUAGES if language in entry}
+            batch.add_variant(entry['component'], entry['variant'], languages,
+                              entry.get('replace', False))
+    except KeyError as e:
+        raise ManifestError(f"Manifest entry is missing {e}")
+    except CatalogError as e:
+        raise ManifestError(str(e))
+    return batch
@@ -0,0 +1,275 @@
+"""
+Scale benchmarks for the code variant tooling.
+
+`generate_variants_file()` and `generate_story_tree()` build synthetic
+inputs N times the size of today's codeVariants.ts and story tree: every
+examples object is repeated under a new export name (and registered in the
+getCodeVariants() table), and every story file is copied into N sibling
+trees. The phases below are then timed on them, each in a fresh
+interpreter so its peak RSS is its own:
+
+- parse   - full catalog build of the variants file (no cache)
+- verify  - coverage scan of every story file, single process
+- bulk    - add-code-variants-bulk insertion into every story
+- insert  - insert_variants() into the first component (rewrites the
+            whole file after it, the worst case)
+
+Results are appended to a JSON-lines history, one compact line per run:
+
+    {"date": ..., "commit": ..., "host": ..., "results":
+        {"1": {"parse": {"ms": 95.1, "mb_s": 20.8, "rss_kb": 41200}, ...}}}
+
+`find_regressions()` compares a run against the median of the previous
+runs on the same host: throughput (input MB/s, so a growing tree does not
+look like a slowdown) and peak RSS each have a tolerance.
+"""
+
+import json
+import os
+import platform
+import runpy
+import shutil
+import statistics
+import subprocess
+import sys
+import time
+
+from .paths import CACHE_DIR, REPO_ROOT, STORIES_DIR, VARIANTS_FILE
+
+PHASES = ('parse', 'verify', 'bulk', 'insert')
+DEFAULT_SCALES = (1, 5, 10, 50)
+HISTORY_FILE = CACHE_DIR / 'bench-history.jsonl'
+# Previous runs the median baseline is taken from
+BASELINE_RUNS = 5
+
+_SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+_INSERT_SOURCE = '''  benchmark{n}: {{
+    react: `export const Benchmark{n} = () => <div>benchmark</div>;`,
+    vanilla: `<div class="benchmark">benchmark</div>`,
+    extjs: `Ext.create('Ext.Component', {{ html: 'benchmark' }});`,
+    typescript: `const benchmark{n}: string = 'benchmark';`,
+  }},'''
+
+
+# ----------------------------------------------------------------------
+# Synthetic inputs
+# ----------------------------------------------------------------------
+
+def generate_variants_file(out_path, scale, source=VARIANTS_FILE):
+    """
+    Write a variants file with `scale` copies of every examples object.
+
+    Copy n of `buttonExamples` is `buttonX{n}Examples`, mapped as
+    `buttonx{n}`; copy 0 is the original. Returns the output size in bytes.
+    """
+    from .catalog import VariantCatalog
+
+    with open(source, 'rb') as f:
+        data = f.read()
+    catalog = VariantCatalog.build(str(source), data, cache_dir=CACHE_DIR)
+    function = catalog.function
+    exports = list(catalog.exports.items())
+    mapping = list(function['mapping'].items())
+
+    # New table entries go on their own lines before the table's '}'
+    table_end = data.rfind(b'\n', 0, function['mapping_close']) + 1
+
+    with open(out_path, 'wb') as out:
+        out.write(data[:function['start']])
+        for n in range(1, scale):
+            for name, entry in exports:
+                statement = data[entry['start']:entry['end']]
+                out.write(statement.replace(name.encode(), _copy_name(name, n).encode(), 1) + b'\n\n')
+        out.write(data[function['start']:table_end])
+        for n in range(1, scale):
+            for key, entry in mapping:
+                out.write(f"    {key}x{n}: {_copy_name(entry['export'], n)},\n".encode())
+        out.write(data[table_end:])
+    return os.path.getsize(out_path)
+
+
+def _copy_name(export_name, n):
+    if export_name.endswith('Examples'):
+        return f"{export_name[:-len('Examples')]}X{n}Examples"
+    return f'{export_name}X{n}'
+
+
+def generate_story_tree(out_dir, scale, source=STORIES_DIR):
+    """
+    Copy every .stories.tsx file under `source` into `scale` sibling trees
+    (out_dir/copy0, copy1, ...). Returns the total size in bytes.
+    """
+    from .coverage import find_story_files
+
+    total = 0
+    for path in find_story_files(str(source)):
+        rel_path = os.path.relpath(path, source)
+        for n in range(scale):
+            target = os.path.join(out_dir, f'copy{n}', rel_path)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(path, target)
+            total += os.path.getsize(target)
+    return total
+
+
+# ----------------------------------------------------------------------
+# Phases (run in a child interpreter, see run_phase_process)
+# ----------------------------------------------------------------------
+
+def _best_ms(func, repeat):
+    """Run func() `repeat` times; return the fastest run in milliseconds."""
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = (time.perf_counter() - start) * 1000
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def phase_parse(variants_file, stories_dir, repeat):
+    from .catalog import VariantCatalog
+    return _best_ms(lambda: VariantCatalog.build(variants_file), repeat), os.path.getsize(variants_file)
+
+
+def phase_verify(variants_file, stories_dir, repeat):
+    from .coverage import extract_stories_from_file, find_story_files, summarize
+
+    def scan():
+        files = find_story_files(stories_dir)
+        summarize({path: extract_stories_from_file(path) for path in files}, stories_dir)
+
+    return _best_ms(scan, repeat), _tree_size(stories_dir)
+
+
+def phase_bulk(variants_file, stories_dir, repeat):
+    from .coverage import find_story_files
+    from .stories import scan_stories
+
+    bulk = runpy.run_path(os.path.join(_SCRIPTS_DIR, 'add-code-variants-bulk.py'))
+    insert_code_variants = bulk['insert_code_variants']
+    files = find_story_files(stories_dir)
+
+    def add_all():
+        for path in files:
+            with open(path, 'rb') as f:
+                data = f.read()
+            pairs = [(story.name, 'default') for story in scan_stories(data)[1]]
+            insert_code_variants(data.decode(), 'button', pairs, log=lambda _: None)
+
+    return _best_ms(add_all, repeat), _tree_size(stories_dir)
+
+
+def phase_insert(variants_file, stories_dir, repeat):
+    from .catalog import VariantCatalog
+
+    scratch = variants_file + '.insert'
+    shutil.copyfile(variants_file, scratch)
+    catalog = VariantCatalog.build(scratch, cache_dir=os.path.dirname(scratch))
+    first = next(iter(catalog.exports))
+    counter = iter(range(repeat))
+    try:
+        ms = _best_ms(lambda: catalog.insert_variants(first, _INSERT_SOURCE.format(n=next(counter))),
+                      repeat)
+    finally:
+        os.unlink(scratch)
+    return ms, os.path.getsize(variants_file)
+
+
+def _tree_size(directory):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(directory) for name in names)
+
+
+def peak_rss_kb():
+    """Peak resident set size of this process, in KiB."""
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == 'darwin' else peak   # bytes on macOS
+
+
+def run_phase(phase, variants_file, stories_dir, repeat):
+    """Time one phase in this process; returns its result dict."""
+    ms, size = globals()[f'phase_{phase}'](variants_file, stories_dir, repeat)
+    return {'ms': round(ms, 1), 'mb_s': round(size / 1e6 / (ms / 1000), 2), 'rss_kb': peak_rss_kb()}
+
+
+def run_phase_process(script, phase, variants_file, stories_dir, repeat):
+    """Run one phase in a fresh interpreter (`script --phase ...`), for a clean RSS peak."""
+    output = subprocess.run(
+        [sys.executable, script, '--phase', phase, '--variants-file', variants_file,
+         '--stories-dir', stories_dir, '--repeat', str(repeat)],
+        check=True, stdout=subprocess.PIPE, text=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+# ----------------------------------------------------------------------
+# History
+# ----------------------------------------------------------------------
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT,
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def new_record(results, repeat):
+    """Wrap a {scale: {phase: result}} dict into a history record."""
+    return {
+        'date': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': _git_commit(),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'repeat': repeat,
+        'results': {str(scale): phases for scale, phases in results.items()},
+    }
+
+
+def load_history(path=HISTORY_FILE):
+    """Return every record in the history file (oldest first)."""
+    records = []
+    try:
+        with open(path) as f:
+            for line in f:
+                if line.strip():
+                    records.append(json.loads(line))
+    except FileNotFoundError:
+        pass
+    return records
+
+
+def append_history(record, path=HISTORY_FILE):
+    os.makedirs(os.path.dirname(str(path)), exist_ok=True)
+    with open(path, 'a') as f:
+        f.write(json.dumps(record, separators=(',', ':')) + '\n')
+
+
+def find_regressions(record, history, time_tolerance=0.25, rss_tolerance=0.15):
+    """
+    Compare `record` with the median of the last BASELINE_RUNS runs on the
+    same host.
+
+    Returns:
+        List of (scale, phase, metric, baseline, current) for every result
+        whose throughput dropped by more than `time_tolerance` or whose
+        peak RSS grew by more than `rss_tolerance` (fractions)
+    """
+    previous = [r for r in history if r.get('host') == record['host']][-BASELINE_RUNS:]
+    regressions = []
+    for scale, phases in record['results'].items():
+        for phase, current in phases.items():
+            past = [r['results'][scale][phase] for r in previous
+                    if phase in r['results'].get(scale, {})]
+            if not past:
+                continue
+            mb_s = statistics.median(p['mb_s'] for p in past)
+            rss_kb = statistics.median(p['rss_kb'] for p in past)
+            if current['mb_s'] < mb_s * (1 - time_tolerance):
+                regressions.append((scale, phase, 'mb_s', mb_s, current['mb_s']))
+            if current['rss_kb'] > rss_kb * (1 + rss_tolerance):
+                regressions.append((scale, phase, 'rss_kb', rss_kb, current['rss_kb']))
+    return regressions
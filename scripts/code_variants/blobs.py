@@ -0,0 +1,276 @@
+"""
+Precompressed code variant payload, decompressed per tab in the browser.
+
+`write_blobs()` turns codeVariants.ts into `codeVariants.blobs/`:
+
+- `<key>.bin`     - one file per component: every variant/language string
+                    gzip-compressed on its own and concatenated
+- `manifest.json` - offset, compressed size and raw size of each segment
+- `index.ts`      - loaders that fetch a component's blob once and inflate
+                    only the requested segment with `DecompressionStream`
+- `MultiLanguageCode.tsx` - same props as the eager block; each tab's code
+                    is decompressed when the tab is first opened
+
+Segments are independent gzip members rather than one stream per
+component so any tab can be decoded without the ones before it. Browsers
+only ship gzip/deflate in `DecompressionStream`, so there is no shared
+dictionary; `benchmark()` shows what the per-segment split costs against
+compressing each component whole.
+"""
+
+import gzip
+import json
+import os
+import time
+
+from .catalog import LANGUAGES
+from .fileio import write_if_changed
+from .paths import BLOCKS_DIR
+
+BLOBS_DIR = BLOCKS_DIR / 'codeVariants.blobs'
+MANIFEST_VERSION = 1
+
+GENERATED_HEADER = (
+    '// Generated by scripts/build-code-variant-blobs.py from codeVariants.ts.\n'
+    '// Do not edit by hand; re-run the build script instead.\n'
+)
+
+
+def compress_segment(code):
+    """Gzip one language string; mtime is fixed so output is reproducible."""
+    return gzip.compress(code.encode(), compresslevel=9, mtime=0)
+
+
+def build_blob(variants):
+    """
+    Pack one component's variants.
+
+    Args:
+        variants: List of (variant_key, {language: code}) in file order
+
+    Returns:
+        (blob bytes, {variant_key: {language: [offset, size, raw_size]}})
+    """
+    chunks = []
+    offsets = {}
+    offset = 0
+    for key, languages in variants:
+        entry = offsets[key] = {}
+        for language in LANGUAGES:
+            raw = languages.get(language, '')
+            segment = compress_segment(raw)
+            entry[language] = [offset, len(segment), len(raw.encode())]
+            chunks.append(segment)
+            offset += len(segment)
+    return b''.join(chunks), offsets
+
+
+def collect_variants(catalog):
+    """Return {component key: [(variant_key, {language: code}), ...]}."""
+    by_export = {}
+    for export_name, key, languages in catalog.iter_variants():
+        by_export.setdefault(export_name, []).append((key, languages))
+    return {key: by_export[export_name] for key, export_name in catalog.mapping.items()
+            if export_name in by_export}
+
+
+def blob_sources(components):
+    """Return ({file name: bytes}, manifest) for every generated file."""
+    files = {}
+    manifest = {'version': MANIFEST_VERSION, 'components': {}}
+    for key, variants in components.items():
+        blob, offsets = build_blob(variants)
+        files[f'{key}.bin'] = blob
+        manifest['components'][key] = {
+            'file': f'{key}.bin',
+            'bytes': len(blob),
+            'variants': offsets,
+        }
+    files['manifest.json'] = json.dumps(manifest, separators=(',', ':')).encode()
+    urls = '\n'.join(f"  {key}: new URL('./{key}.bin', import.meta.url).href,"
+                     for key in components)
+    files['index.ts'] = (GENERATED_HEADER + _INDEX_TEMPLATE
+                         .replace('{languages}', json.dumps(list(LANGUAGES)))
+                         .replace('{urls}', urls)).encode()
+    files['MultiLanguageCode.tsx'] = (GENERATED_HEADER + _COMPONENT_SOURCE).encode()
+    return files, manifest
+
+
+def write_blobs(catalog, out_dir=BLOBS_DIR):
+    """
+    Generate the blob directory from a catalog.
+
+    Returns:
+        (report, components) where report has 'written', 'unchanged' and
+        'removed' file name lists and components is collect_variants()
+    """
+    components = collect_variants(catalog)
+    files, _ = blob_sources(components)
+
+    os.makedirs(out_dir, exist_ok=True)
+    report = {'written': [], 'unchanged': [], 'removed': []}
+    for name, data in files.items():
+        written = write_if_changed(os.path.join(out_dir, name), data)
+        report['written' if written else 'unchanged'].append(name)
+
+    # Drop blobs of components that no longer exist
+    for name in sorted(os.listdir(out_dir)):
+        if name.endswith('.bin') and name not in files:
+            os.remove(os.path.join(out_dir, name))
+            report['removed'].append(name)
+    return report, components
+
+
+def benchmark(components, repeat=5):
+    """
+    Compare raw and compressed size and decode time for each component.
+
+    Raw decode is the UTF-8 decode of the plain strings; compressed decode
+    inflates every segment. `whole_gzip_bytes` is the size if the component
+    were compressed as one stream (the cost of per-tab random access).
+
+    Returns:
+        {component key: {'raw_bytes', 'blob_bytes', 'whole_gzip_bytes',
+                         'segments', 'raw_decode_us', 'inflate_us'}}
+    """
+    results = {}
+    for key, variants in components.items():
+        raw = [languages.get(language, '').encode()
+               for _, languages in variants for language in LANGUAGES]
+        segments = [gzip.compress(data, compresslevel=9, mtime=0) for data in raw]
+        results[key] = {
+            'raw_bytes': sum(map(len, raw)),
+            'blob_bytes': sum(map(len, segments)),
+            'whole_gzip_bytes': len(gzip.compress(b''.join(raw), compresslevel=9, mtime=0)),
+            'segments': len(segments),
+            'raw_decode_us': _best_time(lambda: [data.decode() for data in raw], repeat),
+            'inflate_us': _best_time(
+                lambda: [gzip.decompress(data).decode() for data in segments], repeat),
+        }
+    return results
+
+
+def _best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e6
+
+
+_INDEX_TEMPLATE = '''
+import type { CodeVariant } from '../codeVariants';
+import type { LazyCodeVariant } from '../MultiLanguageCodeView';
+import manifest from './manifest.json';
+
+type Language = keyof CodeVariant;
+// [offset, compressed size, raw size] within the component's blob
+type Segment = [number, number, number];
+
+interface ComponentEntry {
+  file: string;
+  bytes: number;
+  variants: Record<string, Record<Language, Segment>>;
+}
+
+const languages = {languages} as Language[];
+const components = (manifest as unknown as { components: Record<string, ComponentEntry> }).components;
+
+// Literal new URL() calls let Vite emit each blob as an asset
+const blobUrls: Record<string, string> = {
+{urls}
+};
+
+const blobs = new Map<string, Promise<ArrayBuffer>>();
+const decoded = new Map<string, Promise<string>>();
+const loaderSets = new Map<string, LazyCodeVariant>();
+
+function fetchBlob(key: string): Promise<ArrayBuffer> {
+  let blob = blobs.get(key);
+  if (!blob) {
+    blob = fetch(blobUrls[key]).then((response) => {
+      if (!response.ok) {
+        throw new Error(`Failed to load code examples for ${key}: ${response.status}`);
+      }
+      return response.arrayBuffer();
+    });
+    blob.catch(() => blobs.delete(key));
+    blobs.set(key, blob);
+  }
+  return blob;
+}
+
+async function inflate(bytes: Uint8Array): Promise<string> {
+  const stream = new Blob([bytes]).stream().pipeThrough(new DecompressionStream('gzip'));
+  return new Response(stream).text();
+}
+
+// Fetch (once) the component's blob and inflate one language of one example
+export function loadCode(
+  componentName: string,
+  exampleName: string,
+  language: Language
+): Promise<string> {
+  const key = componentName.toLowerCase();
+  const cacheKey = `${key}/${exampleName}/${language}`;
+  let code = decoded.get(cacheKey);
+  if (!code) {
+    const [offset, size] = components[key].variants[exampleName][language];
+    code = fetchBlob(key).then((buffer) => inflate(new Uint8Array(buffer, offset, size)));
+    code.catch(() => decoded.delete(cacheKey));
+    decoded.set(cacheKey, code);
+  }
+  return code;
+}
+
+// Same lookup as getCodeVariants() in codeVariants.ts, but each language is a loader
+export function getCodeVariantLoaders(
+  componentName: string,
+  exampleName: string
+): LazyCodeVariant | null {
+  const component = components[componentName.toLowerCase()];
+  if (!component) {
+    console.warn(`No code examples found for component: ${componentName}`);
+    return null;
+  }
+  if (!component.variants[exampleName]) {
+    console.warn(`No example "${exampleName}" found for component: ${componentName}`);
+    return null;
+  }
+
+  // Stable loader identities, so the Code block does not reload on re-render
+  const cacheKey = `${componentName.toLowerCase()}/${exampleName}`;
+  let loaders = loaderSets.get(cacheKey);
+  if (!loaders) {
+    loaders = {} as LazyCodeVariant;
+    for (const language of languages) {
+      loaders[language] = () => loadCode(componentName, exampleName, language);
+    }
+    loaderSets.set(cacheKey, loaders);
+  }
+  return loaders;
+}
+'''
+
+_COMPONENT_SOURCE = '''
+import React from 'react';
+import { MultiLanguageCodeView } from '../MultiLanguageCodeView';
+import { getCodeVariantLoaders } from './index';
+
+interface MultiLanguageCodeProps {
+  componentName: string;
+  exampleName: string;
+}
+
+export function MultiLanguageCode({ componentName, exampleName }: MultiLanguageCodeProps) {
+  return (
+    <MultiLanguageCodeView
+      componentName={componentName}
+      exampleName={exampleName}
+      variants={getCodeVariantLoaders(componentName, exampleName)}
+    />
+  );
+}
+'''
@@ -0,0 +1,492 @@
+"""
+Shipped-byte attribution for a storybook-static build.
+
+Reads every JavaScript chunk of a build together with its source map and
+hands each generated byte back to the original position it came from.
+Bytes that come from codeVariants.ts are then placed, through the catalog
+parser, in their examples object, variant and language tab; bytes from
+.stories.* files are attributed to the story file.
+
+The result is a list of `Piece`s, one per (chunk, source, component,
+variant, language), which `aggregate()` sums at any level:
+
+- component  examples objects of codeVariants.ts, by component key
+- variant    component/variant
+- language   component/variant/language (one template literal)
+- tab        language totals over all components
+- story      story files
+- source     every source file (node_modules collapsed per package)
+- chunk      output chunks (hash suffixes stripped)
+
+Minified bytes add up exactly. Gzip does not split that way, so each
+chunk's real gzip size is shared out in proportion to the standalone
+deflate size of each piece's bytes: the totals match the chunk, and
+repetitive code (which compresses well) gets less than its raw share.
+
+Source maps are read as written by Vite/Rollup (`mappings` version 3,
+index maps with `sections` included). Original positions are resolved
+against the map's `sourcesContent` when present, so the attribution
+matches the build even after codeVariants.ts has changed; otherwise the
+file on disk is used.
+
+Usage:
+    from code_variants.bundle import aggregate, analyze_build
+
+    report = analyze_build('storybook/storybook-static')
+    for row in aggregate(report['pieces'], 'component')[:10]:
+        print(row.key, row.min, row.gzip)
+"""
+
+import bisect
+import gzip
+import json
+import os
+import re
+import time
+import zlib
+from collections import namedtuple
+
+from . import tracing
+from .catalog import parse_region
+from .paths import REPO_ROOT, STORYBOOK_DIR, VARIANTS_FILE
+
+STATIC_DIR = STORYBOOK_DIR / 'storybook-static'
+
+# Bump when the report layout changes; older baselines are refused
+REPORT_VERSION = 1
+
+LEVELS = ('component', 'variant', 'language', 'tab', 'story', 'source', 'chunk')
+
+# Labels for bytes that have no finer attribution
+UNMAPPED = '(unmapped)'
+OUTSIDE_EXAMPLES = '(outside examples)'
+STRUCTURE = '(structure)'
+
+Piece = namedtuple('Piece', 'chunk source component variant language min gzip')
+Row = namedtuple('Row', 'key min gzip')
+
+_BASE64 = {char: value for value, char in
+           enumerate('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/')}
+_SOURCE_MAPPING_URL = re.compile(rb'//[#@]\s*sourceMappingURL=(\S+)\s*$')
+# assets/[name]-<timestamp>-<random>.js (see .storybook/main.ts), else Rollup's [name]-[hash]
+_CACHE_BREAKER_SUFFIX = re.compile(r'-\d{10,}-[0-9a-z]+(?=\.m?js$)')
+_HASH_SUFFIX = re.compile(r'-[A-Za-z0-9_-]{8}(?=\.m?js$)')
+
+
+# ----------------------------------------------------------------------
+# Source maps
+# ----------------------------------------------------------------------
+
+def decode_mappings(mappings):
+    """
+    Decode a source map `mappings` string.
+
+    Returns:
+        One list per generated line of (column, source, line, column)
+        tuples, in UTF-16 columns; segments without a source have
+        source None.
+    """
+    lines = []
+    source = orig_line = orig_col = name = 0
+    for text in mappings.split(';'):
+        segments = []
+        gen_col = 0
+        for segment in text.split(','):
+            if not segment:
+                continue
+            values = []
+            value = shift = 0
+            for char in segment:
+                digit = _BASE64[char]
+                value += (digit & 31) << shift
+                if digit & 32:
+                    shift += 5
+                else:
+                    values.append(-(value >> 1) if value & 1 else value >> 1)
+                    value = shift = 0
+            gen_col += values[0]
+            if len(values) >= 4:
+                source += values[1]
+                orig_line += values[2]
+                orig_col += values[3]
+                if len(values) >= 5:
+                    name += values[4]
+                segments.append((gen_col, source, orig_line, orig_col))
+            else:
+                segments.append((gen_col, None, None, None))
+        lines.append(segments)
+    return lines
+
+
+def flatten_map(source_map, map_dir):
+    """
+    Return (sources, contents, lines) for a source map, resolving index
+    maps (`sections`) into one list of generated lines.
+
+    Args:
+        source_map: The parsed JSON
+        map_dir: Directory of the map file; sources are resolved from it
+    """
+    if 'sections' in source_map:
+        sources, contents, lines = [], [], []
+        for section in source_map['sections']:
+            sub_sources, sub_contents, sub_lines = flatten_map(section['map'], map_dir)
+            base = len(sources)
+            sources.extend(sub_sources)
+            contents.extend(sub_contents)
+            offset = section['offset']
+            while len(lines) <= offset['line']:
+                lines.append([])
+            for index, segments in enumerate(sub_lines):
+                col_shift = offset['column'] if index == 0 else 0
+                shifted = [(col + col_shift, None if src is None else src + base, line, column)
+                           for col, src, line, column in segments]
+                row = offset['line'] + index
+                while len(lines) <= row:
+                    lines.append([])
+                lines[row].extend(shifted)
+        return sources, contents, lines
+
+    root = source_map.get('sourceRoot') or ''
+    sources = [_source_key(os.path.join(map_dir, root, source)) for source in source_map['sources']]
+    contents = list(source_map.get('sourcesContent') or [])
+    contents += [None] * (len(sources) - len(contents))
+    return sources, contents, decode_mappings(source_map['mappings'])
+
+
+def _source_key(path):
+    """Repo-relative source path; node_modules collapsed to the package."""
+    path = os.path.normpath(path.split('?')[0].replace('\\', '/')).replace('\\', '/')
+    if 'node_modules/' in path:
+        parts = path.rsplit('node_modules/', 1)[1].split('/')
+        return 'node_modules/' + '/'.join(parts[:2] if parts[0].startswith('@') else parts[:1])
+    try:
+        relative = os.path.relpath(path, REPO_ROOT)
+    except ValueError:
+        return path
+    return path if relative.startswith('..') else relative.replace(os.sep, '/')
+
+
+class _Lines:
+    """(line, UTF-16 column) -> byte offset for a UTF-8 buffer."""
+
+    def __init__(self, data):
+        self.data = data
+        self.starts = [0] + [match.end() for match in re.finditer(rb'\n', data)]
+        self._units = {}
+
+    def line_end(self, line):
+        return self.starts[line + 1] - 1 if line + 1 < len(self.starts) else len(self.data)
+
+    def offset(self, line, column):
+        if line >= len(self.starts):
+            return len(self.data)
+        start = self.starts[line]
+        if line not in self._units:
+            text = self.data[start:self.line_end(line)]
+            units = None
+            if not text.isascii():
+                # Byte offset of every UTF-16 unit of a line with non-ASCII text
+                units = [0]
+                for char in text.decode('utf-8', 'replace'):
+                    size = len(char.encode('utf-8'))
+                    if ord(char) > 0xFFFF:
+                        units.append(units[-1] + size)
+                    units.append(units[-1] + size)
+            self._units[line] = units
+        units = self._units[line]
+        if units is None:
+            return min(start + column, self.line_end(line))
+        return start + units[min(column, len(units) - 1)]
+
+
+# ----------------------------------------------------------------------
+# codeVariants.ts positions
+# ----------------------------------------------------------------------
+
+class VariantLocator:
+    """Byte offset in codeVariants.ts -> (component, variant, language)."""
+
+    def __init__(self, data):
+        exports, function = parse_region(data)
+        keys = {}
+        for key, entry in (function or {}).get('mapping', {}).items():
+            keys.setdefault(entry['export'], key)
+        self.spans = []
+        for name, entry in exports.items():
+            end = entry['end'] or (entry['close'] + 1 if entry['close'] is not None else entry['start'])
+            variants = []
+            for variant, value in entry['variants'].items():
+                languages = sorted((start, stop, language)
+                                   for language, (start, stop) in value['languages'].items())
+                close = value['close'] + 1 if value['close'] is not None else value['open'] + 1
+                variants.append((value['start'], close, variant, languages))
+            variants.sort()
+            self.spans.append((entry['start'], end, keys.get(name, name), variants))
+        self.spans.sort()
+        self._starts = [span[0] for span in self.spans]
+
+    def locate(self, offset):
+        index = bisect.bisect_right(self._starts, offset) - 1
+        if index < 0 or offset >= self.spans[index][1]:
+            return OUTSIDE_EXAMPLES, None, None
+        _, _, component, variants = self.spans[index]
+        index = bisect.bisect_right(variants, (offset, float('inf'))) - 1
+        if index < 0 or offset >= variants[index][1]:
+            return component, STRUCTURE, None
+        _, _, variant, languages = variants[index]
+        for start, stop, language in languages:
+            if start <= offset < stop:
+                return component, variant, language
+        return component, variant, STRUCTURE
+
+
+_locators = {}
+
+
+def _variant_locator(content):
+    """One VariantLocator per distinct codeVariants.ts text (per process)."""
+    data = content.encode('utf-8') if content is not None else VARIANTS_FILE.read_bytes()
+    key = zlib.crc32(data), len(data)
+    if key not in _locators:
+        with tracing.phase('parse-variants', str(VARIANTS_FILE), len(data)):
+            _locators[key] = (VariantLocator(data), _Lines(data))
+    return _locators[key]
+
+
+def is_variants_source(source):
+    return source.endswith('/' + VARIANTS_FILE.name) or source == VARIANTS_FILE.name
+
+
+def is_story_source(source):
+    return '.stories.' in os.path.basename(source)
+
+
+# ----------------------------------------------------------------------
+# Chunks
+# ----------------------------------------------------------------------
+
+def chunk_name(path, static_dir):
+    """Chunk path relative to the build with cache-breaking hashes removed."""
+    name = os.path.relpath(path, static_dir).replace(os.sep, '/')
+    stripped = _CACHE_BREAKER_SUFFIX.sub('', name)
+    return stripped if stripped != name else _HASH_SUFFIX.sub('', name)
+
+
+def find_chunks(static_dir):
+    """Every .js/.mjs file of a build, sorted."""
+    found = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs.sort()
+        found.extend(os.path.join(root, name) for name in sorted(files)
+                     if name.endswith(('.js', '.mjs')))
+    return found
+
+
+def _find_map(path, data):
+    match = _SOURCE_MAPPING_URL.search(data[-4096:])
+    if match:
+        url = match.group(1).decode('utf-8', 'replace')
+        if url.startswith('data:'):
+            import base64
+            header, _, payload = url.partition(',')
+            return json.loads(base64.b64decode(payload) if ';base64' in header else payload), \
+                os.path.dirname(path)
+        candidate = os.path.join(os.path.dirname(path), url.split('?')[0])
+        if os.path.exists(candidate):
+            with open(candidate) as f:
+                return json.load(f), os.path.dirname(candidate)
+    if os.path.exists(path + '.map'):
+        with open(path + '.map') as f:
+            return json.load(f), os.path.dirname(path)
+    return None, None
+
+
+def _deflated_size(fragments):
+    compressor = zlib.compressobj(9, zlib.DEFLATED, -15)
+    size = 0
+    for fragment in fragments:
+        size += len(compressor.compress(fragment))
+    return size + len(compressor.flush())
+
+
+def analyze_chunk(job):
+    """
+    Attribute the bytes of one chunk.
+
+    Args:
+        job: (chunk path, build directory)
+
+    Returns:
+        (file entry, list of Piece tuples)
+    """
+    path, static_dir = job
+    name = chunk_name(path, static_dir)
+    with tracing.phase('chunk', path) as span:
+        with open(path, 'rb') as f:
+            data = f.read()
+        span['bytes'] = len(data)
+        gzip_size = len(gzip.compress(data, 9, mtime=0))
+        entry = {'file': os.path.relpath(path, static_dir).replace(os.sep, '/'), 'chunk': name,
+                 'min': len(data), 'gzip': gzip_size, 'mapped': False}
+
+        try:
+            source_map, map_dir = _find_map(path, data)
+        except (OSError, ValueError) as e:
+            entry['error'] = f"unreadable source map: {e}"
+            source_map = None
+        if source_map is None:
+            return entry, [Piece(name, UNMAPPED, None, None, None, len(data), gzip_size)]
+        entry['mapped'] = True
+
+        with tracing.phase('decode'):
+            sources, contents, lines = flatten_map(source_map, map_dir)
+
+        with tracing.phase('attribute'):
+            generated = _Lines(data)
+            resolvers = {}
+            fragments = {}
+            unmapped = (UNMAPPED, None, None, None)
+
+            def resolve(source, line, column):
+                key = sources[source]
+                if not is_variants_source(key):
+                    return key, None, None, None
+                if source not in resolvers:
+                    resolvers[source] = _variant_locator(contents[source])
+                locator, original = resolvers[source]
+                return (key, *locator.locate(original.offset(line, column)))
+
+            # A mapping covers the bytes up to the next one, across line ends:
+            # multi-line template literals get a single mapping at their start
+            marks = []
+            for line, segments in enumerate(lines[:len(generated.starts)]):
+                for column, source, orig_line, orig_col in sorted(segments):
+                    key = unmapped if source is None or source >= len(sources) \
+                        else resolve(source, orig_line, orig_col)
+                    marks.append((generated.offset(line, column), key))
+            comment = _SOURCE_MAPPING_URL.search(data, max(len(data) - 4096, 0))
+            marks.append((comment.start() if comment else len(data), unmapped))
+            marks.sort(key=lambda mark: mark[0])
+            covered, key = 0, unmapped
+            for offset, next_key in marks:
+                if offset > covered:
+                    fragments.setdefault(key, []).append(data[covered:offset])
+                    covered = offset
+                key = next_key
+            if covered < len(data):
+                fragments.setdefault(unmapped, []).append(data[covered:])
+
+        with tracing.phase('gzip'):
+            deflated = {key: _deflated_size(parts) for key, parts in fragments.items()}
+            scale = gzip_size / (sum(deflated.values()) or 1)
+            pieces = [Piece(name, source, component, variant, language,
+                            sum(len(part) for part in parts), round(deflated[key] * scale))
+                      for key, parts in fragments.items()
+                      for source, component, variant, language in [key]]
+    return entry, pieces
+
+
+def analyze_build(static_dir=STATIC_DIR, jobs=None):
+    """
+    Attribute every JavaScript byte of a storybook-static build.
+
+    Args:
+        static_dir: The build directory
+        jobs: Worker processes (None = CPU count, 1 = analyze in this process)
+
+    Returns:
+        Report dict: version, build, files, totals and pieces (as dicts,
+        ready for JSON; see `Piece` for the fields)
+    """
+    static_dir = str(static_dir)
+    if not os.path.isdir(static_dir):
+        raise FileNotFoundError(f"No build at {static_dir} (run storybook build first)")
+    chunks = [(path, static_dir) for path in find_chunks(static_dir)]
+    if len(chunks) > 1 and jobs != 1 and not tracing.enabled():
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(analyze_chunk, chunks))
+    else:
+        results = [analyze_chunk(job) for job in chunks]
+
+    files = [entry for entry, _ in results]
+    pieces = [piece._asdict() for _, chunk_pieces in results for piece in chunk_pieces]
+    return {
+        'version': REPORT_VERSION,
+        'build': _source_key(os.path.abspath(static_dir)),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'files': files,
+        'totals': {'files': len(files), 'mapped': sum(1 for entry in files if entry['mapped']),
+                   'min': sum(entry['min'] for entry in files),
+                   'gzip': sum(entry['gzip'] for entry in files)},
+        'pieces': pieces,
+    }
+
+
+def load_report(path):
+    """Read a saved report (e.g. a previous build's) for `diff()`."""
+    with open(path) as f:
+        report = json.load(f)
+    if report.get('version') != REPORT_VERSION:
+        raise ValueError(f"{path} is a version {report.get('version')} report, "
+                         f"expected {REPORT_VERSION}")
+    return report
+
+
+# ----------------------------------------------------------------------
+# Aggregation
+# ----------------------------------------------------------------------
+
+def _level_key(piece, level):
+    source = piece['source']
+    if level == 'chunk':
+        return piece['chunk']
+    if level == 'source':
+        return source
+    if level == 'story':
+        return source if is_story_source(source) else None
+    if not is_variants_source(source):
+        return None
+    component, variant, language = piece['component'], piece['variant'], piece['language']
+    if level == 'component':
+        return component
+    if level == 'tab':
+        return language or STRUCTURE
+    if level == 'variant':
+        return f"{component}/{variant}" if variant else component
+    return '/'.join(part for part in (component, variant, language) if part)
+
+
+def aggregate(pieces, level):
+    """
+    Sum pieces at one of LEVELS.
+
+    Returns:
+        Rows sorted by gzip bytes, largest first
+    """
+    if level not in LEVELS:
+        raise ValueError(f"Unknown level '{level}' (expected one of {', '.join(LEVELS)})")
+    totals = {}
+    for piece in pieces:
+        key = _level_key(piece, level)
+        if key is None:
+            continue
+        row = totals.setdefault(key, [0, 0])
+        row[0] += piece['min']
+        row[1] += piece['gzip']
+    rows = [Row(key, size, packed) for key, (size, packed) in totals.items()]
+    rows.sort(key=lambda row: (-row.gzip, row.key))
+    return rows
+
+
+def diff(rows, baseline_rows):
+    """
+    Compare two aggregations of the same level.
+
+    Returns:
+        Dict key -> (Row or None, baseline Row or None) for every key in either
+    """
+    current = {row.key: row for row in rows}
+    previous = {row.key: row for row in baseline_rows}
+    return {key: (current.get(key), previous.get(key)) for key in current.keys() | previous.keys()}
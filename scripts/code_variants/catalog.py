@@ -0,0 +1,569 @@
+"""
+Byte-offset index of codeVariants.ts.
+
+`load_catalog()` parses the variants file once and records where every
+piece lives:
+
+- each `export const xxxExamples = { ... };` block
+- each variant key inside it (`default`, `withError`, 'with-icon', ...)
+- each language template literal (`react`, `vanilla`, `extjs`, `typescript`)
+- the `examples` mapping table inside `getCodeVariants()`
+
+The index is cached on disk under `.cache/code-variants/`, keyed by the
+file's mtime, size and SHA-256, so later runs skip parsing entirely.
+The file is parsed and hashed through a read-only memory map, lookups
+read only the bytes of the requested span, and insertions stream the
+unchanged bytes around the new text (see `fileio`) and re-index only the
+statement that changed.
+
+Usage:
+    from code_variants.catalog import load_catalog
+
+    catalog = load_catalog()
+    catalog.variant_keys('mediacard')          # ['default', 'product', ...]
+    catalog.read_variant('button', 'default')  # {'react': '...', ...}
+    catalog.insert_variants('mediacard', NEW_VARIANTS_SOURCE)
+"""
+
+import hashlib
+import json
+import os
+import re
+
+from . import lexer, tracing
+from .fileio import MappedFile, file_sha256, splice_write
+from .integrity import check_source
+from .journal import Journal
+from .paths import CACHE_DIR, VARIANTS_FILE
+
+# Bump when the index layout changes so stale caches are rebuilt
+CATALOG_VERSION = 1
+
+LANGUAGES = ('react', 'vanilla', 'extjs', 'typescript')
+
+_EXPORT_CONST = re.compile(rb'export\s+const\s+(\w+)[^=;]*=\s*$')
+_EXPORT_FUNCTION = re.compile(rb'export\s+function\s+(\w+)')
+_EXAMPLES_TABLE = re.compile(rb'const\s+examples\b[^=;]*=\s*$')
+_KEY_BEFORE_COLON = re.compile(rb'(\w+)\s*:\s*$')
+_COLON_ONLY = re.compile(rb'\s*:\s*$')
+_MAPPING_ENTRY = re.compile(rb'(\w+)\s*:\s*(\w+)[ \t]*,?')
+
+
+class CatalogError(Exception):
+    """Raised when a lookup or edit refers to something not in the file."""
+
+
+class IntegrityError(CatalogError):
+    """Raised instead of writing an edit that would break a template literal."""
+
+    def __init__(self, path, findings):
+        self.findings = findings
+        lines = [f"  {path}:{f.line}:{f.column}: {f.kind}: {f.message}" for f in findings[:10]]
+        if len(findings) > 10:
+            lines.append(f"  ... and {len(findings) - 10} more")
+        super().__init__("Edit rejected by the integrity check:\n" + "\n".join(lines))
+
+
+def parse_region(data, base=0):
+    """
+    Parse top-level statements in `data` into index entries.
+
+    Args:
+        data: Bytes that start at a top-level statement boundary
+        base: Absolute offset of data[0] in the file
+
+    Returns:
+        (exports, function) where exports maps export name to its entry and
+        function is the getCodeVariants entry (or None if not in `data`)
+    """
+    exports = {}
+    function = None
+
+    export = None           # export currently being parsed
+    variant = None          # variant object currently being parsed
+    pending_export = None   # (name, start) seen in code, waiting for '{'
+    pending_function = None
+    pending_key = None      # (key, start) waiting for '{' or a literal
+    pending_string = None   # quoted key waiting for its ':'
+    in_function = False
+    in_mapping = False
+    mapping_pending = False
+
+    for token in lexer.tokenize(data):
+        kind, start, end, depth = token
+        start += base
+        end += base
+        text = data[token.start:token.end] if kind in (lexer.CODE, lexer.STRING) else b''
+
+        if depth == 0:
+            if kind == lexer.CODE:
+                if export is not None and export['close'] is not None:
+                    # Include the statement terminator after the closing brace
+                    stripped = text.lstrip()
+                    export['end'] = export['close'] + 1
+                    if stripped.startswith(b';'):
+                        export['end'] = start + len(text) - len(stripped) + 1
+                    export = None
+                match = _EXPORT_CONST.search(text)
+                if match:
+                    pending_export = (match.group(1).decode(), start + match.start())
+                    continue
+                match = _EXPORT_FUNCTION.search(text)
+                if match:
+                    pending_function = (match.group(1).decode(), start + match.start())
+            elif kind == lexer.OPEN:
+                if pending_export is not None:
+                    name, export_start = pending_export
+                    export = {'start': export_start, 'open': start, 'close': None,
+                              'end': None, 'variants': {}}
+                    exports[name] = export
+                    pending_export = None
+                elif pending_function is not None:
+                    name, function_start = pending_function
+                    in_function = name == 'getCodeVariants'
+                    if in_function:
+                        function = {'start': function_start, 'open': start, 'close': None,
+                                    'mapping': {}, 'mapping_open': None, 'mapping_close': None}
+                    pending_function = None
+            elif kind == lexer.CLOSE:
+                if export is not None and export['close'] is None:
+                    export['close'] = start
+                elif in_function:
+                    function['close'] = start
+                    in_function = False
+            continue
+
+        if in_function:
+            if depth == 1 and kind == lexer.CODE and _EXAMPLES_TABLE.search(text):
+                mapping_pending = True
+            elif depth == 1 and kind == lexer.OPEN and mapping_pending:
+                function['mapping_open'] = start
+                in_mapping = True
+                mapping_pending = False
+            elif depth == 1 and kind == lexer.CLOSE and in_mapping:
+                function['mapping_close'] = start
+                in_mapping = False
+            elif depth == 2 and kind == lexer.CODE and in_mapping:
+                for match in _MAPPING_ENTRY.finditer(text):
+                    function['mapping'][match.group(1).decode()] = {
+                        'export': match.group(2).decode(),
+                        'span': [start + match.start(), start + match.end()],
+                    }
+            continue
+
+        if export is None:
+            continue
+
+        if depth == 1:
+            if kind == lexer.CODE:
+                match = _KEY_BEFORE_COLON.search(text)
+                if match:
+                    pending_key = (match.group(1).decode(), start + match.start())
+                elif pending_string is not None and _COLON_ONLY.match(text):
+                    pending_key = pending_string
+                pending_string = None
+            elif kind == lexer.STRING:
+                pending_string = (text[1:-1].decode(), start)
+            elif kind == lexer.OPEN and pending_key is not None:
+                key, key_start = pending_key
+                variant = {'start': key_start, 'open': start, 'close': None, 'languages': {}}
+                export['variants'][key] = variant
+                pending_key = None
+            elif kind == lexer.CLOSE and variant is not None:
+                variant['close'] = start
+                variant = None
+        elif depth == 2 and variant is not None:
+            if kind == lexer.CODE:
+                match = _KEY_BEFORE_COLON.search(text)
+                pending_key = (match.group(1).decode(), start) if match else None
+            elif kind in (lexer.TEMPLATE, lexer.STRING) and pending_key is not None:
+                variant['languages'][pending_key[0]] = [start, end]
+                pending_key = None
+
+    if export is not None and export['end'] is None and export['close'] is not None:
+        export['end'] = export['close'] + 1
+    return exports, function
+
+
+def splice(data, edits, base=0):
+    """
+    Return `data` with sorted, non-overlapping edits applied.
+
+    Args:
+        data: Bytes starting at file offset `base`
+        edits: (offset, delete_length, new_bytes) tuples, sorted by offset
+    """
+    pieces = []
+    cursor = base
+    for offset, length, new in edits:
+        pieces.append(data[cursor - base:offset - base])
+        pieces.append(new)
+        cursor = offset + length
+    pieces.append(data[cursor - base:])
+    return b''.join(pieces)
+
+
+def _file_digest(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def _cache_file(path, cache_dir):
+    name = hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f'catalog-{name}.json')
+
+
+class VariantCatalog:
+    """Index of one codeVariants.ts file; see the module docstring."""
+
+    def __init__(self, path, exports, function, stamp, cache_dir=CACHE_DIR):
+        self.path = str(path)
+        self.exports = exports
+        self.function = function
+        self.stamp = stamp
+        self.cache_dir = str(cache_dir)
+
+    # ------------------------------------------------------------------
+    # Construction and caching
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def build(cls, path, data=None, cache_dir=CACHE_DIR):
+        """Parse `path` (or the given buffer) into a fresh catalog."""
+        if data is None:
+            with MappedFile(path) as source:
+                return cls.build(path, source.data, cache_dir)
+        with tracing.phase('parse', str(path), len(data)):
+            exports, function = parse_region(data)
+        stat = os.stat(path)
+        with tracing.phase('hash', str(path), len(data)):
+            stamp = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': _file_digest(data)}
+        return cls(path, exports, function, stamp, cache_dir)
+
+    def save(self):
+        """Write the index to the on-disk cache."""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        cache_path = _cache_file(self.path, self.cache_dir)
+        payload = {
+            'version': CATALOG_VERSION,
+            'path': self.path,
+            'stamp': self.stamp,
+            'exports': self.exports,
+            'function': self.function,
+        }
+        tmp_path = f'{cache_path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, separators=(',', ':'))
+        os.replace(tmp_path, cache_path)
+
+    # ------------------------------------------------------------------
+    # Lookups
+    # ------------------------------------------------------------------
+
+    @property
+    def mapping(self):
+        """Component key -> export name, as listed in getCodeVariants()."""
+        if not self.function:
+            return {}
+        return {key: entry['export'] for key, entry in self.function['mapping'].items()}
+
+    def resolve(self, name):
+        """Return (export_name, entry) for a component key or export name."""
+        if name in self.exports:
+            return name, self.exports[name]
+        export_name = self.mapping.get(name.lower())
+        if export_name is None or export_name not in self.exports:
+            raise CatalogError(f"Unknown component '{name}'")
+        return export_name, self.exports[export_name]
+
+    def component_keys(self):
+        """Component keys in mapping-table order."""
+        return list(self.mapping)
+
+    def variant_keys(self, name):
+        """Variant keys of a component, in file order."""
+        return list(self.resolve(name)[1]['variants'])
+
+    def has_variant(self, name, key):
+        try:
+            return key in self.resolve(name)[1]['variants']
+        except CatalogError:
+            return False
+
+    def read_span(self, start, end):
+        """Read raw bytes [start, end) without loading the rest of the file."""
+        with open(self.path, 'rb') as f:
+            f.seek(start)
+            return f.read(end - start)
+
+    def read_variant(self, name, key, cooked=True):
+        """
+        Return {language: code} for one variant.
+
+        Args:
+            name: Component key ('button') or export name ('buttonExamples')
+            key: Variant key ('default')
+            cooked: Unescape template literals to their runtime value
+        """
+        export_name, export = self.resolve(name)
+        variant = export['variants'].get(key)
+        if variant is None:
+            raise CatalogError(f"Unknown variant '{key}' in {export_name}")
+        block = self.read_span(variant['open'], variant['close'] + 1)
+        result = {}
+        for language, (start, end) in variant['languages'].items():
+            raw = block[start + 1 - variant['open']:end - 1 - variant['open']].decode()
+            result[language] = lexer.cook_template(raw) if cooked else raw
+        return result
+
+    def read_export(self, name):
+        """Return the source of a component's `export const ... = {...};` statement."""
+        _, export = self.resolve(name)
+        return self.read_span(export['start'], export['end']).decode()
+
+    def iter_variants(self, cooked=True):
+        """
+        Yield (export_name, variant_key, {language: code}) for every variant.
+
+        The file is mapped once, so walking all variants costs one pass
+        instead of one seek per variant, and only the template text is copied.
+        """
+        with MappedFile(self.path) as source:
+            for export_name, export in self.exports.items():
+                for key, variant in export['variants'].items():
+                    result = {}
+                    for language, (start, end) in variant['languages'].items():
+                        raw = source[start + 1:end - 1].decode()
+                        result[language] = lexer.cook_template(raw) if cooked else raw
+                    yield export_name, key, result
+
+    # ------------------------------------------------------------------
+    # Edits
+    # ------------------------------------------------------------------
+
+    def insert_variants(self, name, source):
+        """
+        Append variant entries to the end of a component's examples object.
+
+        Args:
+            name: Component key or export name
+            source: TypeScript for one or more `key: { ... }` entries, indented
+                as they should appear in the file. Leading/trailing commas and
+                blank lines are ignored.
+        """
+        self.apply_edits([self.variants_edit(name, source)])
+
+    def insert_export(self, source, after, component_key=None, export_name=None):
+        """
+        Insert a whole `export const ...` block after an existing one.
+
+        Args:
+            source: TypeScript for the new block (comment + export statement)
+            after: Export name or component key to insert after
+            component_key: If given, also register the block in the
+                getCodeVariants() mapping table under this key
+            export_name: Name of the new export (required with component_key)
+        """
+        self.apply_edits(self.export_edits(source, after, component_key, export_name))
+
+    def variants_edit(self, name, source):
+        """Return the edit insert_variants() would apply, without applying it."""
+        export_name, export = self.resolve(name)
+        body = source.strip(',\r\n').encode()
+        variants = list(export['variants'].values())
+        if not variants:
+            return (export['open'] + 1, 0, b'\n' + body + b'\n')
+        last_close = variants[-1]['close']
+        tail = self.read_span(last_close + 1, export['close'])
+        if tail.lstrip().startswith(b','):
+            comma = last_close + 1 + tail.index(b',')
+            return (comma + 1, 0, b'\n\n' + body + b',')
+        return (last_close + 1, 0, b',\n\n' + body)
+
+    def export_edits(self, source, after, component_key=None, export_name=None):
+        """Return the edits insert_export() would apply, without applying them."""
+        anchor_name, anchor = self.resolve(after)
+        edits = [(anchor['end'], 0, b'\n\n' + source.strip('\r\n').encode())]
+        if component_key is not None:
+            edits.append(self._mapping_edit(component_key, export_name, anchor_name))
+        return edits
+
+    def _mapping_edit(self, component_key, export_name, after=None):
+        """Edit adding `component_key: export_name` after `after`'s entry (or last)."""
+        if not self.function or not self.function['mapping']:
+            raise CatalogError("getCodeVariants() mapping table not found")
+        if component_key in self.function['mapping']:
+            raise CatalogError(f"Component key '{component_key}' is already mapped")
+        entries = list(self.function['mapping'].values())
+        anchor = next((e for e in entries if e['export'] == after), entries[-1])
+        start, end = anchor['span']
+        entry = f'{component_key}: {export_name},'.encode()
+        if self.read_span(end - 1, end) == b',':
+            return (end, 0, b'\n    ' + entry)
+        return (end, 0, b',\n    ' + entry)
+
+    def apply_edits(self, edits, journal=True, check=True):
+        """
+        Splice edits into the file and update the index in place.
+
+        Args:
+            edits: (offset, delete_length, new_bytes) tuples in file
+                coordinates; they must not overlap. Edits at the same offset
+                are applied in list order.
+            journal: Record the edits in the file's undo journal
+                (see `journal`), next to the index cache
+            check: Run the template-literal integrity check (see
+                `integrity`) on every statement the edits touch, as it will
+                read after them, and raise IntegrityError instead of writing
+                if it finds anything
+
+        The file is streamed into a temp file with the edits spliced in and
+        renamed over the original (fileio.splice_write), so at most one copy
+        chunk is held and a crash leaves the old file intact. Only the
+        statements touched by an edit are re-parsed.
+        """
+        self.ensure_fresh()
+        edits = sorted(edits, key=lambda e: e[0])
+        before = self.stamp['sha256']
+        if check:
+            with tracing.phase('check', self.path):
+                self.check_edits(edits)
+        old_bytes = [self.read_span(offset, offset + length) if length else b''
+                     for offset, length, _ in edits] if journal else None
+        with tracing.phase('write', self.path, self.stamp['size']):
+            splice_write(self.path, edits)
+        with tracing.phase('reindex', self.path):
+            self._reindex(edits)
+        if journal:
+            with tracing.phase('journal'):
+                Journal.for_file(self.path, self.cache_dir).record_edits(
+                    edits, old_bytes, before, self.stamp['sha256'])
+
+    def check_edits(self, edits):
+        """
+        Raise IntegrityError if the statements touched by `edits` (sorted)
+        would have integrity findings once the edits are applied.
+        """
+        findings = []
+        added_lines = 0   # by the regions before this one
+        line, counted = 1, 0   # line number at byte `counted` of the old file
+        with MappedFile(self.path) as source:
+            for lo, hi in self._edit_regions(edits):
+                old = source.data[lo:hi]
+                region = splice(old, [edit for edit in edits if lo <= edit[0] <= hi], base=lo)
+                # mmap has no count(); regions are sorted, so each gap is read once
+                line += source.data[counted:lo].count(b'\n')
+                counted = lo
+                first_line = line + added_lines
+                findings.extend(check_source(region, first_line))
+                added_lines += region.count(b'\n') - old.count(b'\n')
+        if findings:
+            raise IntegrityError(self.path, findings)
+
+    def _edit_regions(self, edits):
+        """
+        Old-coordinate regions covering `edits` (sorted): each edit widened
+        to the statement it falls in, with overlapping regions merged.
+        """
+        statements = [(e['start'], e['end']) for e in self.exports.values()]
+        if self.function:
+            statements.append((self.function['start'], self.function['close'] + 1))
+
+        regions = []
+        for offset, length, _ in edits:
+            lo, hi = offset, offset + length
+            for start, end in statements:
+                if start <= offset <= end:
+                    lo, hi = min(lo, start), max(hi, end)
+            if regions and lo <= regions[-1][1]:
+                regions[-1] = (regions[-1][0], max(hi, regions[-1][1]))
+            else:
+                regions.append((lo, hi))
+        return regions
+
+    def _reindex(self, edits):
+        def shift(pos, inclusive=False):
+            return pos + sum(len(new) - length for offset, length, new in edits
+                             if offset < pos or (inclusive and offset == pos))
+
+        # Re-parse only the statements the edits touched
+        regions = self._edit_regions(edits)
+
+        def is_dirty(start):
+            return any(lo <= start < hi or start == lo for lo, hi in regions)
+
+        exports = {name: _shift_entry(entry, shift)
+                   for name, entry in self.exports.items() if not is_dirty(entry['start'])}
+        function = self.function
+        if function is not None:
+            function = None if is_dirty(function['start']) else _shift_entry(function, shift)
+
+        for lo, hi in regions:
+            new_lo, new_hi = shift(lo), shift(hi, inclusive=True)
+            region_exports, region_function = parse_region(self.read_span(new_lo, new_hi), base=new_lo)
+            exports.update(region_exports)
+            if region_function is not None:
+                function = region_function
+
+        self.exports = dict(sorted(exports.items(), key=lambda item: item[1]['start']))
+        self.function = function
+        stat = os.stat(self.path)
+        self.stamp = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size,
+                      'sha256': file_sha256(self.path)}
+        self.save()
+
+    def ensure_fresh(self):
+        """Raise if the file changed on disk since this catalog was loaded."""
+        stat = os.stat(self.path)
+        if stat.st_size != self.stamp['size'] or stat.st_mtime_ns != self.stamp['mtime_ns']:
+            raise CatalogError(f"{self.path} changed on disk; reload the catalog before editing")
+
+
+def _shift_entry(value, shift):
+    """Return a copy of an index entry with every offset passed through `shift`."""
+    if isinstance(value, dict):
+        return {key: _shift_entry(item, shift) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_shift_entry(item, shift) for item in value]
+    if isinstance(value, int):
+        return shift(value)
+    return value
+
+
+def load_catalog(path=VARIANTS_FILE, cache_dir=CACHE_DIR, use_cache=True):
+    """
+    Return the catalog for `path`, from the on-disk cache when still valid.
+
+    The cache is trusted when mtime and size match. If only the mtime moved
+    (touch, checkout) the content hash decides, so an unchanged file is never
+    re-parsed.
+    """
+    path = str(path)
+    stat = os.stat(path)
+    cached = None
+    if use_cache:
+        try:
+            with tracing.phase('load-index'), open(_cache_file(path, cache_dir)) as f:
+                cached = json.load(f)
+        except (OSError, ValueError):
+            cached = None
+        if cached and (cached.get('version') != CATALOG_VERSION or cached.get('path') != path):
+            cached = None
+
+    if cached:
+        stamp = cached['stamp']
+        catalog = VariantCatalog(path, cached['exports'], cached['function'], stamp, cache_dir)
+        if stamp['size'] == stat.st_size and stamp['mtime_ns'] == stat.st_mtime_ns:
+            return catalog
+
+    if cached:
+        with tracing.phase('hash', path, stat.st_size):
+            digest = file_sha256(path)
+        if cached['stamp']['sha256'] == digest:
+            catalog.stamp = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha256': digest}
+            catalog.save()
+            return catalog
+
+    catalog = VariantCatalog.build(path, cache_dir=cache_dir)
+    if use_cache:
+        catalog.save()
+    return catalog
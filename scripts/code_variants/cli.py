@@ -0,0 +1,162 @@
+"""
+One command line for the code variant scripts.
+
+    python3 scripts/code-variants.py <command> [options]
+    python3 -m code_variants <command> [options]      (from scripts/)
+
+Each command runs the standalone script it replaces, in this process and
+with the remaining arguments, so options and output are the same as before:
+
+- `add`    - add-code-variants-batch.py: apply a manifest of variants
+- `bulk`   - add-code-variants-bulk.py: add getCodeVariants() calls to stories
+- `verify` - verify-code-variants.py, incremental by default (`--full` to
+             re-parse every story)
+- `shard`  - generate-code-variant-shards.py
+- `gc`     - gc-code-variants.py
+- `stats`  - counts and sizes from the cached catalog index
+
+Nothing but this module and argparse is imported before the command is
+known; a command's script, and the package modules it needs, are loaded
+when it runs. Paths come from `paths` and parsed state from the on-disk
+caches (`catalog`, `filecache`), so every command shares the same index
+and a warm `verify` only stats the story files.
+"""
+
+import argparse
+import os
+import sys
+
+from .paths import REPO_ROOT
+
+SCRIPTS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# command -> (script in scripts/, one-line help); 'stats' is built in
+COMMANDS = {
+    'add': ('add-code-variants-batch.py', 'apply a JSON/YAML manifest of variants in one write'),
+    'bulk': ('add-code-variants-bulk.py', 'add getCodeVariants() calls to story files'),
+    'verify': ('verify-code-variants.py', 'report story coverage (incremental; --full re-parses)'),
+    'shard': ('generate-code-variant-shards.py', 'write per-component, lazily imported modules'),
+    'gc': ('gc-code-variants.py', 'remove variants no story can reach'),
+    'stats': (None, 'counts and sizes from the catalog index'),
+}
+
+
+def run_script(command, argv):
+    """
+    Run a standalone script as `code-variants <command>`.
+
+    The script runs as `__main__`, as if it had been started directly (what
+    runpy.run_path() does, without importing pkgutil), so process pools
+    that pickle its functions work with both the fork and spawn start
+    methods.
+
+    Returns:
+        The script's exit status
+    """
+    import types
+
+    script, _ = COMMANDS[command]
+    if command == 'verify':
+        if '--full' in argv:
+            argv = [arg for arg in argv if arg != '--full']
+        else:
+            argv = ['--incremental'] + argv
+    path = os.path.join(SCRIPTS_DIR, script)
+    with open(path, 'rb') as f:
+        code = compile(f.read(), path, 'exec')
+    module = types.ModuleType('__main__')
+    module.__file__ = path
+    saved = sys.argv, sys.modules['__main__']
+    sys.argv = [path] + argv
+    sys.modules['__main__'] = module
+    try:
+        exec(code, module.__dict__)
+    except SystemExit as e:
+        return e.code
+    finally:
+        sys.argv, sys.modules['__main__'] = saved
+    return 0
+
+
+def catalog_stats(catalog):
+    """
+    Summarize a catalog from its index alone (no template text is read).
+
+    Returns:
+        Dict with file 'bytes', 'exports', 'variants', 'components'
+        (mapping entries), 'unmapped' (exports without a mapping entry),
+        'dangling' (mapping entries naming a missing export) and per
+        language 'languages': {language: {'variants', 'empty', 'bytes'}}
+    """
+    from .catalog import LANGUAGES
+
+    languages = {language: {'variants': 0, 'empty': 0, 'bytes': 0} for language in LANGUAGES}
+    variants = 0
+    for entry in catalog.exports.values():
+        for variant in entry['variants'].values():
+            variants += 1
+            for language, (start, end) in variant['languages'].items():
+                counts = languages.setdefault(language, {'variants': 0, 'empty': 0, 'bytes': 0})
+                counts['variants'] += 1
+                counts['bytes'] += end - start - 2
+                if end - start <= 2:
+                    counts['empty'] += 1
+    mapping = catalog.mapping
+    return {
+        'file': os.path.relpath(catalog.path, REPO_ROOT),
+        'bytes': catalog.stamp['size'],
+        'exports': len(catalog.exports),
+        'variants': variants,
+        'components': len(mapping),
+        'unmapped': sorted(set(catalog.exports) - set(mapping.values())),
+        'dangling': sorted(key for key, name in mapping.items() if name not in catalog.exports),
+        'languages': languages,
+    }
+
+
+def run_stats(argv):
+    parser = argparse.ArgumentParser(prog='code-variants stats',
+                                     description='Counts and sizes from the catalog index.')
+    parser.add_argument('--file', help='codeVariants.ts (default: storybook/.storybook/blocks/codeVariants.ts)')
+    parser.add_argument('--json', action='store_true', help='print the numbers as JSON')
+    args = parser.parse_args(argv)
+
+    from .catalog import load_catalog
+    catalog = load_catalog(args.file) if args.file else load_catalog()
+    stats = catalog_stats(catalog)
+    if args.json:
+        import json
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    print("=" * 80)
+    print(f"📊 CODE VARIANTS: {stats['file']} ({stats['bytes'] / 1024:,.1f} KB)")
+    print("=" * 80)
+    print(f"Examples objects:   {stats['exports']}")
+    print(f"Variants:           {stats['variants']}")
+    print(f"Mapped components:  {stats['components']}")
+    print(f"\n{'Language':<12} {'Variants':>9} {'Empty':>7} {'KB':>10}")
+    print("-" * 41)
+    for language, counts in stats['languages'].items():
+        print(f"{language:<12} {counts['variants']:>9} {counts['empty']:>7} {counts['bytes'] / 1024:>10,.1f}")
+    if stats['unmapped']:
+        print(f"\n⚠️  Not in the getCodeVariants() mapping ({len(stats['unmapped'])}): "
+              f"{', '.join(stats['unmapped'])}")
+    if stats['dangling']:
+        print(f"❌ Mapped to a missing object ({len(stats['dangling'])}): {', '.join(stats['dangling'])}")
+    return 0
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    parser = argparse.ArgumentParser(
+        prog='code-variants',
+        description='Code variant tooling. Run `code-variants <command> --help` for its options.',
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='commands:\n' + '\n'.join(f'  {name:<8} {text}' for name, (_, text) in COMMANDS.items()))
+    parser.add_argument('command', choices=COMMANDS, metavar='command')
+    # Only the command name is parsed here; everything after it belongs to the command
+    args = parser.parse_args(argv[:1])
+    if args.command == 'stats':
+        return run_stats(argv[1:])
+    return run_script(args.command, argv[1:])
@@ -0,0 +1,186 @@
+"""
+Story coverage: which stories have code variants.
+
+Shared by `verify-code-variants.py` (one-shot) and the watch daemon
+(long-running), so both report exactly the same numbers.
+
+A run can also be split across CI workers: `select_shard()` keeps the files
+whose repository-relative path hashes to one shard, `partial_report()`
+writes what that shard parsed, and `merge_partials()` puts the shards back
+together for `summarize()`, which then gives the single-process report.
+"""
+
+import os
+import zlib
+
+from . import tracing
+
+# Story directories under storybook/stories that coverage can be checked for
+STORY_DIRS = ('components', 'charts', 'business-patterns', 'cin7-dsl', 'guides')
+PARTIAL_VERSION = 1
+
+
+def find_story_files(stories_dir):
+    """Return every .stories.tsx path under `stories_dir`, in walk order."""
+    all_files = []
+    with tracing.phase('discover'):
+        for root, dirs, files in os.walk(stories_dir):
+            for file in files:
+                if file.endswith('.stories.tsx'):
+                    all_files.append(os.path.join(root, file))
+    return all_files
+
+
+def extract_stories_from_file(file_path):
+    """Extract all story names and their code variant status from a file."""
+    # One pass over the file; stories come back as spans, nothing is copied
+    with tracing.phase('read', file_path) as span:
+        with open(file_path, 'rb') as f:
+            data = f.read()
+        span['bytes'] = len(data)
+    # Imported on first parse: a warm incremental run reads every result from cache
+    from .stories import scan_stories
+
+    with tracing.phase('scan', file_path, len(data)):
+        meta, stories = scan_stories(data)
+    meta_has_variants = meta.has_variants
+
+    story_details = []
+    for story in stories:
+        story_details.append({
+            'name': story.name,
+            'has_variants': meta_has_variants or story.has_variants,
+            'level': 'meta' if meta_has_variants and not story.has_variants else ('story' if story.has_variants else 'none')
+        })
+
+    return story_details, meta_has_variants
+
+
+def summarize(parsed, base_path):
+    """
+    Build the coverage report.
+
+    Args:
+        parsed: Dict mapping file path to (story_details, meta_has_variants)
+        base_path: Repository root; report paths are relative to it
+
+    Returns:
+        Dict with totals, 'missing_details' and 'files_summary'
+    """
+    total_stories = 0
+    stories_with_variants = 0
+    stories_without_variants = []
+    files_summary = []
+
+    for file_path in sorted(parsed):
+        rel_path = os.path.relpath(file_path, base_path)
+        story_details, meta_has_variants = parsed[file_path]
+
+        file_total = len(story_details)
+        file_with_variants = sum(1 for s in story_details if s['has_variants'])
+        file_without_variants = [s['name'] for s in story_details if not s['has_variants']]
+
+        total_stories += file_total
+        stories_with_variants += file_with_variants
+
+        if file_without_variants:
+            stories_without_variants.append({
+                'file': rel_path,
+                'stories': file_without_variants
+            })
+
+        files_summary.append({
+            'file': rel_path,
+            'total': file_total,
+            'with_variants': file_with_variants,
+            'without_variants': len(file_without_variants),
+            'meta_level': meta_has_variants,
+            'coverage': f"{(file_with_variants/file_total*100):.1f}%" if file_total > 0 else "0%"
+        })
+
+    return {
+        'total_files': len(parsed),
+        'total_stories': total_stories,
+        'stories_with_variants': stories_with_variants,
+        'stories_without_variants': total_stories - stories_with_variants,
+        'missing_details': stories_without_variants,
+        'files_summary': files_summary,
+    }
+
+
+def _relative(file_path, base_path):
+    return os.path.relpath(file_path, base_path).replace(os.sep, '/')
+
+
+def shard_of(rel_path, count):
+    """0-based shard of a repository-relative '/' path; stable across machines."""
+    return zlib.crc32(rel_path.encode('utf-8')) % count
+
+
+def select_shard(file_paths, base_path, index, count):
+    """The paths of shard `index` (1-based) of `count`, in their original order."""
+    return [path for path in file_paths if shard_of(_relative(path, base_path), count) == index - 1]
+
+
+def partial_report(parsed, base_path, shard, dirs):
+    """
+    Compact report of one shard, for merge_partials().
+
+    Args:
+        parsed: Dict mapping file path to (story_details, meta_has_variants)
+        base_path: Repository root; paths are stored relative to it
+        shard: (index, count), 1-based
+        dirs: Story directories the run covered
+
+    Returns:
+        Dict with 'version', 'shard', 'dirs' and 'files':
+        {path: [meta_has_variants, [[story, level], ...]]}
+    """
+    files = {}
+    for file_path, (story_details, meta_has_variants) in parsed.items():
+        files[_relative(file_path, base_path)] = [
+            meta_has_variants, [[story['name'], story['level']] for story in story_details]]
+    return {'version': PARTIAL_VERSION, 'shard': list(shard), 'dirs': list(dirs), 'files': files}
+
+
+def merge_partials(partials, base_path):
+    """
+    Combine the partial reports of every shard of one run.
+
+    Args:
+        partials: partial_report() dicts, in any order
+        base_path: Repository root the merged paths are joined to
+
+    Returns:
+        Dict mapping file path to (story_details, meta_has_variants), as
+        parse_story_files() returns it for the same files
+
+    Raises:
+        ValueError: If the partials are not exactly shards 1..N of one run
+    """
+    if not partials:
+        raise ValueError('no partial reports given')
+    first = partials[0]
+    count, dirs = first['shard'][1], first['dirs']
+    seen = set()
+    for partial in partials:
+        if partial.get('version') != PARTIAL_VERSION:
+            raise ValueError(f"unsupported partial report version {partial.get('version')!r}")
+        index, total = partial['shard']
+        if total != count or partial['dirs'] != dirs:
+            raise ValueError(f"shard {index}/{total} of {', '.join(partial['dirs'])} does not belong "
+                             f"with shards of {count} over {', '.join(dirs)}")
+        if index in seen:
+            raise ValueError(f'shard {index}/{count} given twice')
+        seen.add(index)
+    absent = sorted(set(range(1, count + 1)) - seen)
+    if absent:
+        raise ValueError(f"missing shard(s) {', '.join(f'{index}/{count}' for index in absent)}")
+
+    parsed = {}
+    for partial in partials:
+        for rel_path, (meta_has_variants, stories) in partial['files'].items():
+            parsed[os.path.join(base_path, *rel_path.split('/'))] = (
+                [{'name': name, 'has_variants': level != 'none', 'level': level} for name, level in stories],
+                meta_has_variants)
+    return parsed
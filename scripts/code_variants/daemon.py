@@ -0,0 +1,412 @@
+"""
+Watch-mode daemon that keeps stories and variants parsed in memory.
+
+`Workspace` holds the codeVariants.ts catalog and the parsed coverage of
+every .stories.tsx file. A watcher (inotify on Linux, mtime polling
+elsewhere) reports changed paths and only those files are re-parsed.
+Queries are newline-delimited JSON, one object per line:
+
+    {"op": "coverage", "dirs": ["storybook/stories/components"]}
+    {"op": "lookup", "component": "button", "variant": "default"}
+
+and each answer is one line back: {"ok": true, "result": ...} or
+{"ok": false, "error": "..."}. A file that fails to re-parse (a half-saved
+codeVariants.ts, a story deleted mid-read) keeps its last good state and
+every answer carries "errors": {path: message} until it parses again. `serve()` answers them on a Unix socket,
+`serve_stdio()` on stdin/stdout, and `request()` is the client the
+`--daemon` flags of the CLIs use.
+
+Ops: ping, coverage, components, variants, lookup, has_variant, batch, stop.
+"""
+
+import json
+import os
+import socket
+import sys
+import time
+
+from .paths import CACHE_DIR, REPO_ROOT, STORIES_DIR, VARIANTS_FILE
+
+SOCKET_PATH = CACHE_DIR / 'daemon.sock'
+POLL_INTERVAL = 1.0
+
+
+class DaemonUnavailable(Exception):
+    """Raised by request() when no daemon is listening."""
+
+
+class DaemonError(Exception):
+    """Raised by request() when the daemon reports a failed query."""
+
+
+# ----------------------------------------------------------------------
+# Client
+# ----------------------------------------------------------------------
+
+def request(op, socket_path=SOCKET_PATH, timeout=30, **params):
+    """
+    Send one query to a running daemon and return its result.
+
+    Raises:
+        DaemonUnavailable: Nothing is listening on `socket_path`
+        DaemonError: The daemon answered with an error
+    """
+    client = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    client.settimeout(timeout)
+    try:
+        try:
+            client.connect(str(socket_path))
+        except (FileNotFoundError, ConnectionRefusedError):
+            raise DaemonUnavailable(f"No code variants daemon at {socket_path}") from None
+        client.sendall(json.dumps(dict(params, op=op)).encode() + b'\n')
+        response = _read_line(client)
+    finally:
+        client.close()
+    if not response:
+        raise DaemonError("Daemon closed the connection without answering")
+    answer = json.loads(response)
+    if not answer.get('ok'):
+        raise DaemonError(answer.get('error', 'unknown error'))
+    for path, error in answer.get('errors', {}).items():
+        print(f"⚠️  Daemon is serving the last good parse of {path}: {error}", file=sys.stderr)
+    return answer['result']
+
+
+def _read_line(conn):
+    chunks = []
+    while True:
+        chunk = conn.recv(65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+        if chunk.endswith(b'\n'):
+            break
+    return b''.join(chunks)
+
+
+# ----------------------------------------------------------------------
+# Watchers
+# ----------------------------------------------------------------------
+
+def _watched(path):
+    return path == str(VARIANTS_FILE) or path.endswith('.stories.tsx')
+
+
+class PollingWatcher:
+    """Finds changed files by comparing (mtime, size) snapshots."""
+
+    def __init__(self, roots, files=()):
+        self.roots = [str(root) for root in roots]
+        self.files = [str(path) for path in files]
+        self.snapshot = self._scan()
+
+    def fileno(self):
+        return None
+
+    def _scan(self):
+        snapshot = {}
+        paths = list(self.files)
+        for root in self.roots:
+            for directory, _, names in os.walk(root):
+                paths.extend(os.path.join(directory, name) for name in names)
+        for path in paths:
+            if not _watched(path):
+                continue
+            try:
+                stat = os.stat(path)
+            except FileNotFoundError:
+                continue
+            snapshot[path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def changes(self):
+        """Return the set of paths added, modified or removed since last call."""
+        snapshot = self._scan()
+        changed = {path for path in snapshot.keys() | self.snapshot.keys()
+                   if snapshot.get(path) != self.snapshot.get(path)}
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher (through ctypes, no extra dependencies)."""
+
+    _IN_MODIFY = 0x2
+    _IN_ATTRIB = 0x4
+    _IN_CLOSE_WRITE = 0x8
+    _IN_MOVED_FROM = 0x40
+    _IN_MOVED_TO = 0x80
+    _IN_CREATE = 0x100
+    _IN_DELETE = 0x200
+    _IN_Q_OVERFLOW = 0x4000
+    _IN_ISDIR = 0x40000000
+    _MASK = (_IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_FROM | _IN_MOVED_TO
+             | _IN_CREATE | _IN_DELETE)
+
+    def __init__(self, roots, files=()):
+        import ctypes
+        import ctypes.util
+        import struct
+        self._struct = struct
+        self._libc = ctypes.CDLL(ctypes.util.find_library('c') or 'libc.so.6', use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self._dirs = {}     # watch descriptor -> directory
+        for root in roots:
+            self._watch_tree(str(root))
+        for path in files:
+            self._watch_dir(os.path.dirname(str(path)))
+
+    def fileno(self):
+        return self._fd
+
+    def _watch_dir(self, directory):
+        wd = self._libc.inotify_add_watch(self._fd, os.fsencode(directory), self._MASK)
+        if wd >= 0:
+            self._dirs[wd] = directory
+
+    def _watch_tree(self, root):
+        """Watch `root` and its subdirectories; return the files found in them."""
+        found = set()
+        for directory, _, names in os.walk(root):
+            self._watch_dir(directory)
+            found.update(os.path.join(directory, name) for name in names)
+        return found
+
+    def changes(self):
+        """
+        Return the set of changed paths, or None when events were lost
+        (queue overflow) and the caller should rescan everything.
+        """
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, 65536)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = self._struct.unpack_from('iIII', data, offset)
+                name = data[offset + 16:offset + 16 + length].rstrip(b'\0')
+                offset += 16 + length
+                if mask & self._IN_Q_OVERFLOW:
+                    return None
+                directory = self._dirs.get(wd)
+                if directory is None:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & self._IN_ISDIR:
+                    if mask & (self._IN_CREATE | self._IN_MOVED_TO):
+                        changed.update(self._watch_tree(path))
+                    continue
+                changed.add(path)
+        return {path for path in changed if _watched(path)}
+
+    def close(self):
+        os.close(self._fd)
+
+
+def make_watcher(roots, files=(), polling=False):
+    """Return an InotifyWatcher where available, else a PollingWatcher."""
+    if not polling and hasattr(os, 'O_NONBLOCK'):
+        try:
+            return InotifyWatcher(roots, files)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, files)
+
+
+# ----------------------------------------------------------------------
+# In-memory state
+# ----------------------------------------------------------------------
+
+class Workspace:
+    """Parsed catalog and story coverage, refreshed file by file."""
+
+    def __init__(self, stories_dir=STORIES_DIR, variants_file=VARIANTS_FILE, base_path=REPO_ROOT):
+        from .catalog import load_catalog
+        from .coverage import find_story_files
+        self.stories_dir = str(stories_dir)
+        self.variants_file = str(variants_file)
+        self.base_path = str(base_path)
+        self.started = time.time()
+        self.reparsed = 0
+        self.catalog = load_catalog(self.variants_file)
+        self.stories = {}
+        self.errors = {}    # path -> why its last re-parse failed
+        self.refresh(find_story_files(self.stories_dir))
+
+    def refresh(self, paths):
+        """
+        Re-parse the given paths (None = everything); return how many were.
+
+        A path that fails to parse keeps its previous catalog or story state
+        and is listed in `errors` until a later refresh succeeds.
+        """
+        from .catalog import CatalogError
+        from .coverage import extract_stories_from_file, find_story_files
+        from .lexer import LexError
+        if paths is None:
+            paths = set(find_story_files(self.stories_dir)) | set(self.stories) | {self.variants_file}
+        count = 0
+        for path in paths:
+            try:
+                if path == self.variants_file:
+                    self._refresh_catalog()
+                elif not os.path.exists(path):
+                    self.stories.pop(path, None)
+                else:
+                    self.stories[path] = extract_stories_from_file(path)
+            except (LexError, CatalogError, OSError) as e:
+                self.errors[path] = f"{type(e).__name__}: {e}"
+            else:
+                self.errors.pop(path, None)
+            count += 1
+        self.reparsed += count
+        return count
+
+    def _refresh_catalog(self):
+        from .catalog import load_catalog
+        stat = os.stat(self.variants_file)
+        stamp = self.catalog.stamp
+        if stat.st_size != stamp['size'] or stat.st_mtime_ns != stamp['mtime_ns']:
+            self.catalog = load_catalog(self.variants_file)
+
+    # Query handlers ---------------------------------------------------
+
+    def op_ping(self):
+        return {'pid': os.getpid(), 'uptime': time.time() - self.started,
+                'story_files': len(self.stories), 'reparsed': self.reparsed,
+                'variants_file': self.variants_file, 'errors': len(self.errors)}
+
+    def op_coverage(self, dirs=None):
+        from .coverage import summarize
+        parsed = self.stories
+        if dirs:
+            prefixes = tuple(os.path.join(self.base_path, d).rstrip(os.sep) + os.sep for d in dirs)
+            parsed = {path: value for path, value in parsed.items() if path.startswith(prefixes)}
+        return summarize(parsed, self.base_path)
+
+    def op_components(self):
+        return self.catalog.component_keys()
+
+    def op_variants(self, component):
+        return self.catalog.variant_keys(component)
+
+    def op_lookup(self, component, variant):
+        from .catalog import CatalogError
+        # The index is the last good parse; its offsets do not fit the file on disk
+        if self.variants_file in self.errors:
+            raise CatalogError(f"{self.variants_file} does not parse: {self.errors[self.variants_file]}")
+        return self.catalog.read_variant(component, variant)
+
+    def op_has_variant(self, component, variant):
+        return self.catalog.has_variant(component, variant)
+
+    def op_batch(self, manifest, dry_run=False):
+        from .batch import batch_from_manifest
+        from .catalog import CatalogError
+        if self.variants_file in self.errors:
+            raise CatalogError(f"{self.variants_file} does not parse; not editing it: "
+                               f"{self.errors[self.variants_file]}")
+        self._refresh_catalog()
+        return batch_from_manifest(self.catalog, manifest).commit(dry_run=dry_run)
+
+    def handle(self, query):
+        """Answer one decoded query; returns the response dict."""
+        params = dict(query)
+        handler = getattr(self, f"op_{params.pop('op', '')}", None)
+        if handler is None:
+            return {'ok': False, 'error': f"Unknown op: {query.get('op')!r}"}
+        try:
+            answer = {'ok': True, 'result': handler(**params)}
+        except Exception as e:
+            answer = {'ok': False, 'error': f"{type(e).__name__}: {e}"}
+        if self.errors:
+            answer['errors'] = {os.path.relpath(path, self.base_path): error
+                                for path, error in self.errors.items()}
+        return answer
+
+
+# ----------------------------------------------------------------------
+# Servers
+# ----------------------------------------------------------------------
+
+def _answer(workspace, watcher, line):
+    workspace.refresh(watcher.changes())
+    try:
+        query = json.loads(line)
+    except ValueError as e:
+        return {'ok': False, 'error': f"Bad request: {e}"}
+    if query.get('op') == 'stop':
+        return None
+    return workspace.handle(query)
+
+
+def serve(workspace, watcher, socket_path=SOCKET_PATH, log=print):
+    """Answer queries on a Unix socket until a 'stop' op arrives."""
+    import selectors
+
+    socket_path = str(socket_path)
+    os.makedirs(os.path.dirname(socket_path), exist_ok=True)
+    if os.path.exists(socket_path):
+        try:
+            request('ping', socket_path, timeout=1)
+        except (DaemonUnavailable, DaemonError, OSError):
+            os.unlink(socket_path)      # left over from a daemon that died
+        else:
+            raise RuntimeError(f"A daemon is already listening on {socket_path}")
+
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    server.bind(socket_path)
+    server.listen(16)
+    selector = selectors.DefaultSelector()
+    selector.register(server, selectors.EVENT_READ, 'client')
+    if watcher.fileno() is not None:
+        selector.register(watcher.fileno(), selectors.EVENT_READ, 'watch')
+    timeout = None if watcher.fileno() is not None else POLL_INTERVAL
+
+    try:
+        while True:
+            events = selector.select(timeout)
+            if not events:
+                # Polling tick: keep the parsed state warm between queries
+                workspace.refresh(watcher.changes())
+                continue
+            for key, _ in events:
+                if key.data == 'watch':
+                    count = workspace.refresh(watcher.changes())
+                    log(f"♻️  Re-parsed {count} changed file(s)")
+                    for path, error in workspace.errors.items():
+                        log(f"⚠️  {os.path.relpath(path, workspace.base_path)}: {error}")
+                    continue
+                conn, _ = server.accept()
+                with conn:
+                    answer = _answer(workspace, watcher, _read_line(conn))
+                    if answer is None:
+                        conn.sendall(json.dumps({'ok': True, 'result': 'stopping'}).encode() + b'\n')
+                        return
+                    conn.sendall(json.dumps(answer).encode() + b'\n')
+    finally:
+        selector.close()
+        server.close()
+        try:
+            os.unlink(socket_path)
+        except FileNotFoundError:
+            pass
+
+
+def serve_stdio(workspace, watcher, stdin, stdout):
+    """Answer queries read line by line from `stdin` until EOF or 'stop'."""
+    for line in stdin:
+        if not line.strip():
+            continue
+        answer = _answer(workspace, watcher, line)
+        if answer is None:
+            break
+        stdout.write(json.dumps(answer) + '\n')
+        stdout.flush()
@@ -0,0 +1,243 @@
+"""
+Content-addressed deduplication of code variant snippets.
+
+Variants repeat a lot of text: the same import headers, the same
+`import { ... } from '@cin7/vanilla-js'` preamble, near-identical
+TypeScript/React bodies. Each language string is split into lines and
+every line is addressed by the SHA-1 of its text. Lines seen more than
+once (and long enough to be worth a reference) become shared fragments;
+runs of everything else stay inline.
+
+A variant is then stored as a list of parts per language, where a part is
+either a fragment index or an inline string, and reassembled at lookup
+time with `parts.join('\\n')`. Lines are compared byte for byte, so the
+reassembled code is identical to the original.
+"""
+
+import gzip
+import hashlib
+import json
+
+from .catalog import LANGUAGES
+from .paths import BLOCKS_DIR
+
+DEDUP_FILE = BLOCKS_DIR / 'codeVariants.dedup.ts'
+
+BLOCK_SEPARATOR = '\n'
+# A reference costs a few bytes of JSON; shorter lines stay inline
+MIN_FRAGMENT_BYTES = 8
+
+GENERATED_HEADER = (
+    '// Generated by scripts/dedup-code-variants.py from codeVariants.ts.\n'
+    '// Do not edit by hand; re-run the script with --emit instead.\n'
+)
+
+
+def split_blocks(code):
+    """Split one language string into the blocks (lines) that get hashed."""
+    return code.split(BLOCK_SEPARATOR)
+
+
+def block_digest(block):
+    return hashlib.sha1(block.encode()).hexdigest()
+
+
+def _json(value):
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'))
+
+
+class FragmentStore:
+    """
+    Shared fragments plus per-variant part lists for a set of variants.
+
+    Usage:
+        store = FragmentStore.from_catalog(load_catalog())
+        store.report()          # sizes and savings per component
+        store.render_module()   # TypeScript that reassembles on lookup
+    """
+
+    def __init__(self, variants, components=None):
+        """
+        Args:
+            variants: List of (export_name, variant_key, {language: code})
+            components: Component key -> export name (the lookup table)
+        """
+        self.variants = variants
+        self.components = components or {}
+        self.fragments = []     # fragment text, by index
+        self.fragment_ids = {}  # digest -> index
+        self.uses = {}          # digest -> occurrence count
+        self.parts = {}         # export name -> variant key -> [[part, ...] per language]
+        self._build()
+
+    @classmethod
+    def from_catalog(cls, catalog):
+        variants = list(catalog.iter_variants())
+        return cls(variants, catalog.mapping)
+
+    def _build(self):
+        for _, _, languages in self.variants:
+            for language in LANGUAGES:
+                for block in split_blocks(languages.get(language, '')):
+                    digest = block_digest(block)
+                    self.uses[digest] = self.uses.get(digest, 0) + 1
+
+        for export_name, key, languages in self.variants:
+            self.parts.setdefault(export_name, {})[key] = [
+                self._encode(languages.get(language, '')) for language in LANGUAGES
+            ]
+
+    def _encode(self, code):
+        """Return the part list for one language string."""
+        parts = []
+        inline = []
+        for block in split_blocks(code):
+            digest = block_digest(block)
+            if self.uses[digest] < 2 or len(block.encode()) < MIN_FRAGMENT_BYTES:
+                inline.append(block)
+                continue
+            if inline:
+                parts.append(BLOCK_SEPARATOR.join(inline))
+                inline = []
+            index = self.fragment_ids.get(digest)
+            if index is None:
+                index = self.fragment_ids[digest] = len(self.fragments)
+                self.fragments.append(block)
+            parts.append(index)
+        if inline:
+            parts.append(BLOCK_SEPARATOR.join(inline))
+        return parts
+
+    def reassemble(self, export_name, key):
+        """Return {language: code} rebuilt from fragments (the lookup-time join)."""
+        languages = self.parts[export_name][key]
+        return {
+            language: BLOCK_SEPARATOR.join(
+                self.fragments[part] if isinstance(part, int) else part for part in parts)
+            for language, parts in zip(LANGUAGES, languages)
+        }
+
+    def verify(self):
+        """Return the (export, key) pairs that do not reassemble to their source."""
+        return [(export_name, key) for export_name, key, languages in self.variants
+                if self.reassemble(export_name, key) != {language: languages.get(language, '')
+                                                         for language in LANGUAGES}]
+
+    # ------------------------------------------------------------------
+    # Reporting
+    # ------------------------------------------------------------------
+
+    def report(self):
+        """
+        Return size totals and per-export savings.
+
+        Sizes are measured on the payload a bundle would ship: the raw
+        strings as JSON versus the fragment table plus part lists.
+        """
+        raw = {}
+        saved = {}
+        first_seen = set()
+        for export_name, key, languages in self.variants:
+            raw[export_name] = raw.get(export_name, 0) + len(_json(
+                [languages.get(language, '') for language in LANGUAGES]).encode())
+            for parts in self.parts[export_name][key]:
+                for part in parts:
+                    if not isinstance(part, int):
+                        continue
+                    if part not in first_seen:
+                        # The first use pays for storing the fragment
+                        first_seen.add(part)
+                        continue
+                    saved[export_name] = (saved.get(export_name, 0)
+                                          + len(_json(self.fragments[part]).encode())
+                                          - len(str(part)) - 1)
+
+        raw_payload = _json([[languages.get(language, '') for language in LANGUAGES]
+                             for _, _, languages in self.variants]).encode()
+        dedup_payload = (_json(self.fragments) + _json(self.parts)).encode()
+        shared = sorted(self.fragment_ids.items(),
+                        key=lambda item: self.uses[item[0]] * len(self.fragments[item[1]]),
+                        reverse=True)
+        return {
+            'variants': len(self.variants),
+            'fragments': len(self.fragments),
+            'raw_bytes': len(raw_payload),
+            'dedup_bytes': len(dedup_payload),
+            'raw_gzip_bytes': len(gzip.compress(raw_payload)),
+            'dedup_gzip_bytes': len(gzip.compress(dedup_payload)),
+            'components': {
+                export_name: {'raw_bytes': size, 'saved_bytes': saved.get(export_name, 0)}
+                for export_name, size in raw.items()
+            },
+            'top_fragments': [
+                {'uses': self.uses[digest], 'bytes': len(self.fragments[index].encode()),
+                 'preview': self.fragments[index].split('\n', 1)[0][:60]}
+                for digest, index in shared
+            ],
+        }
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def render_module(self):
+        """Return a TypeScript module with a drop-in getCodeVariants()."""
+        return (GENERATED_HEADER + _MODULE_TEMPLATE
+                .replace('{languages}', _json(list(LANGUAGES)))
+                .replace('{fragments}', _json(self.fragments))
+                .replace('{components}', _json(self.components))
+                .replace('{variants}', _json(self.parts)))
+
+
+_MODULE_TEMPLATE = '''
+import type { CodeVariant } from './codeVariants';
+
+type Part = number | string;
+
+const languages = {languages} as const;
+
+// Lines shared by two or more variants, referenced by index below
+const fragments: string[] = {fragments};
+
+const components: Record<string, string> = {components};
+
+// export name -> variant key -> parts per language (react, vanilla, extjs, typescript)
+const variants: Record<string, Record<string, Part[][]>> = {variants};
+
+const assembled = new Map<string, CodeVariant>();
+
+function join(parts: Part[]): string {
+  return parts.map((part) => (typeof part === 'number' ? fragments[part] : part)).join('\\n');
+}
+
+export function getCodeVariants(
+  componentName: string,
+  exampleName: string
+): CodeVariant | null {
+  const exportName = components[componentName.toLowerCase()];
+  const componentExamples = exportName ? variants[exportName] : undefined;
+  if (!componentExamples) {
+    console.warn(`No code examples found for component: ${componentName}`);
+    return null;
+  }
+
+  const cacheKey = `${exportName}/${exampleName}`;
+  const cached = assembled.get(cacheKey);
+  if (cached) {
+    return cached;
+  }
+
+  const parts = componentExamples[exampleName];
+  if (!parts) {
+    console.warn(`No example "${exampleName}" found for component: ${componentName}`);
+    return null;
+  }
+
+  const example = {} as CodeVariant;
+  languages.forEach((language, index) => {
+    example[language] = join(parts[index]);
+  });
+  assembled.set(cacheKey, example);
+  return example;
+}
+'''
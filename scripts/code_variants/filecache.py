@@ -0,0 +1,104 @@
+"""
+Per-file result cache keyed by a content fingerprint.
+
+Each entry stores a file's mtime, size and SHA-256 next to whatever the
+caller derived from it (parsed story details, lookup tables, ...). A file
+is only re-hashed when its mtime or size moved, and only re-parsed when its
+hash changed, so an unchanged tree costs one `stat()` per file.
+
+Usage:
+    cache = FileCache('verify-stories', version=1)
+    hit, value = cache.get(path)
+    if not hit:
+        value = parse(path)
+        cache.put(path, value)
+    cache.save()
+"""
+
+import json
+import os
+
+from .fileio import file_sha256
+from .paths import CACHE_DIR
+
+
+class FileCache:
+    """JSON-backed map of path -> (fingerprint, value)."""
+
+    def __init__(self, name, version=1, cache_dir=CACHE_DIR):
+        self.path = os.path.join(str(cache_dir), f'{name}.json')
+        self.version = version
+        self.entries = {}
+        self.dirty = False
+        self._missed = {}   # path -> (stat, sha256 or None) from the last get() miss
+        try:
+            with open(self.path) as f:
+                payload = json.load(f)
+            if payload.get('version') == version:
+                self.entries = payload['entries']
+        except (OSError, ValueError, KeyError):
+            pass
+
+    def get(self, path):
+        """
+        Return (hit, value) for `path`.
+
+        A hit means the stored value was derived from the file's current
+        content. A miss remembers the stat it took (and the hash, when it
+        had to compute one) for the `put()` that follows.
+        """
+        key = str(path)
+        stat = os.stat(path)
+        entry = self.entries.get(key)
+        digest = None
+        if entry is not None:
+            if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+                return True, entry['value']
+            # Touched but maybe not changed (checkout, rebase): let the hash decide
+            if entry['size'] == stat.st_size:
+                digest = file_sha256(path)
+                if entry['sha256'] == digest:
+                    entry['mtime_ns'] = stat.st_mtime_ns
+                    self.dirty = True
+                    return True, entry['value']
+        self._missed[key] = (stat, digest)
+        return False, None
+
+    def put(self, path, value):
+        """
+        Store `value` for the file's current content.
+
+        After a get() miss on `path` the stat (and hash, if one was taken)
+        from that call are used, so the entry describes the file as it was
+        before `value` was derived from it.
+        """
+        key = str(path)
+        stat, digest = self._missed.pop(key, (None, None))
+        if stat is None:
+            stat = os.stat(path)
+        self.entries[key] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': digest or file_sha256(path),
+            'value': value,
+        }
+        self.dirty = True
+
+    def prune(self, paths):
+        """Forget entries for files not in `paths` (deleted or renamed)."""
+        keep = {str(p) for p in paths}
+        stale = [key for key in self.entries if key not in keep]
+        for key in stale:
+            del self.entries[key]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        """Write the cache if anything changed."""
+        if not self.dirty:
+            return
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = f'{self.path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump({'version': self.version, 'entries': self.entries}, f, separators=(',', ':'))
+        os.replace(tmp_path, self.path)
+        self.dirty = False
@@ -0,0 +1,187 @@
+"""
+File helpers shared by the code variant tooling.
+
+codeVariants.ts is several megabytes and grows with every component, so
+nothing here needs the whole file in memory:
+
+- `MappedFile` maps a file read-only; slicing, `find()` and compiled
+  `bytes` patterns work on the mapping and only copy what they return
+- `splice_write()` applies edits by streaming the unchanged regions from
+  the old file into a temp file, then renames it over the original
+- `file_sha256()` hashes in fixed-size chunks
+"""
+
+import mmap
+import os
+from contextlib import contextmanager
+
+# Read/copy granularity for streaming helpers
+CHUNK_SIZE = 1 << 20
+
+
+class MappedFile:
+    """
+    Read-only memory map of a file.
+
+    Usage:
+        with MappedFile(VARIANTS_FILE) as source:
+            start = source.find(b'export const buttonExamples')
+            block = source[start:source.find(b'\\n};', start) + 3]
+
+    Pages are loaded lazily by the OS, so searching touches the file once
+    and extracting a block copies only that block. Empty files map to b''.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self._file = open(self.path, 'rb')
+        try:
+            size = os.fstat(self._file.fileno()).st_size
+            self.data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        except BaseException:
+            self._file.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        if isinstance(self.data, mmap.mmap):
+            self.data.close()
+        self._file.close()
+
+    def __len__(self):
+        return len(self.data)
+
+    def __getitem__(self, index):
+        return self.data[index]
+
+    def find(self, sub, start=0, end=None):
+        return self.data.find(sub, start, len(self.data) if end is None else end)
+
+    def rfind(self, sub, start=0, end=None):
+        return self.data.rfind(sub, start, len(self.data) if end is None else end)
+
+    def search(self, pattern, start=0, end=None):
+        """Run a compiled bytes pattern's search() over the mapping."""
+        return pattern.search(self.data, start, len(self.data) if end is None else end)
+
+
+def file_sha256(path):
+    """Return the hex SHA-256 of a file, read in chunks."""
+    import hashlib      # lazily: a warm run that only stats files never hashes
+
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+@contextmanager
+def _replacing(path):
+    """
+    Yield a binary file whose contents replace `path` when the block exits.
+
+    The temp file lives in the same directory, is flushed to disk before
+    the rename, and gets the permissions of the existing target (or the
+    usual umask-based mode for a new file). On error it is removed and
+    `path` is left untouched.
+    """
+    import tempfile     # lazily, like hashlib: read-only runs never write
+
+    path = str(path)
+    directory = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix='.' + os.path.basename(path) + '.', dir=directory)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        try:
+            mode = os.stat(path).st_mode & 0o7777
+        except FileNotFoundError:
+            # New file: what open() would have created (mkstemp uses 0600)
+            umask = os.umask(0)
+            os.umask(umask)
+            mode = 0o666 & ~umask
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_path)
+        except FileNotFoundError:
+            pass
+        raise
+
+
+def atomic_write(path, data):
+    """
+    Replace `path` with `data` so readers never see a half-written file.
+
+    The bytes go to a temp file in the same directory, are flushed to disk,
+    and the temp file is renamed over the original. File permissions of an
+    existing target are kept.
+    """
+    with _replacing(path) as f:
+        f.write(data)
+
+
+def splice_write(path, edits):
+    """
+    Apply edits to `path` without loading it, atomically.
+
+    Unchanged regions are copied from the old file to a temp file in
+    CHUNK_SIZE pieces, with each edit's new bytes written in between, and
+    the temp file is renamed over the original. Peak memory is one chunk
+    plus the inserted text, whatever the file size.
+
+    Args:
+        edits: (offset, delete_length, new_bytes) tuples in file
+            coordinates, non-overlapping; edits at the same offset are
+            applied in list order
+    """
+    edits = sorted(edits, key=lambda e: e[0])
+    with open(path, 'rb') as source, _replacing(path) as target:
+        cursor = 0
+        for offset, length, new in edits:
+            if offset < cursor:
+                raise ValueError(f"Overlapping edits at byte {offset}")
+            _copy_range(source, target, cursor, offset)
+            target.write(new)
+            cursor = offset + length
+        _copy_range(source, target, cursor, None)
+
+
+def _copy_range(source, target, start, end):
+    """Copy source[start:end] (to EOF when end is None) in chunks."""
+    source.seek(start)
+    remaining = None if end is None else end - start
+    while remaining is None or remaining > 0:
+        chunk = source.read(CHUNK_SIZE if remaining is None else min(CHUNK_SIZE, remaining))
+        if not chunk:
+            break
+        target.write(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+
+
+def write_if_changed(path, data):
+    """
+    Write `data` (bytes) to `path` unless the file already holds exactly that.
+
+    Returns:
+        True if the file was written, False if it was already up to date
+    """
+    try:
+        if os.path.getsize(path) == len(data):
+            with open(path, 'rb') as f:
+                if f.read() == data:
+                    return False
+    except FileNotFoundError:
+        pass
+    atomic_write(path, data)
+    return True
@@ -0,0 +1,290 @@
+"""
+Dead-variant collection for codeVariants.ts.
+
+Variants pile up in codeVariants.ts once nothing renders them: staged
+leftovers pasted in from code-variants-additions/ and the *_to_add files,
+renamed stories, examples objects that never made it into the mapping
+table. `collect()` works out what is still reachable from the story
+sources and returns the edits that remove the rest:
+
+- a variant is reachable when a `getCodeVariants('<key>', '<example>')`
+  call or a `<MultiLanguageCode componentName=... exampleName=...>`
+  element names it (keys are matched case-insensitively, like
+  getCodeVariants() does)
+- an examples object is pinned whole when a call names its key with a
+  non-literal example, when a source outside codeVariants.ts refers to
+  its export name, or when code inside codeVariants.ts does (other than
+  the mapping table)
+- an examples object with nothing reachable is removed whole, with its
+  header comment and its getCodeVariants() mapping entries; otherwise
+  only its unreachable variants are removed
+
+A call whose component key is not a string literal could reach anything,
+so a single one makes `collect()` refuse to remove anything. Disabled
+story files (`*.stories.tsx.disabled`) count as sources, so re-enabling
+one never finds its variants gone.
+
+Usage:
+    from code_variants.catalog import load_catalog
+    from code_variants.gc import collect
+
+    catalog = load_catalog()
+    result = collect(catalog)
+    catalog.apply_edits(result.edits)
+"""
+
+import os
+import re
+from collections import namedtuple
+
+from . import lexer
+from .catalog import CatalogError
+from .fileio import MappedFile
+from .paths import BLOCKS_DIR, REPO_ROOT, STORIES_DIR, VARIANTS_FILE
+from .stories import scan_stories
+
+SOURCE_SUFFIXES = ('.tsx', '.ts', '.jsx', '.js', '.mdx')
+# Never scanned for references: build output, dependencies, the variants themselves
+# and the modules generated from them
+_SKIP_DIRS = {'node_modules', 'storybook-static', 'codeVariants.disabled', '.git',
+              'codeVariants.shards', 'codeVariants.blobs', 'codeVariants.assets'}
+# First line of every module the shard, dedup, blob and asset generators write;
+# such a module copies export names out of codeVariants.ts, it does not use them
+_GENERATED = re.compile(rb'// Generated by scripts/[\w.-]+ from codeVariants\.ts\.\n')
+
+Reference = namedtuple('Reference', 'file line component example')
+Garbage = namedtuple('Garbage', 'export component_keys variant size')
+Collection = namedtuple('Collection', 'edits garbage pinned dynamic references')
+
+_ELEMENT = re.compile(rb'<MultiLanguageCode\b([^>]*)>')
+_ATTRIBUTE = re.compile(rb'\b(componentName|exampleName)\s*=\s*'
+                        rb'(?:([\'"])([^\'"\n]*)\2|\{\s*([\'"`])([^\'"`\n]*)\4\s*\}|(\{))')
+_KEY_ONLY = re.compile(rb'getCodeVariants\(\s*([\'"])([^\'"\n]*)\1\s*,')
+_IDENTIFIER = re.compile(rb'(?<![\w$.])[A-Za-z_$][\w$]*(?![\w$])(?!\s*:)')
+
+
+def find_sources(paths):
+    """Source files under `paths`, disabled ones included, sorted."""
+    suffixes = SOURCE_SUFFIXES + tuple(suffix + '.disabled' for suffix in SOURCE_SUFFIXES)
+    found = []
+    for path in paths:
+        path = str(path)
+        if os.path.isfile(path):
+            found.append(path)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if d not in _SKIP_DIRS]
+            found.extend(os.path.join(root, name) for name in files if name.endswith(suffixes))
+    return sorted(found)
+
+
+def _line(data, offset):
+    return data.count(b'\n', 0, offset) + 1
+
+
+def scan_references(path, data):
+    """
+    Every getCodeVariants() call and MultiLanguageCode element in one file.
+
+    Returns:
+        List of References; component/example are None when not literal
+    """
+    references = []
+    _, _, calls = scan_stories(data, calls=True)
+    for call in calls:
+        key, example = call.variant_key, call.example_name
+        if key is None:
+            match = _KEY_ONLY.match(data, call.offset)
+            if match:
+                key = match.group(2).decode()
+        references.append(Reference(path, _line(data, call.offset), key, example))
+
+    for element in _ELEMENT.finditer(data):
+        values = {}
+        for match in _ATTRIBUTE.finditer(element.group(1)):
+            name, _, quoted, _, braced, expression = match.groups()
+            value = quoted if quoted is not None else braced
+            values[name.decode()] = None if expression else value.decode()
+        if 'componentName' in values or 'exampleName' in values:
+            references.append(Reference(path, _line(data, element.start()),
+                                        values.get('componentName'), values.get('exampleName')))
+    return references
+
+
+def _names_in(data, names):
+    """Which of `names` appear as whole identifiers in `data`."""
+    if not names:
+        return set()
+    pattern = re.compile(rb'(?<![\w$])(' + b'|'.join(re.escape(name.encode()) for name in names)
+                         + rb')(?![\w$])')
+    return {match.group(1).decode() for match in pattern.finditer(data)}
+
+
+def _internal_uses(data, catalog):
+    """
+    Export names used by code in codeVariants.ts beyond their definition
+    and mapping (object keys such as `buttonExamples: {` do not count).
+    """
+    names = set(catalog.exports)
+    used = set()
+    for token in lexer.tokenize(data):
+        if token.kind != lexer.CODE:
+            continue
+        for match in _IDENTIFIER.finditer(data, token.start, token.end):
+            name = match.group().decode()
+            if name in names and not _is_definition(catalog, name, match.start()) \
+                    and not _in_mapping(catalog, match.start()):
+                used.add(name)
+    return used
+
+
+def _is_definition(catalog, name, offset):
+    entry = catalog.exports[name]
+    return entry['start'] <= offset < entry['open']
+
+
+def _in_mapping(catalog, offset):
+    function = catalog.function
+    return bool(function) and function['mapping_open'] is not None and \
+        function['mapping_open'] < offset < function['mapping_close']
+
+
+def _variant_span(data, entry, variant):
+    """Bytes of one `key: { ... },` entry with the whitespace before it."""
+    lo = variant['start']
+    while lo > entry['open'] + 1 and data[lo - 1] in b' \t\r\n':
+        lo -= 1
+    hi = variant['close'] + 1
+    cursor = hi
+    while cursor < entry['close'] and data[cursor] in b' \t\r\n':
+        cursor += 1
+    if data[cursor:cursor + 1] == b',':
+        hi = cursor + 1
+    return lo, hi
+
+
+def _export_span(data, entry):
+    """Bytes of an export statement with its header comment lines."""
+    lo = data.rfind(b'\n', 0, entry['start']) + 1
+    while lo > 0:
+        previous = data.rfind(b'\n', 0, lo - 1) + 1
+        if not data[previous:lo].lstrip().startswith(b'//'):
+            break
+        lo = previous
+    while lo > 0 and data[lo - 1] in b' \t\r\n':
+        lo -= 1
+    return lo, entry['end']
+
+
+def _mapping_span(data, entry):
+    lo, hi = entry['span']
+    while lo > 0 and data[lo - 1] in b' \t':
+        lo -= 1
+    if lo > 0 and data[lo - 1] == 0x0A:
+        lo -= 1
+    return lo, hi
+
+
+def collect(catalog, source_paths=(STORIES_DIR,), reference_paths=(STORIES_DIR, BLOCKS_DIR), keep=()):
+    """
+    Work out which variants nothing reaches and the edits removing them.
+
+    Args:
+        catalog: A loaded VariantCatalog
+        source_paths: Where to look for getCodeVariants() calls and
+            MultiLanguageCode elements
+        reference_paths: Where to look for direct uses of export names
+            (codeVariants.ts itself is checked separately). Staging files
+            elsewhere in storybook/ do not count, and neither do modules
+            generated from codeVariants.ts.
+        keep: 'component' or 'component/variant' strings never removed
+
+    Returns:
+        Collection(edits, garbage, pinned, dynamic, references): edits for
+        `catalog.apply_edits()`, a Garbage entry per removed variant
+        (variant None for a whole examples object), {export: reason} for
+        pinned objects, the references with a non-literal component key
+        (nothing is removed when there are any), and all references
+    """
+    references = []
+    for path in find_sources(source_paths):
+        with open(path, 'rb') as f:
+            data = f.read()
+        if b'getCodeVariants' in data or b'MultiLanguageCode' in data:
+            references.extend(scan_references(path, data))
+
+    reached = {}
+    pinned = {}
+    mapping = catalog.mapping
+    keys_of = {}
+    for key, export_name in mapping.items():
+        keys_of.setdefault(export_name, []).append(key)
+    dynamic = [ref for ref in references if ref.component is None]
+    for ref in references:
+        if ref.component is None:
+            continue
+        export_name = mapping.get(ref.component.lower())
+        if export_name is None:
+            continue
+        if ref.example is None:
+            pinned.setdefault(export_name, f"non-literal example at {_relative(ref.file)}:{ref.line}")
+        else:
+            reached.setdefault(export_name, set()).add(ref.example)
+
+    for path in find_sources(reference_paths):
+        if os.path.basename(path) in (VARIANTS_FILE.name, os.path.basename(catalog.path)):
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        if _GENERATED.match(data):
+            continue
+        for name in _names_in(data, set(catalog.exports) - set(pinned)):
+            pinned[name] = f"used by {_relative(path)}"
+
+    for item in keep:
+        component, _, variant = item.partition('/')
+        try:
+            export_name, _ = catalog.resolve(component)
+        except CatalogError:
+            continue
+        if variant:
+            reached.setdefault(export_name, set()).add(variant)
+        else:
+            pinned.setdefault(export_name, 'kept with --keep')
+
+    edits = []
+    garbage = []
+    if dynamic:
+        return Collection(edits, garbage, pinned, dynamic, references)
+
+    with MappedFile(catalog.path) as source:
+        data = source.data
+        for name in sorted(_internal_uses(data, catalog) - set(pinned)):
+            pinned[name] = f"used inside {VARIANTS_FILE.name}"
+
+        for export_name, entry in catalog.exports.items():
+            if export_name in pinned:
+                continue
+            names = reached.get(export_name, set())
+            alive = [key for key in entry['variants'] if key in names]
+            if not alive:
+                lo, hi = _export_span(data, entry)
+                edits.append((lo, hi - lo, b''))
+                garbage.append(Garbage(export_name, keys_of.get(export_name, []), None, hi - lo))
+                for key in keys_of.get(export_name, []):
+                    lo, hi = _mapping_span(data, catalog.function['mapping'][key])
+                    edits.append((lo, hi - lo, b''))
+                continue
+            for key, variant in entry['variants'].items():
+                if key in names or variant['close'] is None:
+                    continue
+                lo, hi = _variant_span(data, entry, variant)
+                edits.append((lo, hi - lo, b''))
+                garbage.append(Garbage(export_name, keys_of.get(export_name, []), key, hi - lo))
+
+    edits.sort(key=lambda edit: edit[0])
+    return Collection(edits, garbage, pinned, dynamic, references)
+
+
+def _relative(path):
+    return os.path.relpath(path, REPO_ROOT)
@@ -0,0 +1,302 @@
+"""
+Template-literal integrity checks for codeVariants.ts.
+
+Every code sample is a JavaScript template literal, so a few characters
+that are harmless in the sample itself break the module or silently change
+the sample:
+
+- backtick  an unescaped ` ends the template early; the rest of the sample
+            is parsed as code (or, with an odd count, the module fails to
+            load). Reported at the backtick that closed the template.
+- interpolation  an unescaped ${ is evaluated when the module loads, which
+            throws for any name not in scope (write \\${ instead)
+- escape    \\x, \\u and octal escapes that are not valid in a template
+            (a syntax error in the whole module)
+- bracket   {} () [] that do not balance or nest inside the sample
+- syntax    the file itself does not lex (unterminated string, template or
+            comment, stray closing brace)
+
+Each examples object is walked with the lexer: between the template
+literals of a variant there may only be keys, colons, commas, comments
+and whitespace, so anything else means a template closed early. The
+template bodies are then checked with one precompiled pattern each.
+
+`check_file()` splits the exports across worker processes (their spans
+come from the cached catalog index); `check_source()` checks bytes in
+memory and is what `VariantCatalog.apply_edits()` runs on every statement
+it is about to write, so the add-* scripts cannot write a broken sample.
+
+Usage:
+    from code_variants.integrity import check_file
+
+    for finding in check_file():
+        print(f"{finding.line}:{finding.column} {finding.kind} {finding.message}")
+"""
+
+import bisect
+import os
+import re
+from collections import namedtuple
+
+from . import lexer
+from .paths import VARIANTS_FILE
+
+# Fewer exports than this per worker is not worth a process
+MIN_EXPORTS_PER_JOB = 8
+
+Finding = namedtuple('Finding', 'kind offset line column message export variant language')
+
+# What may sit between an object's values: commas, then optionally `key:`
+_SEPARATOR = re.compile(rb'[\s,]*(?:(?:[\w$]+\s*)?:\s*)?')
+_KEY = re.compile(rb'([\w$]+)\s*:\s*$')
+# One pass over a template body: escapes, interpolations and brackets
+_BODY = re.compile(
+    rb'\\(?:(x)(?![0-9a-fA-F]{2})|(u)(?![0-9a-fA-F]{4}|\{[0-9a-fA-F]+\})|(0)(?=[0-9])|([1-9])'
+    rb'|(\r\n|[\s\S]))'
+    rb'|(\$\{)'
+    rb'|([{}()\[\]])'
+)
+_PAIRS = {ord('}'): ord('{'), ord(')'): ord('('), ord(']'): ord('[')}
+_OPENERS = frozenset(b'{([')
+
+
+def _finding(kind, offset, message, context=(None, None, None)):
+    return Finding(kind, offset, None, None, message, *context)
+
+
+def check_template(data, start, end, context=(None, None, None)):
+    """
+    Check one template literal's body.
+
+    Args:
+        data: Buffer holding the template
+        start: Offset of the opening backtick
+        end: Offset just past the closing backtick
+        context: (export, variant, language) carried into the findings
+
+    Returns:
+        List of Findings (offsets into `data`)
+    """
+    findings = []
+    stack = []
+    bracket_error = False
+    for match in _BODY.finditer(data, start + 1, end - 1):
+        hex_x, hex_u, octal, digit, escaped, dollar, bracket = match.groups()
+        if bracket is None and escaped is not None and escaped in b'{}()[]':
+            bracket = escaped
+        if hex_x or hex_u:
+            findings.append(_finding('escape', match.start(),
+                                     f"invalid \\{(hex_x or hex_u).decode()} escape "
+                                     f"(write \\\\{(hex_x or hex_u).decode()} for a literal backslash)",
+                                     context))
+        elif octal or digit:
+            findings.append(_finding('escape', match.start(),
+                                     f"octal escape \\{(octal or digit).decode()} is not allowed "
+                                     f"in a template literal", context))
+        elif dollar:
+            findings.append(_finding('interpolation', match.start(),
+                                     "unescaped ${ is evaluated when the module loads "
+                                     "(write \\${ to show it in the sample)", context))
+            stack.append((ord('{'), match.end() - 1))
+        elif bracket and not bracket_error:
+            char = bracket[0]
+            if char in _OPENERS:
+                stack.append((char, match.end() - 1))
+            elif not stack or stack[-1][0] != _PAIRS[char]:
+                expected = f", expected closer for '{chr(stack[-1][0])}'" if stack else ''
+                findings.append(_finding('bracket', match.end() - 1,
+                                         f"unbalanced '{chr(char)}'{expected}", context))
+                bracket_error = True
+            else:
+                stack.pop()
+    if stack and not bracket_error:
+        char, offset = stack[-1]
+        findings.append(_finding('bracket', offset, f"'{chr(char)}' is never closed", context))
+    return findings
+
+
+def check_export(data, name, open_pos, close_pos):
+    """
+    Check one examples object: its structure and every template in it.
+
+    Args:
+        data: Buffer holding the object
+        name: Export name (for the findings)
+        open_pos: Offset of the object's `{`
+        close_pos: Offset of its `}`
+    """
+    findings = []
+    variant = None
+    key = None
+    previous = None
+    early_end = False   # the previous template closed early (its brackets are noise)
+    for token in lexer.tokenize(data, open_pos + 1, close_pos):
+        kind, start, end, depth = token
+        if kind == lexer.COMMENT:
+            continue
+        if depth > 1:
+            previous = token
+            continue
+        if kind == lexer.CODE:
+            text = data[start:end]
+            if _SEPARATOR.fullmatch(text) is None:
+                if previous is not None and previous.kind == lexer.TEMPLATE:
+                    findings = [f for f in findings if f.kind != 'bracket'
+                                or not previous.start <= f.offset < previous.end]
+                    findings.append(_finding(
+                        'backtick', previous.end - 1,
+                        f"template ends early, followed by code "
+                        f"'{_excerpt(text)}' - unescaped backtick?", (name, variant, key)))
+                    early_end = True
+                else:
+                    findings.append(_finding('syntax', start + len(text) - len(text.lstrip()),
+                                             f"unexpected '{_excerpt(text)}' in examples object",
+                                             (name, variant, key)))
+                continue
+            match = _KEY.search(text)
+            key = match.group(1).decode() if match else None
+        elif kind == lexer.STRING:
+            key = data[start + 1:end - 1].decode('utf-8', 'replace')
+        elif kind == lexer.OPEN:
+            if depth == 0:
+                variant, key = key, None
+        elif kind == lexer.CLOSE:
+            if depth == 0:
+                variant = None
+        elif kind == lexer.TEMPLATE:
+            if depth == 1:
+                found = check_template(data, start, end, (name, variant, key))
+                if early_end:
+                    found = [f for f in found if f.kind != 'bracket']
+                findings.extend(found)
+            else:
+                findings.append(_finding('syntax', start, "template literal outside a variant",
+                                         (name, variant, key)))
+            early_end = False
+        previous = token
+    return findings
+
+
+def _excerpt(text, limit=40):
+    text = ' '.join(text.decode('utf-8', 'replace').split())
+    return text if len(text) <= limit else text[:limit - 3] + '...'
+
+
+def _check_exports(data, units):
+    findings = []
+    for name, open_pos, close_pos in units:
+        findings.extend(check_export(data, name, open_pos, close_pos))
+    return findings
+
+
+def _check_exports_in_file(job):
+    """Worker: check a list of exports of a file (it maps the file itself)."""
+    from .fileio import MappedFile
+
+    path, units = job
+    with MappedFile(path) as source:
+        return _check_exports(source.data, units)
+
+
+def _export_units(data, base=0):
+    """(name, open, close) of every examples object, via the catalog parser."""
+    from .catalog import parse_region
+
+    exports, _ = parse_region(data, base)
+    return [(name, entry['open'] - base, entry['close'] - base)
+            for name, entry in exports.items() if entry['close'] is not None]
+
+
+def _lex_failure(data, error):
+    """
+    Findings for source that does not lex: the error itself and, since the
+    usual cause is a stray backtick, the end of the last template literal
+    read before it.
+    """
+    findings = [_finding('syntax', error.offset, str(error))]
+    last_template = None
+    try:
+        for token in lexer.tokenize(data):
+            if token.start >= error.offset:
+                break
+            if token.kind == lexer.TEMPLATE:
+                last_template = token
+    except lexer.LexError:
+        pass
+    if last_template is not None:
+        findings.append(_finding('backtick', last_template.end - 1,
+                                 "last template literal before the syntax error ends here "
+                                 "- unescaped backtick?"))
+    return findings
+
+
+def locate(data, findings, first_line=1):
+    """
+    Fill in 1-based line and column for findings with offsets into `data`.
+
+    Args:
+        first_line: Line number of data's first byte (for regions of a file)
+
+    Returns:
+        The findings sorted by offset
+    """
+    if not findings:
+        return []
+    newlines = [match.start() for match in re.finditer(rb'\n', data)]
+    located = []
+    for finding in sorted(findings, key=lambda f: f.offset):
+        index = bisect.bisect_left(newlines, finding.offset)
+        line_start = newlines[index - 1] + 1 if index else 0
+        located.append(finding._replace(line=first_line + index,
+                                        column=finding.offset - line_start + 1))
+    return located
+
+
+def check_source(data, first_line=1):
+    """
+    Check TypeScript source held in memory (a whole file or whole statements).
+
+    Returns:
+        Located findings; a source that does not lex gives one 'syntax' finding
+    """
+    try:
+        units = _export_units(data)
+    except lexer.LexError as e:
+        return locate(data, _lex_failure(data, e), first_line)
+    return locate(data, _check_exports(data, units), first_line)
+
+
+def check_file(path=VARIANTS_FILE, jobs=None):
+    """
+    Check every template literal in a variants file.
+
+    Args:
+        path: The variants file
+        jobs: Worker processes (None = CPU count, 1 = check in this process)
+
+    Returns:
+        Located findings, sorted by offset
+    """
+    from .catalog import load_catalog
+    from .fileio import MappedFile
+
+    path = str(path)
+    with MappedFile(path) as source:
+        data = source.data
+        try:
+            catalog = load_catalog(path)
+        except lexer.LexError as e:
+            return locate(data, _lex_failure(data, e))
+        units = [(name, entry['open'], entry['close']) for name, entry in catalog.exports.items()]
+
+        workers = jobs or os.cpu_count() or 1
+        workers = min(workers, len(units) // MIN_EXPORTS_PER_JOB)
+        if workers > 1:
+            from concurrent.futures import ProcessPoolExecutor
+            # Interleave so each worker gets a mix of small and large exports
+            chunks = [(path, units[i::workers]) for i in range(workers)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                findings = [f for part in pool.map(_check_exports_in_file, chunks) for f in part]
+        else:
+            findings = _check_exports(data, units)
+        return locate(data, findings)
@@ -0,0 +1,256 @@
+"""
+Append-only journal of the edits made to codeVariants.ts.
+
+Instead of a full copy of the file before each risky edit, every
+`VariantCatalog.apply_edits()` appends one line describing only the spans
+it changed, so a safety point costs a few hundred bytes:
+
+    {"seq": 12, "op": "edit", "time": "...", "before": <sha256>, "after": <sha256>,
+     "edits": [[offset, old_length, old_sha256_prefix, new_text], ...]}
+    {"seq": 13, "op": "label", "time": "...", "label": "before-chart-fix", "at": <sha256>}
+    {"seq": 14, "op": "undo", "time": "...", "undoes": 12}
+
+Offsets are in the coordinates of the file before the edit. Pure
+insertions (the common case) store no old bytes at all; edits that delete
+or replace text also keep the old text as a fifth element, since a hash
+alone cannot restore it.
+
+`undo(n)` and `rollback(label)` invert edits from the top of the stack,
+after checking the file's SHA-256 still matches what the journal expects,
+and record `undo` lines rather than rewriting history. `compact()` drops
+undone edits and everything older than the last `keep` edits; it runs on
+its own once the journal outgrows COMPACT_BYTES.
+
+Usage:
+    journal = Journal.for_file(VARIANTS_FILE)
+    journal.label('before-chart-fix')
+    ...                                   # edits through the catalog
+    journal.rollback('before-chart-fix')
+"""
+
+import base64
+import hashlib
+import json
+import os
+import time
+
+from .fileio import atomic_write, file_sha256, splice_write
+from .paths import CACHE_DIR
+
+# Compact automatically once the journal file is larger than this
+COMPACT_BYTES = 4 << 20
+# Edits kept by compaction (older ones can no longer be undone)
+KEEP_EDITS = 500
+# Hex digits of the old-bytes hash stored per edit
+_OLD_HASH_LENGTH = 16
+
+
+class JournalError(Exception):
+    """Raised when the journal cannot be applied to the file as it is on disk."""
+
+
+def _old_hash(data):
+    return hashlib.sha256(data).hexdigest()[:_OLD_HASH_LENGTH]
+
+
+def _encode(data):
+    """Journal text for edit bytes: UTF-8 when possible, else base64."""
+    try:
+        return data.decode('utf-8')
+    except UnicodeDecodeError:
+        return {'b64': base64.b64encode(data).decode('ascii')}
+
+
+def _decode(value):
+    if isinstance(value, dict):
+        return base64.b64decode(value['b64'])
+    return value.encode('utf-8')
+
+
+def _journal_file(path, cache_dir):
+    name = hashlib.sha1(str(path).encode()).hexdigest()[:12]
+    return os.path.join(cache_dir, f'journal-{name}.jsonl')
+
+
+class Journal:
+    """Edit journal of one file; see the module docstring."""
+
+    def __init__(self, path, journal_path):
+        self.path = str(path)
+        self.journal_path = str(journal_path)
+
+    @classmethod
+    def for_file(cls, path, cache_dir=CACHE_DIR):
+        """Return the journal kept for `path` under `cache_dir`."""
+        return cls(path, _journal_file(str(path), str(cache_dir)))
+
+    # ------------------------------------------------------------------
+    # Reading
+    # ------------------------------------------------------------------
+
+    def records(self):
+        """Every line of the journal, oldest first."""
+        records = []
+        try:
+            with open(self.journal_path) as f:
+                for line in f:
+                    if line.strip():
+                        records.append(json.loads(line))
+        except FileNotFoundError:
+            pass
+        return records
+
+    def stack(self, records=None):
+        """
+        The live edit and label records, oldest first.
+
+        Undoing an edit also drops any label recorded after it, since the
+        state that label named no longer exists.
+        """
+        stack = []
+        for record in self.records() if records is None else records:
+            if record['op'] == 'undo':
+                while stack:
+                    if stack.pop()['seq'] == record['undoes']:
+                        break
+            else:
+                stack.append(record)
+        return stack
+
+    # ------------------------------------------------------------------
+    # Writing
+    # ------------------------------------------------------------------
+
+    def _last_seq(self):
+        """Sequence number of the last record, reading only the file's tail."""
+        try:
+            with open(self.journal_path, 'rb') as f:
+                end = f.seek(0, os.SEEK_END)
+                tail = b''
+                while end > 0:
+                    start = max(0, end - 65536)
+                    f.seek(start)
+                    tail = f.read(end - start) + tail
+                    end = start
+                    lines = tail.rstrip(b'\n')
+                    if b'\n' in lines or end == 0:
+                        break
+        except FileNotFoundError:
+            return 0
+        last = tail.rstrip(b'\n').rsplit(b'\n', 1)[-1]
+        return json.loads(last)['seq'] if last.strip() else 0
+
+    def _append(self, record, records=None):
+        seq = (records[-1]['seq'] if records else 0) if records is not None else self._last_seq()
+        record = dict(seq=seq + 1, op=record.pop('op'),
+                      time=time.strftime('%Y-%m-%dT%H:%M:%S'), **record)
+        os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+        with open(self.journal_path, 'a') as f:
+            f.write(json.dumps(record, separators=(',', ':')) + '\n')
+        return record
+
+    def record_edits(self, edits, old_bytes, before, after):
+        """
+        Append one applied edit transaction.
+
+        Args:
+            edits: (offset, delete_length, new_bytes) tuples, sorted, in the
+                coordinates of the file before the edit
+            old_bytes: The bytes each edit deleted (b'' for insertions)
+            before: SHA-256 of the file before the edit
+            after: SHA-256 of the file after it
+        """
+        entries = []
+        for (offset, length, new), old in zip(edits, old_bytes):
+            entry = [offset, length, _old_hash(old), _encode(new)]
+            if length:
+                entry.append(_encode(old))
+            entries.append(entry)
+        record = self._append({'op': 'edit', 'before': before, 'after': after, 'edits': entries})
+        if os.path.getsize(self.journal_path) > COMPACT_BYTES:
+            self.compact()
+        return record
+
+    def label(self, name):
+        """Mark the file's current state so rollback(name) can return to it."""
+        return self._append({'op': 'label', 'label': name, 'at': file_sha256(self.path)})
+
+    def undo(self, count=1, dry_run=False):
+        """
+        Revert the last `count` edits, newest first.
+
+        Returns:
+            The edit records that were (or, with dry_run, would be) undone
+        """
+        records = self.records()
+        edits = [record for record in self.stack(records) if record['op'] == 'edit']
+        if count > len(edits):
+            raise JournalError(f"Only {len(edits)} edits can be undone")
+        return self._revert(list(reversed(edits[len(edits) - count:])), records, dry_run)
+
+    def rollback(self, label, dry_run=False):
+        """Revert every edit made since the most recent label called `label`."""
+        records = self.records()
+        stack = self.stack(records)
+        positions = [i for i, record in enumerate(stack)
+                     if record['op'] == 'label' and record['label'] == label]
+        if not positions:
+            raise JournalError(f"No label '{label}' in the journal")
+        newer = [record for record in stack[positions[-1] + 1:] if record['op'] == 'edit']
+        return self._revert(list(reversed(newer)), records, dry_run)
+
+    def _revert(self, edit_records, records, dry_run):
+        current = file_sha256(self.path)
+        for record in edit_records:
+            if current != record['after']:
+                raise JournalError(f"{self.path} was changed outside the journal "
+                                   f"(expected it as left by edit #{record['seq']})")
+            if dry_run:
+                current = record['before']
+                continue
+            splice_write(self.path, _inverse(record['edits']))
+            current = file_sha256(self.path)
+            if current != record['before']:
+                raise JournalError(f"Undoing edit #{record['seq']} did not restore the "
+                                   f"file's previous content")
+            records.append(self._append({'op': 'undo', 'undoes': record['seq']}, records))
+        return edit_records
+
+    def compact(self, keep=KEEP_EDITS):
+        """
+        Rewrite the journal with only the live stack's last `keep` edits
+        (and the labels among and just below them).
+
+        Returns:
+            (records before, records after)
+        """
+        records = self.records()
+        stack = self.stack(records)
+        edit_positions = [i for i, record in enumerate(stack) if record['op'] == 'edit']
+        start = 0
+        if len(edit_positions) > keep:
+            cut = edit_positions[len(edit_positions) - keep] if keep else len(stack)
+            # Labels right below the oldest kept edit can still be rolled back to
+            start = cut
+            while start > 0 and stack[start - 1]['op'] == 'label':
+                start -= 1
+        kept = stack[start:]
+        atomic_write(self.journal_path,
+                     ''.join(json.dumps(record, separators=(',', ':')) + '\n'
+                             for record in kept).encode())
+        return len(records), len(kept)
+
+
+def _inverse(entries):
+    """Edits (in post-edit coordinates) that undo a recorded transaction."""
+    inverse = []
+    shift = 0
+    for entry in entries:
+        offset, length, old_hash, new = entry[:4]
+        new = _decode(new)
+        old = _decode(entry[4]) if len(entry) > 4 else b''
+        if _old_hash(old) != old_hash:
+            raise JournalError(f"Journal entry at offset {offset} is corrupt")
+        inverse.append((offset + shift, len(new), old))
+        shift += len(new) - length
+    return inverse
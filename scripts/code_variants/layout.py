@@ -0,0 +1,467 @@
+"""
+Round-trip conversion between codeVariants.ts and the per-category layout.
+
+`codeVariants.disabled/` splits the examples into one module per category
+(`actions.ts`, `forms.ts`, ...). `split()` builds that layout from the
+monolith and `merge()` builds the monolith back, both from the parsed
+index (`catalog.parse_region`) rather than text patterns. The layout is:
+
+- `types.ts`           - everything before the first examples object
+                         (the `CodeVariant` interface)
+- `<category>.ts`      - the examples objects of one category, each with
+                         the comment lines and blank lines before it
+- `getCodeVariants.ts` - everything after the last examples object, with
+                         named imports of the objects it refers to
+- `index.ts`           - re-exports, in category order, and the order of
+                         the objects in codeVariants.ts (`// order:` lines);
+                         merge() reads both from here
+
+An object keeps the category it has in the existing layout. A new object
+goes to the category of the story directory that renders it
+(`stories/components/data-display/` -> `dataDisplay.ts`, see
+`story_categories()`), or else joins the object before it in
+codeVariants.ts. Each
+category module starts with import statements (the `CodeVariant` type
+and any objects of other categories it refers to) that merge() drops.
+Apart from those imports, every byte of the monolith lands in exactly
+one layout file, and merge() puts the objects back in the recorded order,
+so merge(split(x)) == x byte for byte and split(merge(layout)) is the
+layout again. Objects added to a module after the split follow the object
+before them in that module.
+
+`compare()` checks the result of either direction variant by variant:
+the same objects, variant keys in the same order, byte-identical raw
+template literals for every language, and the same getCodeVariants()
+mapping table.
+
+Usage:
+    from code_variants.layout import (Layout, compare, merge, read_layout,
+                                      split, variant_strings)
+
+    files, report = split(data, read_layout())
+    monolith = merge(Layout(files, list(report['categories'])))
+    problems = compare(variant_strings(data), variant_strings(monolith))
+"""
+
+import os
+import re
+
+from . import lexer
+from .catalog import CatalogError, parse_region
+from .fileio import write_if_changed
+from .paths import BLOCKS_DIR, STORIES_DIR
+
+LAYOUT_DIR = BLOCKS_DIR / 'codeVariants.disabled'
+TYPES_MODULE = 'types'
+FUNCTION_MODULE = 'getCodeVariants'
+# Used when the layout has no index.ts yet
+DEFAULT_CATEGORIES = ('actions', 'forms', 'navigation', 'feedback', 'dataDisplay', 'media',
+                      'layout', 'charts', 'utilities', 'patterns', 'integration', 'theming')
+
+TYPES_HEADER = b'// Shared type definitions for code variants\n'
+INDEX_HEADER = (b'// Generated by scripts/convert-code-variants-layout.py from codeVariants.ts.\n'
+                b'// Category modules hold the examples objects; edit them, then merge.\n')
+TYPE_IMPORT = b"import type { CodeVariant } from './types';"
+
+ORDER_COMMENT = b'// Order of the examples objects in codeVariants.ts, restored by merge:\n'
+ORDER_PREFIX = b'// order: '
+# Names per `// order:` line
+ORDER_WIDTH = 100
+
+_IMPORT = re.compile(rb'^import\b[^;]*;', re.MULTILINE)
+_REEXPORT = re.compile(rb"^export \* from '\./([\w$]+)';", re.MULTILINE)
+_ORDER = re.compile(rb'^// order: (.*)$', re.MULTILINE)
+_IDENTIFIER = re.compile(rb'(?<![\w$.])[A-Za-z_$][\w$]*(?![\w$])')
+
+
+class Layout:
+    """Category modules of a layout directory: file bytes and the category order."""
+
+    def __init__(self, files, categories):
+        self.files = files
+        self.categories = categories
+
+    def category_of(self):
+        """Export name -> category, from the category modules."""
+        owner = {}
+        for category in self.categories:
+            data = self.files.get(f'{category}.ts')
+            if data is None:
+                continue
+            exports, _ = parse_region(data)
+            for name in exports:
+                owner.setdefault(name, category)
+        return owner
+
+
+def read_layout(directory=LAYOUT_DIR):
+    """
+    Read a layout directory; an empty Layout if it does not exist.
+
+    Category order comes from the `export * from './x'` lines of index.ts,
+    falling back to DEFAULT_CATEGORIES for modules present on disk.
+    """
+    directory = str(directory)
+    files = {}
+    if os.path.isdir(directory):
+        for name in sorted(os.listdir(directory)):
+            if name.endswith('.ts'):
+                with open(os.path.join(directory, name), 'rb') as f:
+                    files[name] = f.read()
+    skip = {TYPES_MODULE, FUNCTION_MODULE, 'getCodeExample'}
+    if 'index.ts' in files:
+        categories = [match.group(1).decode() for match in _REEXPORT.finditer(files['index.ts'])]
+    else:
+        categories = [name for name in DEFAULT_CATEGORIES if f'{name}.ts' in files]
+    return Layout(files, [name for name in categories if name not in skip])
+
+
+def story_categories(mapping, categories=DEFAULT_CATEGORIES, stories_dir=STORIES_DIR):
+    """
+    Export name -> category, from the directories of the stories that use it.
+
+    A story under `stories/components/<dir>/` or `stories/<dir>/` votes for
+    the category named like `<dir>` (camelCased); directories with no such
+    category do not vote. The category with most calls wins.
+
+    Args:
+        mapping: Component key -> export name (catalog.mapping)
+        categories: Category names that may be returned
+    """
+    from .gc import find_sources, scan_references
+
+    stories_dir = str(stories_dir)
+    votes = {}
+    for path in find_sources([stories_dir]):
+        parts = os.path.relpath(path, stories_dir).split(os.sep)
+        if parts[0] == 'components' and len(parts) > 2:
+            parts = parts[1:]
+        words = parts[0].split('-')
+        category = words[0] + ''.join(word.capitalize() for word in words[1:])
+        if len(parts) < 2 or category not in categories:
+            continue
+        with open(path, 'rb') as f:
+            data = f.read()
+        if b'getCodeVariants' not in data and b'MultiLanguageCode' not in data:
+            continue
+        for ref in scan_references(path, data):
+            export_name = mapping.get((ref.component or '').lower())
+            if export_name:
+                counts = votes.setdefault(export_name, {})
+                counts[category] = counts.get(category, 0) + 1
+    return {name: max(counts, key=lambda category: (counts[category], -categories.index(category)))
+            for name, counts in votes.items()}
+
+
+def _parse(data, what):
+    exports, function = parse_region(data)
+    for name, entry in exports.items():
+        if entry['close'] is None or entry['end'] is None:
+            raise CatalogError(f"{what}: examples object {name} is not closed")
+    return exports, function
+
+
+def _first_segment_start(data, start):
+    """Start of the comment lines and blank lines before an export at `start`."""
+    lo = data.rfind(b'\n', 0, start) + 1
+    while lo > 0:
+        previous = data.rfind(b'\n', 0, lo - 1) + 1
+        if not data[previous:lo].lstrip().startswith(b'//'):
+            break
+        lo = previous
+    while lo > 0 and data[lo - 1] in b' \t\r\n':
+        lo -= 1
+    return lo
+
+
+def _header_end(data, limit):
+    """End of the last import statement before `limit` (0 when there is none)."""
+    end = 0
+    for match in _IMPORT.finditer(data, 0, limit):
+        end = match.end()
+    return end
+
+
+def _references(data, names):
+    """Which of `names` code in `data` uses (strings and comments skipped)."""
+    used = set()
+    for token in lexer.tokenize(data):
+        if token.kind != lexer.CODE:
+            continue
+        for match in _IDENTIFIER.finditer(data, token.start, token.end):
+            name = match.group().decode()
+            if name in names:
+                used.add(name)
+    return used
+
+
+def _named_imports(names, owner, categories):
+    lines = []
+    for category in categories:
+        wanted = [name for name in names if owner[name] == category]
+        if wanted:
+            lines.append(b'import {\n' + b''.join(f'  {name},\n'.encode() for name in wanted)
+                         + f"}} from './{category}';".encode())
+    return lines
+
+
+def _order_lines(names):
+    """`// order:` comment lines listing `names`, wrapped at ORDER_WIDTH."""
+    lines = []
+    line = []
+    for name in names:
+        if line and len(ORDER_PREFIX) + len(', '.join(line + [name])) > ORDER_WIDTH:
+            lines.append(ORDER_PREFIX + ', '.join(line).encode() + b'\n')
+            line = []
+        line.append(name)
+    if line:
+        lines.append(ORDER_PREFIX + ', '.join(line).encode() + b'\n')
+    return b''.join(lines)
+
+
+def recorded_order(index):
+    """Export names in codeVariants.ts order, from index.ts bytes ([] if none)."""
+    return [name.strip().decode() for match in _ORDER.finditer(index)
+            for name in match.group(1).split(b',') if name.strip()]
+
+
+def _merge_order(recorded, modules):
+    """
+    Final object order: the recorded order, with objects it does not list
+    placed after the object before them in their module.
+
+    Args:
+        recorded: recorded_order() names
+        modules: One list of export names per category module, in category order
+    """
+    present = {name for names in modules for name in names}
+    order = [name for name in recorded if name in present]
+    placed = set(order)
+    for names in modules:
+        for i, name in enumerate(names):
+            if name in placed:
+                continue
+            before = next((other for other in reversed(names[:i]) if other in placed), None)
+            if before is not None:
+                order.insert(order.index(before) + 1, name)
+            else:
+                after = next((other for other in names[i + 1:] if other in placed), None)
+                order.insert(order.index(after) if after is not None else len(order), name)
+            placed.add(name)
+    return order
+
+
+def split(data, layout=None, hints=None):
+    """
+    Split codeVariants.ts into layout files.
+
+    Args:
+        data: Bytes of the monolith
+        layout: Existing Layout; categories of objects are kept from it
+        hints: {export name: category} for objects the layout does not
+            have, e.g. story_categories()
+
+    Returns:
+        ({file name: bytes}, report) where report has 'categories'
+        ({category: [export names]}), 'new' ({export name: category} for
+        objects the layout did not have) and 'dropped' (objects only the
+        layout has)
+
+    Raises:
+        CatalogError: When the file has no examples objects, no
+            getCodeVariants() function, or an unclosed object
+    """
+    layout = layout or Layout({}, list(DEFAULT_CATEGORIES))
+    exports, function = _parse(data, 'codeVariants.ts')
+    if not exports or function is None:
+        raise CatalogError('codeVariants.ts: expected examples objects and getCodeVariants()')
+    names = list(exports)
+    if function['start'] < exports[names[-1]]['end']:
+        raise CatalogError('codeVariants.ts: getCodeVariants() must follow the examples objects')
+
+    known = layout.category_of()
+    hints = hints or {}
+    categories = list(layout.categories) or list(DEFAULT_CATEGORIES)
+    categories += [category for category in dict.fromkeys(hints.values()) if category not in categories]
+    owner = {}
+    new = {}
+    previous = categories[0]
+    for name in names:
+        if name in known:
+            owner[name] = known[name]
+        else:
+            owner[name] = new[name] = hints.get(name, previous)
+        previous = owner[name]
+
+    preamble_end = _first_segment_start(data, exports[names[0]]['start'])
+    segments = {}
+    cursor = preamble_end
+    for name in names:
+        segments[name] = data[cursor:exports[name]['end']]
+        cursor = exports[name]['end']
+    tail = data[cursor:]
+
+    members = {category: [name for name in names if owner[name] == category] for category in categories}
+    members = {category: group for category, group in members.items() if group}
+    files = {'types.ts': TYPES_HEADER + data[:preamble_end] + b'\n'}
+    for category, group in members.items():
+        body = b''.join(segments[name] for name in group)
+        others = _references(body, set(names) - set(group))
+        imports = [TYPE_IMPORT] + _named_imports([n for n in names if n in others], owner, members)
+        files[f'{category}.ts'] = b'\n'.join(imports) + body + b'\n'
+
+    imports = [TYPE_IMPORT] + _named_imports([n for n in names if n in _references(tail, set(names))],
+                                             owner, members)
+    files[f'{FUNCTION_MODULE}.ts'] = b'\n'.join(imports) + tail
+    files['index.ts'] = (INDEX_HEADER + b"export * from './types';\n"
+                         + b''.join(f"export * from './{category}';\n".encode() for category in members)
+                         + f"export {{ getCodeVariants }} from './{FUNCTION_MODULE}';\n".encode()
+                         + b'\n// Older name of getCodeVariants()\n'
+                         + f"export {{ getCodeVariants as getCodeExample }} from './{FUNCTION_MODULE}';\n"
+                         .encode()
+                         + b'\n' + ORDER_COMMENT + _order_lines(names))
+
+    dropped = sorted(set(known) - set(names))
+    return files, {'categories': members, 'new': new, 'dropped': dropped}
+
+
+def merge(layout):
+    """
+    Build codeVariants.ts from a layout.
+
+    Args:
+        layout: Layout written by split()
+
+    Returns:
+        Bytes of the monolith
+
+    Raises:
+        CatalogError: When a module is missing or is not in split() form
+    """
+    files = layout.files
+    for required in ('types.ts', f'{FUNCTION_MODULE}.ts'):
+        if required not in files:
+            raise CatalogError(f"layout has no {required}; it was not written by split()")
+    types = files['types.ts']
+    if types.startswith(TYPES_HEADER):
+        types = types[len(TYPES_HEADER):]
+    parts = [types[:-1] if types.endswith(b'\n') else types]
+
+    seen = {}
+    segments = {}
+    modules = []
+    for category in layout.categories:
+        name = f'{category}.ts'
+        if name not in files:
+            raise CatalogError(f"index.ts lists {category} but {name} is missing")
+        data = files[name]
+        exports, function = _parse(data, name)
+        if function is not None:
+            raise CatalogError(f"{name}: getCodeVariants() belongs in {FUNCTION_MODULE}.ts")
+        if not exports:
+            continue
+        for export_name in exports:
+            if export_name in seen:
+                raise CatalogError(f"{export_name} is in both {seen[export_name]} and {name}")
+            seen[export_name] = name
+        # Each object's segment runs from the end of the one before it
+        cursor = _header_end(data, min(entry['start'] for entry in exports.values()))
+        for export_name, entry in exports.items():
+            segments[export_name] = data[cursor:entry['end']]
+            cursor = entry['end']
+        # Anything after the last object stays with it, less split()'s final newline
+        trailer = data[cursor:]
+        segments[export_name] += trailer[:-1] if trailer.endswith(b'\n') else trailer
+        modules.append(list(exports))
+
+    order = _merge_order(recorded_order(files.get('index.ts', b'')), modules)
+    parts.extend(segments[name] for name in order)
+
+    data = files[f'{FUNCTION_MODULE}.ts']
+    _, function = _parse(data, f'{FUNCTION_MODULE}.ts')
+    if function is None:
+        raise CatalogError(f"{FUNCTION_MODULE}.ts: getCodeVariants() not found")
+    parts.append(data[_header_end(data, function['start']):])
+    return b''.join(parts)
+
+
+def write_layout(files, directory=LAYOUT_DIR):
+    """
+    Write split() output, removing other .ts modules from the directory.
+
+    Returns:
+        (written, unchanged, removed) file name lists
+    """
+    directory = str(directory)
+    os.makedirs(directory, exist_ok=True)
+    written, unchanged, removed = [], [], []
+    for name, data in files.items():
+        (written if write_if_changed(os.path.join(directory, name), data) else unchanged).append(name)
+    for name in sorted(os.listdir(directory)):
+        if name.endswith('.ts') and name not in files:
+            os.remove(os.path.join(directory, name))
+            removed.append(name)
+    return written, unchanged, removed
+
+
+def variant_strings(data):
+    """
+    Every raw template literal of a monolith or category module.
+
+    Returns:
+        ({export name: {variant key: {language: raw bytes}}} in file order,
+        {component key: export name} mapping, or {} without getCodeVariants())
+    """
+    exports, function = parse_region(data)
+    strings = {}
+    for name, entry in exports.items():
+        strings[name] = {key: {language: data[start + 1:end - 1]
+                               for language, (start, end) in variant['languages'].items()}
+                         for key, variant in entry['variants'].items()}
+    mapping = {key: entry['export'] for key, entry in function['mapping'].items()} if function else {}
+    return strings, mapping
+
+
+def compare(expected, actual, ordered=False):
+    """
+    Differences between two sets of variant strings.
+
+    Args:
+        expected, actual: variant_strings() results
+        ordered: Also require the examples objects in the same order
+
+    Returns:
+        List of human-readable problems; empty when they are equivalent
+    """
+    problems = []
+    (left, left_mapping), (right, right_mapping) = expected, actual
+    for name in left.keys() - right.keys():
+        problems.append(f"{name}: missing")
+    for name in right.keys() - left.keys():
+        problems.append(f"{name}: unexpected")
+    if ordered and not problems and list(left) != list(right):
+        problems.append('examples objects are in a different order')
+    for name in left.keys() & right.keys():
+        if list(left[name]) != list(right[name]):
+            problems.append(f"{name}: variant keys differ or are reordered")
+            continue
+        for key, languages in left[name].items():
+            other = right[name][key]
+            for language in languages.keys() | other.keys():
+                if languages.get(language) != other.get(language):
+                    problems.append(f"{name}.{key}.{language}: bytes differ")
+    if left_mapping != right_mapping:
+        changed = sorted(set(left_mapping.items()) ^ set(right_mapping.items()))
+        problems.append(f"getCodeVariants() mapping differs: {changed[:5]}")
+    return sorted(problems)
+
+
+def layout_strings(layout):
+    """variant_strings() of a whole layout: every category module, and the mapping."""
+    strings = {}
+    for category in layout.categories:
+        data = layout.files.get(f'{category}.ts')
+        if data is not None:
+            strings.update(variant_strings(data)[0])
+    function_module = layout.files.get(f'{FUNCTION_MODULE}.ts', b'')
+    return strings, variant_strings(function_module)[1]
@@ -0,0 +1,316 @@
+"""
+Linear-time scanner for the TypeScript sources the variant tooling edits.
+
+The scanner walks a byte buffer once and splits it into tokens:
+
+- CODE      plain source between the other tokens
+- STRING    '...' or "..." literal
+- TEMPLATE  `...` literal, including any ${...} interpolations
+- COMMENT   // line or /* block */ comment
+- REGEX     /regular expression/ literal
+- OPEN      {
+- CLOSE     }
+
+Each token carries its byte span and the brace depth it sits at, which is
+enough to find object boundaries without regular expressions spanning the
+file. Braces inside strings, templates, comments and regex literals are
+never counted. A `/` starts a regex literal where an operand is expected
+(after `(`, `=`, `,`, `return`, ...) and is division everywhere else.
+
+TSX text is not JavaScript: `<p>Don't</p>` holds a lone apostrophe. With
+`jsx=True` a quote that does not close on its line is read as plain text
+instead of raising, and so is a quote or backtick right after a letter
+or digit (`You've`) or a tag's closing `>` (`<kbd>`</kbd>`), neither of
+which JavaScript syntax allows.
+
+Scanning jumps between "interesting" characters with precompiled patterns
+that cannot backtrack, so the cost is O(n) in the input size. Any object
+supporting the buffer protocol and slicing (bytes, bytearray, mmap) works.
+"""
+
+import re
+from collections import namedtuple
+
+CODE = 'code'
+STRING = 'string'
+TEMPLATE = 'template'
+COMMENT = 'comment'
+REGEX = 'regex'
+OPEN = 'open'
+CLOSE = 'close'
+
+Token = namedtuple('Token', 'kind start end depth')
+
+# Characters that end a run of plain code
+_CODE_STOP = re.compile(rb'[`\'"/{}]')
+# Single-line string bodies; an escaped newline is a line continuation
+_STRINGS = {
+    ord("'"): re.compile(rb"'(?:[^'\\\n]|\\.)*'", re.DOTALL),
+    ord('"'): re.compile(rb'"(?:[^"\\\n]|\\.)*"', re.DOTALL),
+}
+# Template body up to the closing backtick or the next ${
+_TEMPLATE_BODY = re.compile(rb'(?:[^`\\$]|\\.|\$(?!\{))*', re.DOTALL)
+# Regex literal body: escapes and [...] classes may contain '/'
+_REGEX = re.compile(rb'/(?:[^/\\\[\n]|\\.|\[(?:[^\]\\\n]|\\.)*\])+/[A-Za-z]*')
+# A '/' after one of these (or at the start) begins a regex, not a division.
+# '<' is left out: in TSX it is a closing tag (`</div>`).
+_REGEX_AFTER = frozenset(b'(,=:[!&|?{};+-*%>~^')
+_REGEX_KEYWORDS = frozenset([
+    b'return', b'typeof', b'instanceof', b'in', b'of', b'new', b'delete', b'void',
+    b'throw', b'case', b'do', b'else', b'yield', b'await',
+])
+
+_BACKTICK = ord('`')
+_SLASH = ord('/')
+_STAR = ord('*')
+_LBRACE = ord('{')
+_RBRACE = ord('}')
+
+
+class LexError(ValueError):
+    """Raised when the input is not well-formed (unterminated literal, stray brace)."""
+
+    def __init__(self, message, offset):
+        # Both arguments stay in `args` so the error survives pickling
+        # (raised in a worker process, re-raised in the parent)
+        super().__init__(message, offset)
+        self.message = message
+        self.offset = offset
+
+    def __str__(self):
+        return f"{self.message} at byte {self.offset}"
+
+
+def tokenize(data, pos=0, end=None, jsx=False):
+    """
+    Yield tokens for data[pos:end].
+
+    Args:
+        data: Source buffer (bytes, bytearray or mmap)
+        pos: Offset to start scanning at; must not be inside a literal
+        end: Offset to stop at (default: end of data)
+        jsx: Read stray quotes and backticks as JSX text instead of raising
+
+    Yields:
+        Token(kind, start, end, depth) tuples in source order
+    """
+    if end is None:
+        end = len(data)
+    depth = 0
+    floor = pos
+    code_start = pos
+
+    while pos < end:
+        match = _CODE_STOP.search(data, pos, end)
+        if match is None:
+            break
+        i = match.start()
+        char = data[i]
+
+        if char == _SLASH:
+            nxt = data[i + 1] if i + 1 < end else None
+            if nxt in (_SLASH, _STAR):
+                kind, stop = COMMENT, skip_comment(data, i, end)
+            else:
+                stop = skip_regex(data, i, end, floor)
+                if stop is None:
+                    pos = i + 1     # division operator
+                    continue
+                kind = REGEX
+        elif char in _STRINGS:
+            stop = None if jsx and _jsx_text(data, i, floor) else skip_string(data, i, end, jsx)
+            if stop is None:
+                pos = i + 1         # apostrophe in JSX text
+                continue
+            kind = STRING
+        elif char == _BACKTICK and jsx and _jsx_text(data, i, floor):
+            pos = i + 1
+            continue
+
+        if i > code_start:
+            yield Token(CODE, code_start, i, depth)
+
+        if char == _LBRACE:
+            yield Token(OPEN, i, i + 1, depth)
+            depth += 1
+            pos = i + 1
+        elif char == _RBRACE:
+            depth -= 1
+            if depth < 0:
+                raise LexError("Unbalanced '}'", i)
+            yield Token(CLOSE, i, i + 1, depth)
+            pos = i + 1
+        elif char == _BACKTICK:
+            pos = skip_template(data, i, end, jsx)
+            yield Token(TEMPLATE, i, pos, depth)
+        else:
+            pos = stop
+            yield Token(kind, i, pos, depth)
+        code_start = pos
+
+    if code_start < end:
+        yield Token(CODE, code_start, end, depth)
+
+
+def skip_string(data, pos, end=None, jsx=False):
+    """
+    Return the offset just past the quoted string starting at `pos`.
+
+    An unterminated string raises LexError, or returns None with `jsx=True`.
+    """
+    match = _STRINGS[data[pos]].match(data, pos, len(data) if end is None else end)
+    if match is None:
+        if jsx:
+            return None
+        raise LexError("Unterminated string literal", pos)
+    return match.end()
+
+
+def _jsx_text(data, pos, floor):
+    """True when the quote or backtick at `pos` can only be JSX text."""
+    if pos <= floor:
+        return False
+    before = data[pos - 1:pos]
+    if before == b'>':
+        return pos - 1 == floor or data[pos - 2:pos - 1] != b'='
+    return before.isalnum()
+
+
+def skip_regex(data, pos, end=None, floor=0):
+    """
+    Return the offset just past the regex literal starting at `pos`, or
+    None when the '/' there is a division operator.
+
+    The previous significant character (searched back no further than
+    `floor`) decides which one it is, as in a JavaScript parser.
+    """
+    i = pos - 1
+    while i >= floor and data[i] in b' \t\r\n':
+        i -= 1
+    if i >= floor and data[i] not in _REGEX_AFTER:
+        word_end = i + 1
+        while i >= floor and (data[i] in b'_$' or data[i:i + 1].isalnum()):
+            i -= 1
+        if data[i + 1:word_end] not in _REGEX_KEYWORDS:
+            return None
+    match = _REGEX.match(data, pos, len(data) if end is None else end)
+    return None if match is None else match.end()
+
+
+def skip_comment(data, pos, end=None):
+    """Return the offset just past the comment starting at `pos`."""
+    if end is None:
+        end = len(data)
+    if data[pos + 1] == _SLASH:
+        newline = data.find(b'\n', pos, end)
+        return end if newline == -1 else newline
+    close = data.find(b'*/', pos + 2, end)
+    if close == -1:
+        raise LexError("Unterminated block comment", pos)
+    return close + 2
+
+
+def skip_template(data, pos, end=None, jsx=False):
+    """
+    Return the offset just past the template literal starting at `pos`.
+
+    Interpolations are followed with an explicit stack, so nested templates
+    such as `a ${`b ${c}`} d` cost one pass and no recursion. `jsx` applies
+    to the code inside interpolations, as in tokenize().
+    """
+    if end is None:
+        end = len(data)
+    # Each frame is None (inside template text) or the brace depth of an
+    # open ${ ... } interpolation.
+    stack = [None]
+    i = pos + 1
+    while stack:
+        if stack[-1] is None:
+            i = _TEMPLATE_BODY.match(data, i, end).end()
+            if i >= end:
+                raise LexError("Unterminated template literal", pos)
+            if data[i] == _BACKTICK:
+                stack.pop()
+                i += 1
+            else:
+                stack.append(0)
+                i += 2
+            continue
+
+        match = _CODE_STOP.search(data, i, end)
+        if match is None:
+            raise LexError("Unterminated template interpolation", pos)
+        i = match.start()
+        char = data[i]
+        if char == _LBRACE:
+            stack[-1] += 1
+            i += 1
+        elif char == _RBRACE:
+            if stack[-1] == 0:
+                stack.pop()
+            else:
+                stack[-1] -= 1
+            i += 1
+        elif char == _BACKTICK:
+            stack.append(None)
+            i += 1
+        elif char == _SLASH:
+            if i + 1 < end and data[i + 1] in (_SLASH, _STAR):
+                i = skip_comment(data, i, end)
+            else:
+                i = skip_regex(data, i, end, pos) or i + 1
+        elif jsx and _jsx_text(data, i, pos):
+            i += 1
+        else:
+            i = skip_string(data, i, end, jsx) or i + 1
+    return i
+
+
+def find_matching_close(data, open_pos, end=None, jsx=False):
+    """Return the offset of the '}' matching the '{' at `open_pos`."""
+    for token in tokenize(data, open_pos, end, jsx):
+        if token.kind == CLOSE and token.depth == 0:
+            return token.start
+    raise LexError("Unclosed '{'", open_pos)
+
+
+_COOK_ESCAPE = re.compile(
+    r'\\(?:x([0-9a-fA-F]{2})|u\{([0-9a-fA-F]+)\}|u([0-9a-fA-F]{4})|(\r\n|[\s\S]))'
+)
+_SIMPLE_ESCAPES = {
+    'n': '\n', 't': '\t', 'r': '\r', 'b': '\b', 'f': '\f', 'v': '\v', '0': '\0',
+    '\n': '', '\r\n': '', '\r': '',
+}
+
+
+def cook_template(raw):
+    """
+    Return the runtime value of a template literal's raw text.
+
+    `raw` is the text between the backticks, as a str. Only escapes are
+    processed; interpolations are returned verbatim.
+    """
+    if '\\' not in raw:
+        return raw
+
+    def replace(match):
+        hex2, brace, hex4, other = match.groups()
+        if hex2 or hex4:
+            return chr(int(hex2 or hex4, 16))
+        if brace:
+            return chr(int(brace, 16))
+        return _SIMPLE_ESCAPES.get(other, other)
+
+    return _COOK_ESCAPE.sub(replace, raw)
+
+
+def render_template(value):
+    """Return `value` as a template literal (with backticks) that cooks back to it."""
+    escaped = value.replace('\\', '\\\\').replace('`', '\\`').replace('${', '\\${')
+    return f'`{escaped}`'
+
+
+def line_col(data, offset):
+    """Return the 1-based (line, column) of a byte offset."""
+    line_start = data.rfind(b'\n', 0, offset) + 1
+    return data.count(b'\n', 0, offset) + 1, offset - line_start + 1
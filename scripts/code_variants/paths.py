@@ -0,0 +1,29 @@
+"""
+Well-known locations used by the code variant tooling.
+
+Everything is resolved from the repository root, so the scripts behave the
+same no matter which directory they are started from.
+"""
+
+from pathlib import Path
+
+# Files that only exist at the top of the monorepo
+_ROOT_MARKERS = ('pnpm-workspace.yaml', '.git')
+
+
+def find_repo_root(start=None):
+    """Walk up from `start` (default: this file) to the monorepo root."""
+    current = Path(start or __file__).resolve()
+    for candidate in [current, *current.parents]:
+        if any((candidate / marker).exists() for marker in _ROOT_MARKERS):
+            return candidate
+    # scripts/code_variants/paths.py -> repo root is two levels up
+    return Path(__file__).resolve().parents[2]
+
+
+REPO_ROOT = find_repo_root()
+STORYBOOK_DIR = REPO_ROOT / 'storybook'
+BLOCKS_DIR = STORYBOOK_DIR / '.storybook' / 'blocks'
+VARIANTS_FILE = BLOCKS_DIR / 'codeVariants.ts'
+STORIES_DIR = STORYBOOK_DIR / 'stories'
+CACHE_DIR = REPO_ROOT / '.cache' / 'code-variants'
@@ -0,0 +1,196 @@
+"""
+Cross-check of Polaris documentation variations against codeVariants.ts.
+
+`scripts/collect-component-variations.js` turns the Polaris MDX frontmatter
+into `packages/include-system/src/generated/componentVariations.ts`: every
+documented component (`actions/button`) and its examples (`button-primary`).
+`crosscheck()` joins that dataset with the catalog through two hash
+tables keyed by normalized names (lowercase, letters and digits only):
+
+- Polaris component slug -> catalog component key (`text-field` ->
+  `textfield`); the catalog's export names are tried as well
+- example slug without the component prefix -> variant key
+  (`button-plain-critical` -> `plain-critical`); a trailing `-state`
+  or `-example` and a leading `with-` are ignored when nothing matches
+  exactly
+
+and reports, per language, the documented variations that have no code
+(no variant at all, or an empty or missing tab), the variants of
+documented components that Polaris does not document, and the components
+only one side has. The `deprecated` group is skipped unless asked for.
+
+`cached_crosscheck()` keeps the parsed dataset in a FileCache entry keyed
+by the generated file's fingerprint, with the last report next to it
+keyed by the catalog's SHA-256: an unchanged pair of files is answered
+from the cache after one `stat()` each.
+"""
+
+import json
+import re
+
+from .catalog import LANGUAGES
+from .filecache import FileCache
+from .paths import REPO_ROOT
+from .stories import normalize
+
+VARIATIONS_FILE = REPO_ROOT / 'packages' / 'include-system' / 'src' / 'generated' / 'componentVariations.ts'
+CACHE_NAME = 'polaris-crosscheck'
+# Bump when load_variations() or crosscheck() output changes
+CACHE_VERSION = 1
+
+_DATASET = re.compile(r'componentVariationDataset\s*:\s*\w+\s*=\s*')
+_AFFIXES = (re.compile(r'(state|example)$'), re.compile(r'^with'))
+
+
+def parse_variations(text):
+    """
+    Read the dataset object out of componentVariations.ts.
+
+    The generator writes it as JSON after the typed declaration, so the
+    object literal is parsed with `json`, not evaluated.
+
+    Returns:
+        List of component dicts (group, slug, title, path, variations)
+    """
+    match = _DATASET.search(text)
+    if not match:
+        raise ValueError('componentVariationDataset not found')
+    return json.loads(text[match.end():text.rindex('}') + 1])['components']
+
+
+def load_variations(path=VARIATIONS_FILE):
+    """Parsed components of componentVariations.ts."""
+    with open(path, encoding='utf-8') as f:
+        return parse_variations(f.read())
+
+
+def _catalog_table(catalog):
+    """{normalized component: (key, {normalized variant: (variant, {language: chars})})}."""
+    table = {}
+    for key, export_name in catalog.mapping.items():
+        entry = catalog.exports.get(export_name)
+        if entry is None:
+            continue
+        variants = {}
+        for variant_key, variant in entry['variants'].items():
+            lengths = {language: end - start - 2 for language, (start, end) in variant['languages'].items()}
+            variants.setdefault(normalize(variant_key), (variant_key, lengths))
+        row = (key, variants)
+        table.setdefault(normalize(key), row)
+        table.setdefault(normalize(export_name[:-len('Examples')] if export_name.endswith('Examples')
+                                   else export_name), row)
+    return table
+
+
+def _match_variant(variants, name):
+    candidates = [name]
+    for affix in _AFFIXES:
+        stripped = affix.sub('', name)
+        if stripped and stripped != name:
+            candidates.append(stripped)
+    for candidate in candidates:
+        if candidate in variants:
+            return variants[candidate]
+    return None
+
+
+def crosscheck(components, catalog, include_deprecated=False):
+    """
+    Join Polaris variations with the catalog in one pass over each.
+
+    Args:
+        components: load_variations() components
+        catalog: A loaded VariantCatalog
+        include_deprecated: Also check the `deprecated` group
+
+    Returns:
+        Report dict:
+        'missing'    - one row per documented variation lacking code in at
+                       least one language: component, example, title, key,
+                       variant (None when there is no variant) and the
+                       'languages' without code
+        'undocumented' - {component key: [variants Polaris does not document]}
+                       for components Polaris documents
+        'polaris_only' - documented components with no examples object
+        'catalog_only' - component keys with no Polaris page
+        'totals'     - documented variations, and per language how many
+                       have code
+    """
+    table = _catalog_table(catalog)
+    missing = []
+    matched = {}
+    polaris_only = []
+    documented = 0
+    covered = {language: 0 for language in LANGUAGES}
+
+    for component in components:
+        if component['group'] == 'deprecated' and not include_deprecated:
+            continue
+        name = f"{component['group']}/{component['slug']}"
+        row = table.get(normalize(component['slug']))
+        if row is None:
+            polaris_only.append(name)
+        key, variants = row if row else (None, {})
+        used = matched.setdefault(key, set()) if key else set()
+        prefix = component['slug'] + '-'
+        for variation in component['variations']:
+            documented += 1
+            example = variation['exampleSlug']
+            short = example[len(prefix):] if example.startswith(prefix) else example
+            found = _match_variant(variants, normalize(short)) if row else None
+            lengths = found[1] if found else {}
+            if found:
+                used.add(found[0])
+            absent = [language for language in LANGUAGES if lengths.get(language, 0) <= 0]
+            for language in LANGUAGES:
+                if language not in absent:
+                    covered[language] += 1
+            if absent:
+                missing.append({
+                    'component': name,
+                    'example': example,
+                    'title': variation.get('title'),
+                    'key': key,
+                    'variant': found[0] if found else None,
+                    'languages': absent,
+                })
+
+    undocumented = {}
+    for key, used in matched.items():
+        export = catalog.exports[catalog.mapping[key]]
+        extra = [variant for variant in export['variants'] if variant not in used]
+        if extra:
+            undocumented[key] = extra
+    return {
+        'missing': missing,
+        'undocumented': undocumented,
+        'polaris_only': polaris_only,
+        'catalog_only': sorted(set(catalog.mapping) - set(matched)),
+        'totals': {'documented': documented, 'covered': covered},
+    }
+
+
+def cached_crosscheck(catalog, path=VARIATIONS_FILE, include_deprecated=False, use_cache=True):
+    """
+    crosscheck() of the generated file against a catalog, reusing the parsed
+    dataset and the last report while neither file's hash changed.
+
+    Returns:
+        (report, True if it came from the cache)
+    """
+    path = str(path)
+    cache = FileCache(CACHE_NAME, CACHE_VERSION) if use_cache else None
+    hit, entry = cache.get(path) if cache else (False, None)
+    if not hit:
+        entry = {'components': load_variations(path), 'reports': {}}
+    report_key = f"{catalog.stamp['sha256']}:{int(include_deprecated)}"
+    if report_key in entry['reports']:
+        return entry['reports'][report_key], True
+
+    report = crosscheck(entry['components'], catalog, include_deprecated)
+    if cache is not None:
+        # Only the latest report per catalog is worth keeping
+        entry['reports'] = {report_key: report}
+        cache.put(path, entry)
+        cache.save()
+    return report, False
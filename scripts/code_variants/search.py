@@ -0,0 +1,242 @@
+"""
+Offline full-text search index over every code example.
+
+`getCodeVariants(componentName, exampleName)` needs exact keys, so finding
+"how do I do X in ExtJS" means grepping codeVariants.ts. `build_index()`
+tokenizes every language string of every mapped variant and writes a
+compact inverted index that the Storybook manager's Code Search panel
+fetches on first use:
+
+- a document is one (component, example, language); its id is
+  `example * len(languages) + language`, so the index needs no document
+  table and a language filter is `id % len(languages)`
+- terms are lowercased identifiers (`createbutton`), their camelCase and
+  snake_case parts (`create`, `button`) and dotted member chains with
+  every suffix of two or more parts (`ext.create`, `this.panel.add` and
+  `panel.add`), sorted so a prefix is a binary search away
+- each term's posting list is its ascending document ids, delta-encoded
+  (`[3, 5, 9]` is stored `[3, 2, 4]`); most gaps are small, which keeps
+  the JSON short and gzip-friendly
+
+A query is split the same way as a document's identifiers and chains. Every
+query term must match (as a prefix of some indexed term); documents where
+terms match whole rank above prefix-only matches. `search()` here and
+`addons/code-search/searchIndex.ts` in the manager implement the same rules.
+
+Usage:
+    from code_variants.catalog import load_catalog
+    from code_variants.search import build_index, search
+
+    index = build_index(load_catalog())
+    for hit in search(index, 'Ext.create', language='extjs'):
+        print(hit.component, hit.example, hit.score)
+"""
+
+import json
+import os
+import re
+from bisect import bisect_left
+from collections import namedtuple
+
+from .assets import ASSETS_DIR
+from .blobs import collect_variants
+from .catalog import LANGUAGES
+from .fileio import write_if_changed
+
+INDEX_FILE = ASSETS_DIR / 'search-index.json'
+INDEX_VERSION = 1
+# Longer identifiers and chains are truncated; a prefix query still finds them
+MAX_TERM_LENGTH = 48
+# Chain suffixes indexed per member expression (`a.b.c.d.e` keeps the last four)
+MAX_CHAIN_PARTS = 4
+
+Hit = namedtuple('Hit', 'component example language score')
+
+_CHAIN = re.compile(r'[A-Za-z_$][\w$]*(?:\s*\??\.\s*[A-Za-z_$][\w$]*)*')
+_DOT = re.compile(r'\s*\??\.\s*')
+_WORD = re.compile(r'[A-Z]+(?![a-z])|[A-Z]?[a-z]+')
+
+
+def _keep(term):
+    return len(term) > 1
+
+
+def split_words(identifier):
+    """camelCase / PascalCase / snake_case parts of one identifier, lowercased."""
+    return [word.lower() for word in _WORD.findall(identifier)]
+
+
+def tokenize(code):
+    """
+    Return the set of index terms in one code string.
+
+    Args:
+        code: Source text of one language tab
+
+    Returns:
+        Set of lowercased terms: identifiers, their word parts and the
+        dotted chain suffixes of two or more parts
+    """
+    terms = set()
+    for match in _CHAIN.finditer(code):
+        parts = _DOT.split(match.group())
+        for part in parts:
+            terms.add(part.lower()[:MAX_TERM_LENGTH])
+            words = split_words(part)
+            if len(words) > 1:
+                terms.update(words)
+        if len(parts) > 1:
+            tail = parts[-MAX_CHAIN_PARTS:]
+            for i in range(len(tail) - 1):
+                terms.add('.'.join(tail[i:]).lower()[:MAX_TERM_LENGTH])
+    return {term for term in terms if _keep(term)}
+
+
+def query_terms(query):
+    """
+    Terms a query must match: each identifier or dotted chain, lowercased.
+
+    `Ext.create` stays one term and `createButton` matches the whole
+    identifier, so both rank their exact hits first.
+    """
+    terms = []
+    for match in _CHAIN.finditer(query):
+        term = '.'.join(_DOT.split(match.group())).lower()[:MAX_TERM_LENGTH]
+        if _keep(term) and term not in terms:
+            terms.append(term)
+    return terms
+
+
+def delta_encode(ids):
+    previous = 0
+    encoded = []
+    for doc in ids:
+        encoded.append(doc - previous)
+        previous = doc
+    return encoded
+
+
+def delta_decode(deltas):
+    total = 0
+    ids = []
+    for delta in deltas:
+        total += delta
+        ids.append(total)
+    return ids
+
+
+def build_index(catalog):
+    """
+    Build the search index of a catalog's mapped variants.
+
+    Returns:
+        Index dict: 'version', 'languages', 'components' (keys),
+        'examples' ([component index, example key] per example, in doc id
+        order), 'terms' (sorted) and 'postings' (delta-encoded doc ids,
+        parallel to 'terms')
+    """
+    components = collect_variants(catalog)
+    examples = []
+    postings = {}
+    for component_index, (key, variants) in enumerate(components.items()):
+        for variant_key, languages in variants:
+            base = len(examples) * len(LANGUAGES)
+            examples.append([component_index, variant_key])
+            for language_index, language in enumerate(LANGUAGES):
+                code = languages.get(language)
+                if not code:
+                    continue
+                for term in tokenize(code):
+                    postings.setdefault(term, []).append(base + language_index)
+
+    terms = sorted(postings)
+    return {
+        'version': INDEX_VERSION,
+        'languages': list(LANGUAGES),
+        'components': list(components),
+        'examples': examples,
+        'terms': terms,
+        # Doc ids were appended in increasing order, so every list is sorted
+        'postings': [delta_encode(postings[term]) for term in terms],
+    }
+
+
+def dump_index(index):
+    return json.dumps(index, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def write_index(catalog, path=INDEX_FILE):
+    """
+    Build the index and write it where Storybook serves it.
+
+    Returns:
+        (index, size in bytes, whether the file changed)
+    """
+    index = build_index(catalog)
+    data = dump_index(index)
+    path = str(path)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return index, len(data), write_if_changed(path, data)
+
+
+def load_index(path=INDEX_FILE):
+    """Read a written index; raises ValueError for another version."""
+    with open(path) as f:
+        index = json.load(f)
+    if index.get('version') != INDEX_VERSION:
+        raise ValueError(f"{path}: index version {index.get('version')}, expected {INDEX_VERSION}")
+    return index
+
+
+def _matches(index, term):
+    """{doc id: True when the term matched whole} for one prefix term."""
+    terms = index['terms']
+    found = {}
+    i = bisect_left(terms, term)
+    while i < len(terms) and terms[i].startswith(term):
+        exact = terms[i] == term
+        for doc in delta_decode(index['postings'][i]):
+            found[doc] = found.get(doc, False) or exact
+        i += 1
+    return found
+
+
+def search(index, query, language=None, limit=20):
+    """
+    Find the examples matching every term of a query.
+
+    Args:
+        index: build_index() or load_index() output
+        query: Free text; identifiers and dotted chains are the terms
+        language: Only return hits in this language tab
+        limit: Most hits to return, 0 for all
+
+    Returns:
+        List of Hits, best first: more whole-term matches, then index order
+    """
+    terms = query_terms(query)
+    if not terms:
+        return []
+    languages = index['languages']
+    wanted = languages.index(language) if language else None
+
+    scores = None
+    for term in terms:
+        found = _matches(index, term)
+        if scores is None:
+            scores = {doc: int(exact) for doc, exact in found.items()
+                      if wanted is None or doc % len(languages) == wanted}
+        else:
+            scores = {doc: score + int(found[doc]) for doc, score in scores.items() if doc in found}
+        if not scores:
+            return []
+
+    ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+    if limit:
+        ranked = ranked[:limit]
+    hits = []
+    for doc, score in ranked:
+        component_index, example = index['examples'][doc // len(languages)]
+        hits.append(Hit(index['components'][component_index], example,
+                        languages[doc % len(languages)], score))
+    return hits
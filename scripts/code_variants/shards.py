@@ -0,0 +1,215 @@
+"""
+Split codeVariants.ts into one lazily imported module per component.
+
+`getCodeVariants()` in the monolith eagerly references every `xxxExamples`
+object, so any story importing it pulls ~2 MB of template strings into the
+preview bundle. `write_shards()` copies each component's examples object
+verbatim into `codeVariants.shards/<key>.ts` and emits:
+
+- `index.ts`              - `import()`-based loaders, an async
+                            `getCodeVariants()` and a suspending
+                            `readCodeVariants()`
+- `MultiLanguageCode.tsx` - same props as the eager block, suspends while
+                            the component's shard loads
+- `types.ts`              - the `CodeVariant` interface
+
+Only files whose content changed are rewritten, so regenerating after a
+one-component edit invalidates one module in Vite, not all of them.
+"""
+
+import os
+
+from .fileio import write_if_changed
+from .paths import BLOCKS_DIR
+
+SHARDS_DIR = BLOCKS_DIR / 'codeVariants.shards'
+
+GENERATED_HEADER = (
+    '// Generated by scripts/generate-code-variant-shards.py from codeVariants.ts.\n'
+    '// Do not edit by hand; re-run the generator instead.\n'
+)
+
+_TYPES_SOURCE = GENERATED_HEADER + '''
+export interface CodeVariant {
+  react: string;
+  vanilla: string;
+  extjs: string;
+  typescript: string;
+}
+'''
+
+_INDEX_TEMPLATE = GENERATED_HEADER + '''
+import type { CodeVariant } from './types';
+
+export type { CodeVariant };
+
+type Examples = Record<string, CodeVariant>;
+
+const loaders: Record<string, () => Promise<{ default: Examples }>> = {
+{loaders}
+};
+
+const loaded = new Map<string, Examples | null>();
+const pending = new Map<string, Promise<Examples | null>>();
+
+export const componentKeys = Object.keys(loaders);
+
+// Load (once) every example of one component
+export function loadComponentExamples(componentName: string): Promise<Examples | null> {
+  const key = componentName.toLowerCase();
+  if (loaded.has(key)) {
+    return Promise.resolve(loaded.get(key) ?? null);
+  }
+  let promise = pending.get(key);
+  if (!promise) {
+    const loader = loaders[key];
+    promise = loader
+      ? loader().then((module) => module.default)
+      : Promise.resolve(null);
+    promise = promise.then((examples) => {
+      loaded.set(key, examples);
+      pending.delete(key);
+      return examples;
+    });
+    pending.set(key, promise);
+  }
+  return promise;
+}
+
+function pickExample(
+  examples: Examples | null,
+  componentName: string,
+  exampleName: string
+): CodeVariant | null {
+  if (!examples) {
+    console.warn(`No code examples found for component: ${componentName}`);
+    return null;
+  }
+  const example = examples[exampleName];
+  if (!example) {
+    console.warn(`No example "${exampleName}" found for component: ${componentName}`);
+    return null;
+  }
+  return example;
+}
+
+// Async counterpart of getCodeVariants() in codeVariants.ts
+export async function getCodeVariants(
+  componentName: string,
+  exampleName: string
+): Promise<CodeVariant | null> {
+  const examples = await loadComponentExamples(componentName);
+  return pickExample(examples, componentName, exampleName);
+}
+
+// Suspense-friendly read: throws the pending load until the shard is in
+export function readCodeVariants(
+  componentName: string,
+  exampleName: string
+): CodeVariant | null {
+  const key = componentName.toLowerCase();
+  if (!loaded.has(key)) {
+    throw loadComponentExamples(key);
+  }
+  return pickExample(loaded.get(key) ?? null, componentName, exampleName);
+}
+'''
+
+_COMPONENT_SOURCE = GENERATED_HEADER + '''
+import React, { Suspense } from 'react';
+import { MultiLanguageCodeView } from '../MultiLanguageCodeView';
+import { readCodeVariants } from './index';
+
+interface MultiLanguageCodeProps {
+  componentName: string;
+  exampleName: string;
+}
+
+function LoadedVariants({ componentName, exampleName }: MultiLanguageCodeProps) {
+  const variants = readCodeVariants(componentName, exampleName);
+  return (
+    <MultiLanguageCodeView
+      componentName={componentName}
+      exampleName={exampleName}
+      variants={variants}
+    />
+  );
+}
+
+export function MultiLanguageCode(props: MultiLanguageCodeProps) {
+  return (
+    <Suspense
+      fallback={
+        <div style={{
+          margin: '20px 0',
+          fontFamily: 'var(--font-family-sans)',
+          fontSize: 'var(--font-size-sm, 14px)',
+          color: 'var(--color-gray-600, #4b5563)'
+        }}>
+          Loading code examples...
+        </div>
+      }
+    >
+      <LoadedVariants {...props} />
+    </Suspense>
+  );
+}
+'''
+
+
+def shard_sources(catalog, data):
+    """
+    Return {file name: source} for every generated module.
+
+    Args:
+        catalog: VariantCatalog of the monolith
+        data: The monolith's bytes (read once by the caller)
+    """
+    files = {'types.ts': _TYPES_SOURCE}
+    loaders = []
+    for key, export_name in catalog.mapping.items():
+        export = catalog.exports.get(export_name)
+        if export is None:
+            continue
+        body = data[export['open']:export['close'] + 1].decode()
+        files[f'{key}.ts'] = (
+            GENERATED_HEADER
+            + f"\nimport type {{ CodeVariant }} from './types';\n\n"
+            + f'// {export_name}\n'
+            + f'const examples: Record<string, CodeVariant> = {body};\n\n'
+            + 'export default examples;\n'
+        )
+        loaders.append(f"  {key}: () => import('./{key}'),")
+    files['index.ts'] = _INDEX_TEMPLATE.replace('{loaders}', '\n'.join(loaders))
+    files['MultiLanguageCode.tsx'] = _COMPONENT_SOURCE
+    return files
+
+
+def write_shards(catalog, out_dir=SHARDS_DIR):
+    """
+    Generate the shard directory from a catalog.
+
+    Returns:
+        Dict with 'written', 'unchanged' and 'removed' file name lists
+    """
+    with open(catalog.path, 'rb') as f:
+        data = f.read()
+    files = shard_sources(catalog, data)
+
+    os.makedirs(out_dir, exist_ok=True)
+    report = {'written': [], 'unchanged': [], 'removed': []}
+    for name, source in files.items():
+        written = write_if_changed(os.path.join(out_dir, name), source.encode())
+        report['written' if written else 'unchanged'].append(name)
+
+    # Drop shards of components that no longer exist
+    for name in sorted(os.listdir(out_dir)):
+        if name in files or not name.endswith(('.ts', '.tsx')):
+            continue
+        path = os.path.join(out_dir, name)
+        with open(path) as f:
+            generated = f.read(len(GENERATED_HEADER)) == GENERATED_HEADER
+        if generated:
+            os.remove(path)
+            report['removed'].append(name)
+    return report
@@ -0,0 +1,593 @@
+"""
+Split oversized `.stories.tsx` files into smaller ones with pruned imports.
+
+Story files that import dozens of Polaris components stall Vite's
+transform step (see storybook/PERFORMANCE_SOLUTIONS.md); the budget there
+is 10-15 components and 20 KB per file. `analyze_story_file()` cuts a
+file into its top-level statements with the lexer (import/export lines
+inside code samples are template text, not statements) and records which
+identifiers each statement declares and uses. `plan_split()` then packs
+the stories, in source order, into groups that fit the budget:
+
+    Button.stories.tsx  ->  Button.meta.tsx                  shared meta + helpers
+                            Button.Default.stories.tsx       stories, 'Components/Actions/Button/Default'
+                            Button.WithIcons.stories.tsx     ...
+
+- the meta object moves to `<Name>.meta.tsx` unchanged (but exported);
+  each part spreads it into its own meta with a `<title>/<first story>`
+  title, so story ids stay unique
+- helpers (local components, data, render functions) used by one part
+  move into that part; helpers used by several parts, or by the meta,
+  move into the shared module and are imported from it
+- statements that refer to `meta` (e.g. `type Story = StoryObj<typeof
+  meta>`) are repeated in each part, bound to the part's meta
+- stories that refer to each other stay in the same part
+- every output imports only the bindings its statements use
+
+A file that fits the byte budget once its unused imports are dropped is
+pruned in place instead of split. Plans are checked before anything is
+written: every output must lex, and together the parts must hold exactly
+the original stories.
+
+Usage:
+    from code_variants.splitter import analyze_story_file, plan_split
+
+    analysis = analyze_story_file(path)
+    plan = plan_split(analysis, max_bytes=20_000, max_components=15)
+    plan.action      # 'ok', 'prune', 'split' or 'over-budget'
+    plan.outputs     # {path: text}; write them, then delete plan.removes
+"""
+
+import os
+import re
+from collections import namedtuple
+
+from . import lexer
+
+MAX_BYTES = 20_000
+MAX_COMPONENTS = 15
+
+# Imports from these modules are not components (they do not count
+# against the budget)
+_NON_COMPONENT_SOURCES = re.compile(r'^(?:react(?:-dom)?(?:/.*)?|@storybook/.*|.*\.storybook/.*)$')
+
+# A top-level statement starts at column 0 with one of these words
+_STATEMENT = re.compile(
+    rb'^(?:export|import|const|let|var|async|function|class|abstract|type|interface|enum|declare)\b',
+    re.M,
+)
+_DECLARATION = re.compile(
+    rb'(export[ \t]+)?(default[ \t]+)?(?:declare[ \t]+)?(?:async[ \t]+)?(?:abstract[ \t]+)?'
+    rb'(import|const|let|var|function\*?|class|type|interface|enum)?[ \t]*([\w$]+)?'
+)
+_DEFAULT_NAME = re.compile(rb'export[ \t]+default[ \t]+([\w$]+)[ \t]*;?[ \t]*$', re.M)
+# Identifiers, except property names after a single dot (`a.Card`)
+_IDENTIFIER = re.compile(rb'(?<![\w$])(?:(?<=\.\.\.)|(?<!\.))[A-Za-z_$][\w$]*')
+_IMPORT = re.compile(
+    r'import\s+(?:(type)\s+)?(?:(.*?)\s+from\s+)?([\'"])(.+?)\3\s*;?\s*$', re.S
+)
+_SPECIFIER = re.compile(r'^(type\s+)?([\w$]+)(?:\s+as\s+([\w$]+))?$')
+_TITLE = re.compile(rb'^[ \t]*title:[ \t]*([\'"])(.*?)\1', re.M)
+_TAGS = re.compile(rb'^[ \t]*tags:[ \t]*\[[^\]]*\]', re.M)
+_META_VARIANTS = re.compile(rb'codeVariants:[ \t]*(getCodeVariants\([^()]*\))')
+_BLANK_OR_COMMENT = re.compile(rb'[ \t]*(?:$|//|/\*|\*)')
+
+Statement = namedtuple('Statement', 'kind name names uses start decl end')
+Import = namedtuple('Import', 'source type_only default namespace named lead text')
+Analysis = namedtuple('Analysis', 'path data statements imports meta stories components')
+SplitPlan = namedtuple('SplitPlan', 'path action size components parts outputs removes reason',
+                       defaults=(None,))
+# One output story file of a split
+Part = namedtuple('Part', 'path title stories size components')
+
+SHARED_META = 'sharedMeta'
+
+
+class SplitError(Exception):
+    """Raised when a story file cannot be split safely."""
+
+
+# ----------------------------------------------------------------------
+# Analysis
+# ----------------------------------------------------------------------
+
+def used_identifiers(data, start, end):
+    """
+    Identifiers referenced by source in data[start:end].
+
+    Strings, comments and the text of template literals are skipped;
+    template `${...}` interpolations are scanned. Over-inclusion (JSX text,
+    object keys) only keeps an import that could have been dropped.
+    """
+    used = set()
+    for token in lexer.tokenize(data, start, end, jsx=True):
+        if token.kind == lexer.CODE:
+            used.update(m.group().decode() for m in _IDENTIFIER.finditer(data, token.start, token.end))
+        elif token.kind == lexer.TEMPLATE:
+            used.update(_interpolated_identifiers(data, token.start, token.end))
+    return used
+
+
+def _interpolated_identifiers(data, start, end):
+    used = set()
+    pos = start + 1
+    while True:
+        pos = data.find(b'${', pos, end - 1)
+        if pos < 0:
+            return used
+        backslashes = 0
+        while data[pos - 1 - backslashes] == 0x5C:
+            backslashes += 1
+        if backslashes % 2:
+            pos += 2
+            continue
+        close = lexer.find_matching_close(data, pos + 1, end - 1, jsx=True)
+        used |= used_identifiers(data, pos + 2, close)
+        pos = close + 1
+
+
+def _statement_starts(data):
+    """(line start, declaration offset) of every top-level statement."""
+    starts = []
+    comments = []
+    for token in lexer.tokenize(data, jsx=True):
+        if token.depth != 0:
+            continue
+        if token.kind == lexer.COMMENT:
+            comments.append((token.start, token.end))
+        elif token.kind == lexer.CODE:
+            for match in _STATEMENT.finditer(data, token.start, token.end):
+                starts.append(match.start())
+
+    # Pull leading comment and blank lines into the statement they describe
+    comment_starts = {start for start, _ in comments}
+    result = []
+    for decl in starts:
+        start = decl
+        while start > 0:
+            line_start = data.rfind(b'\n', 0, start - 1) + 1
+            line = data[line_start:start]
+            stripped = line.lstrip()
+            first = line_start + len(line) - len(stripped)
+            if stripped.strip() and not (_BLANK_OR_COMMENT.match(line) and
+                                         (first in comment_starts or _inside(first, comments))):
+                break
+            start = line_start
+        # ...but leave blank lines above them with the previous statement
+        while start < decl and data[start:data.find(b'\n', start) + 1].strip() == b'':
+            start = data.find(b'\n', start) + 1
+        result.append((start, decl))
+    return result
+
+
+def _inside(offset, spans):
+    return any(start <= offset < end for start, end in spans)
+
+
+def _parse_import(text, lead):
+    match = _IMPORT.match(text)
+    if match is None:
+        raise SplitError(f"Cannot parse import: {text[:60]!r}")
+    type_only, clause, _, source = match.groups()
+    default = namespace = None
+    named = []
+    if clause:
+        brace = clause.find('{')
+        head = clause[:brace] if brace >= 0 else clause
+        for part in (p.strip() for p in head.split(',')):
+            if part.startswith('*'):
+                namespace = part.split()[-1]
+            elif part:
+                default = part
+        if brace >= 0:
+            for spec in clause[brace + 1:clause.rindex('}')].split(','):
+                spec = ' '.join(spec.split())
+                if not spec:
+                    continue
+                spec_match = _SPECIFIER.match(spec)
+                if spec_match is None:
+                    raise SplitError(f"Cannot parse import specifier {spec!r}")
+                named.append((spec, spec_match.group(3) or spec_match.group(2),
+                              bool(spec_match.group(1))))
+    return Import(source, bool(type_only), default, namespace, named, lead, text)
+
+
+def _import_bindings(imp):
+    """(local name, is a runtime value) for every binding of an import."""
+    bindings = []
+    if imp.default:
+        bindings.append((imp.default, not imp.type_only))
+    if imp.namespace:
+        bindings.append((imp.namespace, not imp.type_only))
+    for _, local, is_type in imp.named:
+        bindings.append((local, not (imp.type_only or is_type)))
+    return bindings
+
+
+def component_bindings(imports):
+    """Runtime bindings imported from component modules (the budget's 'components')."""
+    return {name for imp in imports if not _NON_COMPONENT_SOURCES.match(imp.source)
+            for name, is_value in _import_bindings(imp) if is_value}
+
+
+def analyze_story_file(path, data=None):
+    """
+    Cut a story file into top-level statements.
+
+    Returns:
+        Analysis with `statements` (Statement tuples, in order), `imports`
+        (Import per import statement, by statement index), `meta` (index
+        of the meta declaration or None), `stories` (indexes of the story
+        exports) and `components` (runtime bindings from component modules)
+
+    Raises:
+        lexer.LexError: The file does not lex
+        SplitError: An import cannot be parsed
+    """
+    if data is None:
+        with open(path, 'rb') as f:
+            data = f.read()
+    starts = _statement_starts(data)
+    statements = []
+    imports = {}
+    default_name = None
+    for i, (start, decl) in enumerate(starts):
+        end = starts[i + 1][0] if i + 1 < len(starts) else len(data)
+        match = _DECLARATION.match(data, decl)
+        exported, default, keyword, name = match.groups()
+        keyword = keyword.decode() if keyword else None
+        name = name.decode() if name else None
+        if keyword == 'import':
+            text = data[decl:end].decode().rstrip()
+            imports[i] = _parse_import(text, data[start:decl].decode())
+            names = {binding for binding, _ in _import_bindings(imports[i])}
+            statements.append(Statement('import', None, names, set(), start, decl, end))
+            continue
+        if default:
+            default_match = _DEFAULT_NAME.match(data, decl)
+            if default_match and not data[default_match.end():end].strip():
+                default_name = default_match.group(1).decode()
+            kind, name = 'default', None
+        elif exported and keyword not in ('type', 'interface'):
+            kind = 'story'
+        elif keyword in ('const', 'let', 'var') and name is None:
+            kind = 'decl'   # destructuring: declares every name in the pattern
+        else:
+            kind = 'decl' if keyword else 'other'
+        names = {name} if name else set()
+        if kind == 'decl' and name is None:
+            equals = data.find(b'=', decl, end)
+            names = used_identifiers(data, match.end(), equals if equals > 0 else end)
+        uses = used_identifiers(data, decl, end) - names
+        statements.append(Statement(kind, name, names, uses, start, decl, end))
+
+    meta = None
+    for i, statement in enumerate(statements):
+        if statement.kind == 'decl' and default_name and statement.name == default_name:
+            meta = i
+        elif statement.kind == 'default' and default_name is None:
+            meta = i    # `export default { ... }`
+    stories = [i for i, statement in enumerate(statements) if statement.kind == 'story']
+    return Analysis(str(path), data, statements, imports, meta, stories,
+                    component_bindings(imports.values()))
+
+
+# ----------------------------------------------------------------------
+# Planning
+# ----------------------------------------------------------------------
+
+def _providers(analysis):
+    """{declared name: statement index} for non-import statements."""
+    providers = {}
+    for i, statement in enumerate(analysis.statements):
+        if statement.kind not in ('import', 'default'):
+            for name in statement.names:
+                providers.setdefault(name, i)
+    return providers
+
+
+def _closure(analysis, providers, roots, stop=()):
+    """Statement indexes reachable from `roots` through their uses."""
+    seen = set()
+    pending = list(roots)
+    while pending:
+        i = pending.pop()
+        if i in seen or i in stop:
+            continue
+        seen.add(i)
+        for name in analysis.statements[i].uses:
+            j = providers.get(name)
+            if j is not None and j not in seen:
+                pending.append(j)
+    return seen
+
+
+def _meta_bound(analysis, providers):
+    """Statements that (transitively) refer to the meta declaration's names."""
+    if analysis.meta is None:
+        return set()
+    meta_names = analysis.statements[analysis.meta].names
+    bound = set()
+    changed = True
+    while changed:
+        changed = False
+        for i, statement in enumerate(analysis.statements):
+            if i in bound or i == analysis.meta or statement.kind in ('import', 'story', 'default'):
+                continue
+            if statement.uses & meta_names or any(providers.get(n) in bound for n in statement.uses):
+                bound.add(i)
+                changed = True
+    return bound
+
+
+def _story_units(analysis, providers):
+    """Stories grouped so that stories referring to each other stay together."""
+    units = []
+    unit_of = {}
+    for i in analysis.stories:
+        linked = {unit_of[j] for j in _closure(analysis, providers, [i]) if j in unit_of}
+        for story_name in analysis.statements[i].uses:
+            j = providers.get(story_name)
+            if j in unit_of:
+                linked.add(unit_of[j])
+        if linked:
+            target = min(linked)
+            for other in sorted(linked - {target}, reverse=True):
+                units[target].extend(units[other])
+                units[other] = []
+            units[target].append(i)
+        else:
+            target = len(units)
+            units.append([i])
+        for j in units[target]:
+            unit_of[j] = target
+    return [sorted(unit) for unit in units if unit]
+
+
+def render_import(imp, used):
+    """Source for `imp` keeping only the bindings in `used` ('' if none)."""
+    if imp.default is None and imp.namespace is None and not imp.named:
+        return imp.text     # side-effect import
+    default = imp.default if imp.default in used else None
+    namespace = imp.namespace if imp.namespace in used else None
+    named = [spec for spec, local, _ in imp.named if local in used]
+    if default == imp.default and namespace == imp.namespace and len(named) == len(imp.named):
+        return imp.text
+    if not (default or namespace or named):
+        return ''
+    head = [part for part in (default, f'* as {namespace}' if namespace else None) if part]
+    prefix = 'import type ' if imp.type_only else 'import '
+    if named:
+        inline = ', '.join(named)
+        if len(inline) <= 60:
+            head.append(f'{{ {inline} }}')
+        else:
+            head.append('{\n' + ''.join(f'  {spec},\n' for spec in named) + '}')
+    return f"{prefix}{', '.join(head)} from '{imp.source}';"
+
+
+def _render(analysis, indexes, header='', exported=(), extra_import=None):
+    """
+    Source of a module made of `header` plus the statements at `indexes`
+    (in file order), preceded by the imports they use and `extra_import`.
+    """
+    data = analysis.data
+    body = []
+    used = set(used_identifiers(header.encode(), 0, len(header.encode()))) if header else set()
+    for i in sorted(indexes):
+        statement = analysis.statements[i]
+        text = data[statement.start:statement.end].decode().rstrip()
+        if i in exported and not data[statement.decl:statement.decl + 6] == b'export':
+            cut = statement.decl - statement.start
+            text = text[:cut] + 'export ' + text[cut:]
+        body.append(text)
+        used |= statement.uses
+
+    lines = []
+    preamble = analysis.imports[0].lead.strip() if 0 in analysis.imports else ''
+    if preamble:
+        lines.append(preamble)
+    imports = []
+    for i, imp in sorted(analysis.imports.items()):
+        rendered = render_import(imp, used)
+        if rendered:
+            lead = imp.lead.strip() if i else ''
+            imports.append(f'{lead}\n{rendered}' if lead else rendered)
+    if extra_import:
+        imports.append(extra_import)
+    if imports:
+        lines.append('\n'.join(imports))
+    if header:
+        lines.append(header)
+    lines.extend(body)
+    return '\n\n'.join(lines) + '\n'
+
+
+def _words(name):
+    return re.sub(r'(?<=[a-z])(?=[A-Z])|(?<=[A-Z0-9])(?=[A-Z][a-z])', ' ', name)
+
+
+def _part_header(analysis, meta_module, shared_imports, title):
+    """(import of the shared module, the part's own meta) for a part file."""
+    meta_decl = analysis.statements[analysis.meta]
+    meta_name = meta_decl.name or 'meta'
+    meta_text = analysis.data[meta_decl.decl:meta_decl.end]
+    specifiers = [f'{meta_name} as {SHARED_META}'] + sorted(shared_imports)
+    shared_import = f"import {{ {', '.join(specifiers)} }} from './{meta_module}';"
+    lines = [f'const {meta_name} = {{', f'  ...{SHARED_META},']
+    if title is not None:
+        lines.append(f"  title: '{title}',")
+    tags = _TAGS.search(meta_text)
+    if tags:
+        # Storybook reads tags statically; a spread would hide them
+        lines.append(f"  {tags.group().decode().strip()},")
+    variants = _META_VARIANTS.search(meta_text)
+    if variants:
+        # Keep the call in the part's meta, where verify-code-variants looks for it
+        lines += ['  parameters: {', f'    ...{SHARED_META}.parameters,',
+                  f'    codeVariants: {variants.group(1).decode()},', '  },']
+    lines += ['};', '', f'export default {meta_name};']
+    return shared_import, '\n'.join(lines)
+
+
+def _pack(units, measure, max_bytes, max_components):
+    """Pack story units, in source order, greedily into parts within the budget."""
+    groups = []
+    for unit in units:
+        if groups:
+            candidate = groups[-1] + unit
+            part_size, part_components = measure(candidate)
+            if part_size <= max_bytes and part_components <= max_components:
+                groups[-1] = candidate
+                continue
+        groups.append(list(unit))
+    return groups
+
+
+def _base_name(path):
+    name = os.path.basename(path)
+    for suffix in ('.stories.tsx.disabled', '.stories.tsx'):
+        if name.endswith(suffix):
+            return name[:-len(suffix)]
+    return name.split('.')[0]
+
+
+def plan_split(analysis, max_bytes=MAX_BYTES, max_components=MAX_COMPONENTS):
+    """
+    Decide how to bring a story file within budget.
+
+    Returns:
+        SplitPlan. `action` is 'ok' (already within budget and nothing to
+        prune), 'prune' (rewrite in place with unused imports dropped),
+        'split' (`parts` describe the new story files), or 'over-budget'
+        (cannot be split, e.g. a single story; `reason` says why).
+        `outputs` maps output paths to their text; `removes` lists files
+        to delete afterwards (the original when it was split or renamed).
+
+    Raises:
+        SplitError: The plan failed its checks (lost or duplicated
+        stories, output that does not lex)
+    """
+    path = analysis.path
+    size = len(analysis.data)
+    components = len(analysis.components)
+    providers = _providers(analysis)
+    disabled = path.endswith('.disabled')
+    enabled_path = path[:-len('.disabled')] if disabled else path
+    everything = set(range(len(analysis.statements))) - set(analysis.imports)
+
+    pruned = _render(analysis, everything)
+    used_components = len(_used_components(analysis, everything))
+    if size <= max_bytes and components <= max_components and not disabled:
+        return SplitPlan(path, 'ok', size, components, [], {}, [])
+    if len(pruned.encode()) <= max_bytes and used_components <= max_components:
+        outputs = {enabled_path: pruned}
+        _check_outputs(analysis, outputs)
+        return SplitPlan(path, 'prune', size, components, [], outputs,
+                         [path] if disabled else [])
+
+    title_match = _TITLE.search(analysis.data, analysis.statements[analysis.meta].start,
+                                analysis.statements[analysis.meta].end) \
+        if analysis.meta is not None else None
+    units = _story_units(analysis, providers)
+    if analysis.meta is None or analysis.statements[analysis.meta].kind != 'decl':
+        return SplitPlan(path, 'over-budget', size, components, [], {}, [],
+                         'no `const meta = ...; export default meta;` to share')
+    if SHARED_META in providers:
+        return SplitPlan(path, 'over-budget', size, components, [], {}, [],
+                         f'the file already declares `{SHARED_META}`')
+    if len(units) < 2:
+        return SplitPlan(path, 'over-budget', size, components, [], {}, [],
+                         'a single story (or stories that refer to each other)')
+
+    base = _base_name(path)
+    directory = os.path.dirname(path)
+    meta_module = f'{base}.meta'
+    bound = _meta_bound(analysis, providers)
+    meta_needs = _closure(analysis, providers, [analysis.meta]) - {analysis.meta}
+    title = title_match.group(2).decode() if title_match else None
+
+    def needs(stories):
+        """Local statements a part with these stories needs (stories included)."""
+        return _closure(analysis, providers, stories, stop={analysis.meta})
+
+    def measure(stories):
+        local = needs(stories)
+        shared_import, header = _part_header(analysis, meta_module, (), title)
+        return (len(_render(analysis, local, header, extra_import=shared_import).encode()),
+                len(_used_components(analysis, local)))
+
+    groups = _pack(units, measure, max_bytes, max_components)
+    # Even the parts out: the smallest byte cap that still packs into as
+    # many parts (at least two), so a split does not leave a sliver
+    target = max(len(groups), 2)
+    low, high = 0, max_bytes
+    while high - low > 256:
+        cap = (low + high) // 2
+        candidate = _pack(units, measure, cap, max_components)
+        if len(candidate) <= target:
+            groups, high = candidate, cap
+        else:
+            low = cap
+    if len(groups) < 2:
+        return SplitPlan(path, 'over-budget', size, components, [], {}, [],
+                         'its stories do not fit the budget in separate files')
+
+    # Helpers needed by the meta or by several parts go to the shared module
+    group_needs = [needs(group) - set(group) for group in groups]
+    counts = {}
+    for need in group_needs:
+        for i in need:
+            counts[i] = counts.get(i, 0) + 1
+    shared = {i for i, count in counts.items() if count > 1 and i not in bound} | meta_needs
+    shared = _closure(analysis, providers, shared, stop=set(analysis.stories))
+    shared -= bound
+    if shared & set(analysis.stories):
+        raise SplitError(f"{path}: the meta refers to a story; split by hand")
+
+    outputs = {}
+    meta_path = os.path.join(directory, f'{meta_module}.tsx')
+    outputs[meta_path] = _render(analysis, shared | {analysis.meta},
+                                 exported=shared | {analysis.meta})
+    parts = []
+    for group, need in zip(groups, group_needs):
+        first = analysis.statements[group[0]].name
+        local = (need - shared) | set(group)
+        shared_imports = {name for i in shared for name in analysis.statements[i].names
+                          if any(name in analysis.statements[j].uses for j in local)}
+        part_title = f'{title}/{_words(first)}' if title else None
+        shared_import, header = _part_header(analysis, meta_module, shared_imports, part_title)
+        part_path = os.path.join(directory, f'{base}.{first}.stories.tsx')
+        outputs[part_path] = _render(analysis, local, header, extra_import=shared_import)
+        parts.append(Part(part_path, part_title, [analysis.statements[i].name for i in group],
+                          len(outputs[part_path].encode()),
+                          len(_used_components(analysis, local))))
+    _check_outputs(analysis, outputs)
+    return SplitPlan(path, 'split', size, components, parts, outputs, [path])
+
+
+def _used_components(analysis, indexes):
+    used = set()
+    for i in indexes:
+        used |= analysis.statements[i].uses
+    return analysis.components & used
+
+
+def _check_outputs(analysis, outputs):
+    """Every output must lex and the story files must hold exactly the original stories."""
+    original = sorted(analysis.statements[i].name for i in analysis.stories)
+    found = []
+    for path, text in outputs.items():
+        data = text.encode()
+        try:
+            for _ in lexer.tokenize(data, jsx=True):
+                pass
+        except lexer.LexError as e:
+            line, column = lexer.line_col(data, e.offset)
+            raise SplitError(f"{path}:{line}:{column}: generated file does not lex: {e}")
+        if path.endswith('.stories.tsx'):
+            output = analyze_story_file(path, data)
+            found += [output.statements[i].name for i in output.stories]
+    if sorted(found) != original:
+        lost = sorted(set(original) - set(found))
+        raise SplitError(f"{analysis.path}: split would lose or duplicate stories {lost}")
@@ -0,0 +1,199 @@
+"""
+Single-pass extractor for Storybook `.stories.tsx` files.
+
+A literal scan walks the file once and picks out the few things the
+tooling cares about:
+
+- story exports: `export const X: Story = {`, `export const X: StoryObj<...> = {`
+  and `export const X = { ... } satisfies Story`
+- `getCodeVariants('<key>', '<example>')` calls
+- the `export default meta` statement
+
+Stories are reported as byte spans into the original buffer; no section of
+the file is ever copied. A story's span runs to the next export;
+`story_object()` narrows it to the exact braces of the story object with
+the linear lexer, for tools that edit it.
+
+Usage:
+    meta, stories = scan_stories(data)
+    for story in stories:
+        story.name, story.start, story.end, story.has_variants, ...
+
+    meta, stories, calls = scan_stories(data, calls=True)   # every call site
+    open_pos, close_pos = story_object(data, story)        # exact '{' ... '}'
+"""
+
+import re
+from collections import namedtuple
+
+from . import lexer
+
+StoryRecord = namedtuple(
+    'StoryRecord', 'name start end has_variants variant_key example_name'
+)
+MetaRecord = namedtuple('MetaRecord', 'has_variants variant_key example_name')
+# key/example are None when the arguments are not string literals
+CallRecord = namedtuple('CallRecord', 'offset variant_key example_name')
+
+# Cheap literal scan for candidate positions; each hit is then confirmed
+# with an anchored pattern, so the file is still walked only once.
+_LOCATOR = re.compile(rb'export|satisfies|getCodeVariants')
+_EXPORT = re.compile(
+    rb'export[ \t]+(?:const[ \t]+(\w+)[ \t]*(?::[ \t]*(\w+)[^=\n]*)?=|(default)\b)'
+)
+_SATISFIES = re.compile(rb'satisfies[ \t]+(?:Story|StoryObj)\b')
+_CALL = re.compile(
+    rb'getCodeVariants\(\s*'
+    rb'(?:([\'"])([^\'"\n]*)\1\s*,\s*([\'"])([^\'"\n]*)\3)?'
+)
+
+STORY_TYPES = (b'Story', b'StoryObj')
+
+
+def _iter_records(data):
+    """Yield MetaRecord / StoryRecord / CallRecord items in source order."""
+    current = None          # [name, start, is_story, key, example, has_call]
+    meta_call = None        # (key, example) of a call seen outside any story
+    meta_seen = False
+
+    def finish(end):
+        name, start, is_story, key, example, has_call = current
+        if is_story:
+            return StoryRecord(name, start, end, has_call, key, example)
+        return None
+
+    for hit in _LOCATOR.finditer(data):
+        pos = hit.start()
+        word = hit.group()
+        if pos and (data[pos - 1:pos].isalnum() or data[pos - 1] in b'_$'):
+            continue
+
+        if word == b'export':
+            # Top-level statements start at column 0
+            if pos and data[pos - 1] != 0x0A:
+                continue
+            match = _EXPORT.match(data, pos)
+            if match is None:
+                continue
+            name, annotation, default = match.groups()
+            if default is None:
+                if current is not None:
+                    record = finish(pos)
+                    if record:
+                        yield record
+                current = [name.decode(), pos, annotation in STORY_TYPES, None, None, False]
+            elif not meta_seen:
+                meta_seen = True
+                if current is not None:
+                    if current[2]:
+                        yield finish(pos)
+                    elif current[5] and meta_call is None:
+                        # e.g. `export const meta = {...}`: its calls belong to meta
+                        meta_call = (current[3], current[4])
+                    current = None
+                yield MetaRecord(meta_call is not None, *(meta_call or (None, None)))
+        elif word == b'satisfies':
+            if current is not None and _SATISFIES.match(data, pos):
+                current[2] = True
+        else:
+            match = _CALL.match(data, pos)
+            if match is None:
+                continue
+            key = match.group(2).decode() if match.group(2) is not None else None
+            example = match.group(4).decode() if match.group(4) is not None else None
+            yield CallRecord(pos, key, example)
+            if current is not None:
+                if not current[5]:
+                    current[3], current[4], current[5] = key, example, True
+            elif meta_call is None:
+                meta_call = (key, example)
+
+    if current is not None:
+        record = finish(len(data))
+        if record:
+            yield record
+    if not meta_seen:
+        yield MetaRecord(False, None, None)
+
+
+def iter_stories(data):
+    """Yield a StoryRecord for every story export in `data` (bytes)."""
+    for record in _iter_records(data):
+        if isinstance(record, StoryRecord):
+            yield record
+
+
+def scan_stories(data, calls=False):
+    """
+    Return (meta, stories) for a story file's bytes, in one pass.
+
+    `meta.has_variants` is True when the default-exported meta object calls
+    getCodeVariants(); each story's `has_variants` only reflects its own span.
+    With `calls=True`, returns (meta, stories, call_records) instead, listing
+    every getCodeVariants() call in source order.
+    """
+    meta = None
+    stories = []
+    call_records = []
+    for record in _iter_records(data):
+        if isinstance(record, StoryRecord):
+            stories.append(record)
+        elif isinstance(record, CallRecord):
+            call_records.append(record)
+        else:
+            meta = record
+    if calls:
+        return meta, stories, call_records
+    return meta, stories
+
+
+def scan_story_file(path, calls=False):
+    """scan_stories() for a file path."""
+    with open(path, 'rb') as f:
+        return scan_stories(f.read(), calls)
+
+
+def story_object(data, story):
+    """
+    Return the (open, close) offsets of a story's object literal braces.
+
+    Returns None when the story is not initialised with an object literal
+    (e.g. `export const X: Story = Template.bind({})`).
+
+    The close is searched to the end of the file rather than the story's
+    end: `export` at the start of a line inside a template literal (source
+    snippets in docs parameters) ends `story.end` early.
+
+    Raises:
+        lexer.LexError: The object is never closed
+    """
+    match = _EXPORT.match(data, story.start)
+    if match is None:
+        return None
+    open_pos = match.end()
+    while open_pos < story.end and data[open_pos] in b' \t\r\n':
+        open_pos += 1
+    if open_pos >= story.end or data[open_pos] != ord('{'):
+        return None
+    return open_pos, lexer.find_matching_close(data, open_pos, jsx=True)
+
+
+def example_name_for(story_name):
+    """
+    Return the variant key a story would naturally map to.
+
+    Story exports are PascalCase and variant keys camelCase:
+    `WithError` -> `withError`, `Default` -> `default`.
+    """
+    return story_name[:1].lower() + story_name[1:]
+
+
+_NOT_ALNUM = re.compile(r'[^a-z0-9]')
+
+
+def normalize(name):
+    """
+    Lowercase letters and digits only, for matching names across spellings:
+    `WithHelpText`, `withHelpText` and `with-help-text` -> `withhelptext`.
+    """
+    return _NOT_ALNUM.sub('', name.lower())
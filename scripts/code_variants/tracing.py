@@ -0,0 +1,286 @@
+"""
+Phase-level profiling for the variant scripts (`--profile`).
+
+Library code marks its phases unconditionally:
+
+    with tracing.phase('scan', file=path) as span:
+        span['bytes'] = len(data)
+        ...
+
+When no tracer is enabled `phase()` costs one function call and records
+nothing. A script that got `--profile` calls `enable()` first; every phase
+then records wall time, bytes processed and the tracemalloc allocation peak
+reached inside it (nested phases included). When the script exits the
+tracer writes a Chrome trace-event file (open it in chrome://tracing or
+https://ui.perfetto.dev) and prints a summary:
+
+- per phase: calls, total time, share of wall time, bytes, MB/s, peak
+- the slowest files, summed over their phases
+- outliers: files whose throughput in a phase is well below that phase's
+  median, which is where pathological inputs show up
+
+Memory tracing slows Python down noticeably; compare times between
+profiled runs, not against unprofiled ones.
+"""
+
+import atexit
+import json
+import os
+import time
+
+# tracemalloc and statistics are imported inside the methods that use them:
+# every script imports this module, and only profiled runs should pay for them
+
+from .paths import CACHE_DIR, REPO_ROOT
+
+# A file is an outlier when its MB/s in a phase is below median / this...
+OUTLIER_FACTOR = 3
+# ...and the phase took at least this long on it (shorter spans are noise)
+OUTLIER_MIN_NS = 1_000_000
+# Files listed in the "slowest files" table
+TOP_FILES = 10
+
+_tracer = None
+_DISCARD = {}
+
+
+class _NullPhase:
+    def __enter__(self):
+        return _DISCARD
+
+    def __exit__(self, *exc_info):
+        return False
+
+
+_NULL_PHASE = _NullPhase()
+
+
+class _Phase:
+    def __init__(self, tracer, name, file, nbytes):
+        self.tracer = tracer
+        self.span = {'name': name, 'file': file, 'bytes': nbytes}
+
+    def __enter__(self):
+        self.tracer._push(self.span)
+        return self.span
+
+    def __exit__(self, *exc_info):
+        self.tracer._pop(self.span)
+        return False
+
+
+def phase(name, file=None, nbytes=0):
+    """
+    Context manager timing one phase; a no-op unless a tracer is enabled.
+
+    Args:
+        name: Phase name ('read', 'scan', 'write', ...)
+        file: Path the phase works on, if any
+        nbytes: Bytes processed; can also be set later on the yielded dict
+    """
+    if _tracer is None:
+        return _NULL_PHASE
+    return _Phase(_tracer, name, file, nbytes)
+
+
+def enabled():
+    return _tracer is not None
+
+
+class Tracer:
+    """Collects phase spans for one script run; see the module docstring."""
+
+    def __init__(self, script, trace_path, memory=True):
+        import tracemalloc
+        self.script = script
+        self.trace_path = str(trace_path)
+        self.memory = memory
+        self.spans = []
+        self._stack = []
+        self._finished = False
+        if memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+        self.origin = time.perf_counter_ns()
+
+    def _push(self, span):
+        if self.memory:
+            import tracemalloc
+            if self._stack:
+                parent = self._stack[-1]
+                parent['peak'] = max(parent['peak'], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        if span['file'] is None and self._stack:
+            span['file'] = self._stack[-1]['file']     # nested phases inherit the file
+        span['peak'] = 0
+        span['depth'] = len(self._stack)
+        self._stack.append(span)
+        span['start'] = time.perf_counter_ns()
+
+    def _pop(self, span):
+        span['end'] = time.perf_counter_ns()
+        self._stack.pop()
+        if self.memory:
+            import tracemalloc
+            span['peak'] = max(span['peak'], tracemalloc.get_traced_memory()[1])
+            if self._stack:
+                parent = self._stack[-1]
+                parent['peak'] = max(parent['peak'], span['peak'])
+        self.spans.append(span)
+
+    # ------------------------------------------------------------------
+    # Output
+    # ------------------------------------------------------------------
+
+    def trace_events(self):
+        """Return the spans as a Chrome trace-event document."""
+        pid = os.getpid()
+        events = [{'name': 'process_name', 'ph': 'M', 'pid': pid, 'tid': 0,
+                   'args': {'name': self.script}}]
+        for span in sorted(self.spans, key=lambda s: (s['start'], s['depth'])):
+            args = {'bytes': span['bytes']}
+            if span['file']:
+                args['file'] = _relative(span['file'])
+            if self.memory:
+                args['peak_kb'] = round(span['peak'] / 1024, 1)
+            events.append({
+                'name': span['name'], 'cat': 'file' if span['file'] else 'phase', 'ph': 'X',
+                'ts': (span['start'] - self.origin) / 1000, 'dur': (span['end'] - span['start']) / 1000,
+                'pid': pid, 'tid': 0, 'args': args,
+            })
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def summary(self, wall_ns):
+        """Return (phase rows, slowest files, outliers) for the text report."""
+        import statistics
+
+        phases = {}
+        files = {}
+        # A file's time is the sum of its outermost spans (nested ones are inside them)
+        file_depth = {}
+        for span in self.spans:
+            if span['file']:
+                file_depth[span['file']] = min(file_depth.get(span['file'], span['depth']), span['depth'])
+        for span in self.spans:
+            ns = span['end'] - span['start']
+            row = phases.setdefault(span['name'], {'calls': 0, 'ns': 0, 'bytes': 0, 'peak': 0,
+                                                   'depth': span['depth']})
+            row['calls'] += 1
+            row['ns'] += ns
+            row['bytes'] += span['bytes']
+            row['peak'] = max(row['peak'], span['peak'])
+            row['depth'] = min(row['depth'], span['depth'])
+            if span['file']:
+                entry = files.setdefault(span['file'], {'ns': 0, 'bytes': 0, 'phases': {}})
+                entry['phases'][span['name']] = entry['phases'].get(span['name'], 0) + ns
+                entry['bytes'] = max(entry['bytes'], span['bytes'])
+                if span['depth'] == file_depth[span['file']]:
+                    entry['ns'] += ns
+
+        slowest = sorted(files.items(), key=lambda item: item[1]['ns'], reverse=True)[:TOP_FILES]
+
+        outliers = []
+        for name in phases:
+            rates = [(span['bytes'] / max(span['end'] - span['start'], 1) * 1e9, span)
+                     for span in self.spans if span['name'] == name and span['file'] and span['bytes']]
+            if len(rates) < 3:
+                continue
+            median = statistics.median(rate for rate, _ in rates)
+            for rate, span in rates:
+                if rate * OUTLIER_FACTOR < median and span['end'] - span['start'] >= OUTLIER_MIN_NS:
+                    outliers.append((name, span['file'], rate, median,
+                                     (span['end'] - span['start']) / 1e6))
+        outliers.sort(key=lambda item: item[2] / item[3])
+        return phases, slowest, outliers
+
+    def finish(self, log=print):
+        """Write the trace file and print the summary (once)."""
+        import tracemalloc
+
+        if self._finished:
+            return
+        self._finished = True
+        wall_ns = time.perf_counter_ns() - self.origin
+        peak = max([tracemalloc.get_traced_memory()[1]] + [span['peak'] for span in self.spans]) \
+            if self.memory else 0
+        if self.memory:
+            tracemalloc.stop()
+
+        os.makedirs(os.path.dirname(self.trace_path) or '.', exist_ok=True)
+        with open(self.trace_path, 'w') as f:
+            json.dump(self.trace_events(), f, separators=(',', ':'))
+
+        phases, slowest, outliers = self.summary(wall_ns)
+        log("\n" + "=" * 80)
+        log(f"⏱️  PROFILE: {self.script} ({wall_ns / 1e6:.1f} ms wall"
+            + (f", {peak / 1024 / 1024:.1f} MB peak traced)" if self.memory else ")"))
+        log("=" * 80)
+        log(f"{'Phase':<24} {'Calls':>7} {'Total ms':>10} {'% wall':>7} {'Bytes':>12} "
+            f"{'MB/s':>8} {'Peak KB':>9}")
+        for name, row in sorted(phases.items(), key=lambda item: item[1]['ns'], reverse=True):
+            rate = f"{row['bytes'] / (row['ns'] / 1e9) / 1e6:.1f}" if row['bytes'] and row['ns'] else '-'
+            log(f"{'  ' * row['depth'] + name:<24} {row['calls']:>7} {row['ns'] / 1e6:>10.1f} "
+                f"{row['ns'] / wall_ns * 100:>6.1f}% {row['bytes']:>12,} {rate:>8} "
+                f"{row['peak'] / 1024:>9.0f}")
+
+        if slowest:
+            log("\n🐢 SLOWEST FILES:")
+            for path, entry in slowest:
+                breakdown = ', '.join(f"{name} {ns / 1e6:.1f}" for name, ns in
+                                      sorted(entry['phases'].items(), key=lambda i: i[1], reverse=True))
+                log(f"   {entry['ns'] / 1e6:>8.1f} ms  {entry['bytes']:>9,} B  {_relative(path)}  ({breakdown})")
+
+        if outliers:
+            log(f"\n⚠️  OUTLIERS (below 1/{OUTLIER_FACTOR} of the phase's median MB/s):")
+            for name, path, rate, median, ms in outliers:
+                log(f"   {name:<12} {rate / 1e6:>7.2f} MB/s vs {median / 1e6:.2f} median, "
+                    f"{ms:.1f} ms  {_relative(path)}")
+
+        log(f"\n📈 Chrome trace written to: {self.trace_path}")
+
+
+def _relative(path):
+    try:
+        return os.path.relpath(path, REPO_ROOT)
+    except ValueError:
+        return str(path)
+
+
+def default_trace_path(script):
+    return CACHE_DIR / f'{script}.trace.json'
+
+
+def enable(script, trace_path=None, memory=True):
+    """
+    Start tracing for this process and report when it exits.
+
+    Args:
+        script: Name shown in the report and used for the default trace path
+        trace_path: Where to write the Chrome trace (default:
+            .cache/code-variants/<script>.trace.json)
+        memory: Track allocation peaks with tracemalloc
+    """
+    global _tracer
+    _tracer = Tracer(script, trace_path or default_trace_path(script), memory)
+    atexit.register(_tracer.finish)
+    return _tracer
+
+
+def add_profile_argument(parser):
+    """Add the shared `--profile [TRACE]` option to an argparse parser."""
+    parser.add_argument('--profile', nargs='?', const='', metavar='TRACE',
+                        help='record per-phase timings, bytes and allocation peaks; write a '
+                             'Chrome trace to TRACE (default: .cache/code-variants/<script>.trace.json)')
+
+
+def enable_from_argv(script, argv):
+    """
+    `enable()` when `argv` holds `--profile` or `--profile=TRACE`, for
+    scripts without an argparse parser. Returns the tracer or None.
+    """
+    for i, arg in enumerate(argv):
+        if arg == '--profile':
+            path = argv[i + 1] if i + 1 < len(argv) and not argv[i + 1].startswith('-') else None
+            return enable(script, path)
+        if arg.startswith('--profile='):
+            return enable(script, arg.split('=', 1)[1] or None)
+    return None
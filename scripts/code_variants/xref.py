@@ -0,0 +1,151 @@
+"""
+Cross-reference story getCodeVariants() calls against codeVariants.ts.
+
+A call only renders code when its component key is in the getCodeVariants()
+mapping table and the example exists in that component's examples object;
+otherwise MultiLanguageCode silently shows its "not yet available" notice.
+`cross_reference()` builds a hash index of every `componentKey -> example`
+pair from the catalog, scans each story file once for its call sites, and
+joins the two:
+
+- dangling   - calls whose component key or example does not exist
+- dynamic    - calls whose arguments are not string literals
+- unused     - defined variants no call refers to
+- unmapped   - examples objects missing from the mapping table
+- per story  - whether the call names the variant matching the story
+               (`WithError` -> `withError`, `with-error` or `witherror`;
+               see `matching_example()`) or falls back to another one,
+               and whether a matching variant exists to switch to
+"""
+
+import os
+
+from .stories import example_name_for, normalize, scan_stories
+
+OK = 'ok'
+UNKNOWN_COMPONENT = 'unknown-component'
+UNKNOWN_EXAMPLE = 'unknown-example'
+DYNAMIC = 'dynamic'
+
+
+def variant_index(catalog):
+    """Return {component key: frozenset(example names)} for mapped components."""
+    return {key: frozenset(catalog.exports[export_name]['variants'])
+            for key, export_name in catalog.mapping.items()
+            if export_name in catalog.exports}
+
+
+def matching_example(index, component_key, story_name):
+    """
+    The example of `component_key` that matches a story, or None.
+
+    The camelCase name (`WithHelpText` -> `withHelpText`) wins; otherwise
+    examples are compared normalized (lowercase, letters and digits only),
+    so `with-help-text` and `withhelptext` match too.
+
+    Args:
+        index: variant_index() result
+    """
+    examples = index.get((component_key or '').lower(), frozenset())
+    wanted = example_name_for(story_name)
+    if wanted in examples:
+        return wanted
+    target = normalize(story_name)
+    return next((example for example in sorted(examples) if normalize(example) == target), None)
+
+
+def _line_numbers(data, offsets):
+    """1-based line of each sorted offset, counting newlines incrementally."""
+    lines = []
+    line, previous = 1, 0
+    for offset in offsets:
+        line += data.count(b'\n', previous, offset)
+        previous = offset
+        lines.append(line)
+    return lines
+
+
+def cross_reference(catalog, story_files, base_path):
+    """
+    Join every call site in `story_files` against the catalog.
+
+    Returns:
+        Dict with 'calls' (one entry per call site), 'stories' (one entry
+        per story that calls getCodeVariants), 'unused' ({component:
+        [example, ...]}), 'unmapped' (export names) and 'totals'
+    """
+    index = variant_index(catalog)
+    referenced = set()
+    calls = []
+    stories = []
+
+    for path in sorted(story_files):
+        with open(path, 'rb') as f:
+            data = f.read()
+        _, file_stories, file_calls = scan_stories(data, calls=True)
+        rel_path = os.path.relpath(path, base_path)
+        lines = _line_numbers(data, [call.offset for call in file_calls])
+
+        owners = iter(sorted(file_stories, key=lambda story: story.start))
+        owner = next(owners, None)
+        first_call = {}
+        for call, line in zip(file_calls, lines):
+            while owner is not None and owner.end <= call.offset:
+                owner = next(owners, None)
+            story = owner.name if owner is not None and owner.start <= call.offset else None
+
+            status = _status(index, call.variant_key, call.example_name)
+            if status == OK:
+                referenced.add((call.variant_key.lower(), call.example_name))
+            calls.append({
+                'file': rel_path, 'line': line, 'story': story,
+                'component': call.variant_key, 'example': call.example_name, 'status': status,
+            })
+            if story is not None:
+                first_call.setdefault(story, calls[-1])
+
+        for story in file_stories:
+            call = first_call.get(story.name)
+            if call is None:
+                continue
+            match = matching_example(index, call['component'], story.name)
+            exact = call['example'] is not None and (
+                call['example'] == match or normalize(call['example']) == normalize(story.name))
+            stories.append({
+                'file': rel_path, 'story': story.name, 'line': call['line'],
+                'component': call['component'], 'example': call['example'],
+                'status': call['status'],
+                'exact': exact,
+                'exact_available': not exact and match is not None,
+            })
+
+    unused = {}
+    for key, examples in index.items():
+        missing = sorted(example for example in examples if (key, example) not in referenced)
+        if missing:
+            unused[key] = missing
+    unmapped = sorted(set(catalog.exports) - set(catalog.mapping.values()))
+
+    totals = {
+        'files': len(story_files),
+        'calls': len(calls),
+        'defined': sum(len(examples) for examples in index.values()),
+    }
+    for status in (OK, UNKNOWN_COMPONENT, UNKNOWN_EXAMPLE, DYNAMIC):
+        totals[status] = sum(1 for call in calls if call['status'] == status)
+    totals['stories'] = len(stories)
+    totals['exact'] = sum(1 for story in stories if story['exact'])
+    totals['exact_available'] = sum(1 for story in stories if story['exact_available'])
+    totals['unused'] = sum(len(examples) for examples in unused.values())
+
+    return {'totals': totals, 'calls': calls, 'stories': stories,
+            'unused': unused, 'unmapped': unmapped}
+
+
+def _status(index, key, example):
+    if key is None or example is None:
+        return DYNAMIC
+    examples = index.get(key.lower())
+    if examples is None:
+        return UNKNOWN_COMPONENT
+    return OK if example in examples else UNKNOWN_EXAMPLE
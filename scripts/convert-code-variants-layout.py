@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Convert between codeVariants.ts and the per-category module layout.
+
+`split` writes the examples objects of storybook/.storybook/blocks/codeVariants.ts
+into category modules (actions.ts, forms.ts, ...) in codeVariants.disabled/,
+keeping each object's category from the modules already there (new
+objects go by the directory of the stories that render them). `merge` builds
+codeVariants.ts back from the modules, with the objects in the order split
+recorded in index.ts, so split then merge gives back the same file byte for
+byte. Both directions check every variant's raw template literals byte for
+byte, and the getCodeVariants() mapping table, before anything is written.
+See scripts/code_variants/layout.py for the layout.
+
+Usage:
+    python3 scripts/convert-code-variants-layout.py split [--dir DIR] [--file PATH] [--write] [--force]
+    python3 scripts/convert-code-variants-layout.py merge [--dir DIR] [--file PATH] [--write]
+
+Options:
+    --dir    Layout directory (default: storybook/.storybook/blocks/codeVariants.disabled)
+    --file   Monolith (default: storybook/.storybook/blocks/codeVariants.ts)
+    --write  Write the result; without it only the checks run
+    --force  split: drop objects that only the layout has
+
+A merge is written atomically and journaled:
+`python3 scripts/code-variants-journal.py undo` restores the previous file.
+"""
+
+import argparse
+import os
+import sys
+import time
+
+from code_variants.catalog import CatalogError, load_catalog, parse_region
+from code_variants.layout import (DEFAULT_CATEGORIES, LAYOUT_DIR, Layout, compare, layout_strings,
+                                  merge, read_layout, split, story_categories, variant_strings,
+                                  write_layout)
+from code_variants.paths import REPO_ROOT, VARIANTS_FILE
+
+
+def _relative(path):
+    return os.path.relpath(path, REPO_ROOT)
+
+
+def _report_problems(title, problems):
+    if not problems:
+        print(f"✅ {title}")
+        return True
+    print(f"❌ {title}: {len(problems)} problem(s)")
+    for problem in problems[:20]:
+        print(f"   {problem}")
+    if len(problems) > 20:
+        print(f"   ... {len(problems) - 20} more")
+    return False
+
+
+def run_split(args):
+    with open(args.file, 'rb') as f:
+        data = f.read()
+    layout = read_layout(args.dir)
+    start = time.perf_counter()
+    exports, function = parse_region(data)
+    mapping = {key: entry['export'] for key, entry in function['mapping'].items()} if function else {}
+    hints = story_categories(mapping, layout.categories or DEFAULT_CATEGORIES)
+    files, report = split(data, layout, {name: hints[name] for name in exports if name in hints})
+    result = Layout(files, list(report['categories']))
+    source = variant_strings(data)
+    merged = merge(result)
+    round_trip = compare(source, variant_strings(merged), ordered=True)
+    if not round_trip and merged != data:
+        round_trip = ['merged file differs outside the template literals']
+    checks = [
+        _report_problems('Every variant is byte-identical in the category modules',
+                         compare(source, layout_strings(result))),
+        _report_problems('Merging the modules gives back codeVariants.ts byte for byte', round_trip),
+    ]
+    elapsed = time.perf_counter() - start
+
+    print(f"\n📂 {_relative(args.file)} -> {_relative(args.dir)}/ ({elapsed * 1000:.0f} ms)")
+    for category, names in report['categories'].items():
+        size = len(files[f'{category}.ts'])
+        print(f"   {category + '.ts':<20} {len(names):>3} object(s) {size / 1024:>10,.1f} KB")
+    for name, category in report['new'].items():
+        print(f"   ➕ {name} -> {category}.ts (not in the layout yet)")
+    if report['dropped']:
+        print(f"   ➖ Only in the layout ({len(report['dropped'])}): {', '.join(report['dropped'])}")
+
+    if not all(checks):
+        return 1
+    if not args.write:
+        print("\n📝 Checks only; re-run with --write to write the modules")
+        return 0
+    if report['dropped'] and not args.force:
+        print("\n❌ Nothing written: the objects above are only in the layout; "
+              "add them to codeVariants.ts or pass --force")
+        return 1
+    written, unchanged, removed = write_layout(files, args.dir)
+    print(f"\n✅ Wrote {len(written)} module(s), {len(unchanged)} unchanged"
+          + (f", removed {', '.join(removed)}" if removed else ''))
+    return 0
+
+
+def run_merge(args):
+    layout = read_layout(args.dir)
+    start = time.perf_counter()
+    try:
+        data = merge(layout)
+    except CatalogError as e:
+        print(f"❌ {e}")
+        return 1
+    merged = variant_strings(data)
+    checks = [_report_problems('Every variant of the category modules is byte-identical after merging',
+                               compare(layout_strings(layout), merged))]
+    files, _ = split(data, layout)
+    canonical = all(layout.files.get(name) == content for name, content in files.items())
+    elapsed = time.perf_counter() - start
+    if canonical:
+        print("✅ Splitting the result gives back the same modules")
+    else:
+        print("⚠️  The modules are not in split form; a later split will rewrite their headers")
+
+    current = None
+    if os.path.exists(args.file):
+        with open(args.file, 'rb') as f:
+            current = f.read()
+    print(f"\n📂 {_relative(args.dir)}/ -> {_relative(args.file)} ({elapsed * 1000:.0f} ms): "
+          f"{len(merged[0])} object(s), {len(data) / 1024:,.1f} KB")
+    if current == data:
+        print("✓  codeVariants.ts is already up to date")
+        return 0 if all(checks) else 1
+    if current is not None:
+        changes = compare(variant_strings(current), merged)
+        print(f"   Changes against the current file: {len(changes) or 'object order only'}")
+        for change in changes[:20]:
+            print(f"   {change}")
+
+    if not all(checks):
+        return 1
+    if not args.write:
+        print("\n📝 Checks only; re-run with --write to write codeVariants.ts")
+        return 0
+    if current is None:
+        print(f"❌ {_relative(args.file)} does not exist")
+        return 1
+    catalog = load_catalog(args.file)
+    try:
+        catalog.apply_edits([(0, catalog.stamp['size'], data)])
+    except CatalogError as e:
+        print(f"❌ Nothing written: {e}")
+        return 1
+    print(f"\n✅ Wrote {_relative(args.file)}")
+    print("   Undo with: python3 scripts/code-variants-journal.py undo")
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Convert between codeVariants.ts and category modules.')
+    parser.add_argument('command', choices=('split', 'merge'))
+    parser.add_argument('--dir', default=str(LAYOUT_DIR), help='layout directory')
+    parser.add_argument('--file', default=str(VARIANTS_FILE), help='codeVariants.ts')
+    parser.add_argument('--write', action='store_true', help='write the result')
+    parser.add_argument('--force', action='store_true', help='split: drop objects only the layout has')
+    args = parser.parse_args()
+
+    print("=" * 80)
+    print(f"🔀 CODE VARIANTS LAYOUT: {args.command}")
+    print("=" * 80)
+    if args.command == 'split':
+        return run_split(args)
+    return run_merge(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Cross-check the Polaris-documented variations against the code variants.
+
+This script joins packages/include-system/src/generated/componentVariations.ts
+(written by scripts/collect-component-variations.js from the Polaris MDX
+files) with storybook/.storybook/blocks/codeVariants.ts and reports:
+
+- documented variations without code, per language (no variant at all, or
+  an empty tab)
+- variants of documented components that Polaris does not document
+- documented components with no examples object, and component keys with
+  no Polaris page
+
+Results are cached by the hashes of both files; an unchanged pair is
+answered without re-parsing either. See scripts/code_variants/polaris.py
+for how names are matched.
+
+Usage:
+    python3 scripts/crosscheck-polaris-variations.py [--language LANG] [--include-deprecated]
+                                                     [--no-cache] [--json REPORT]
+
+Options:
+    --language            Only list variations missing this language
+    --include-deprecated  Also check the Polaris `deprecated` group
+    --no-cache            Recompute even if neither file changed
+    --json                Save the full report as JSON
+
+Exits 1 when a documented variation has no code in the selected languages.
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from code_variants.catalog import LANGUAGES, load_catalog
+from code_variants.polaris import VARIATIONS_FILE, cached_crosscheck
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-check Polaris variations against code variants.')
+    parser.add_argument('--language', choices=LANGUAGES, help='only variations missing this language')
+    parser.add_argument('--include-deprecated', action='store_true', help='check the deprecated group too')
+    parser.add_argument('--no-cache', action='store_true', help='recompute even if nothing changed')
+    parser.add_argument('--variations', default=str(VARIATIONS_FILE), help=argparse.SUPPRESS)
+    parser.add_argument('--json', metavar='REPORT', help='save the full report as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = load_catalog()
+    try:
+        report, cached = cached_crosscheck(catalog, args.variations, args.include_deprecated,
+                                           use_cache=not args.no_cache)
+    except (OSError, ValueError) as e:
+        print(f"❌ Cannot read {args.variations}: {e}")
+        print("   Regenerate it with: node scripts/collect-component-variations.js")
+        return 1
+    elapsed = time.perf_counter() - start
+
+    totals = report['totals']
+    documented = totals['documented']
+    missing = [row for row in report['missing']
+               if args.language is None or args.language in row['languages']]
+
+    print("=" * 80)
+    print("🔗 POLARIS VARIATIONS vs CODE VARIANTS")
+    print("=" * 80)
+    print(f"Documented variations: {documented} ({elapsed * 1000:.0f} ms{', cached' if cached else ''})")
+    for language in LANGUAGES:
+        covered = totals['covered'][language]
+        print(f"   {language:<11} {covered:>4}/{documented} ({covered / (documented or 1) * 100:.1f}%)")
+
+    if report['polaris_only']:
+        print(f"\n📕 Documented in Polaris, no examples object ({len(report['polaris_only'])}):")
+        for name in report['polaris_only']:
+            print(f"   - {name}")
+
+    if missing:
+        print(f"\n❌ Variations without code ({len(missing)}):")
+        by_component = {}
+        for row in missing:
+            by_component.setdefault(row['component'], []).append(row)
+        for component, rows in by_component.items():
+            if rows[0]['key'] is None:
+                continue
+            print(f"\n📄 {component} -> {rows[0]['key']}")
+            for row in rows:
+                if row['variant'] is None:
+                    print(f"   - {row['example']:<40} no variant")
+                else:
+                    print(f"   - {row['example']:<40} {row['variant']}: no {', '.join(row['languages'])}")
+
+    undocumented = report['undocumented']
+    if undocumented:
+        count = sum(len(names) for names in undocumented.values())
+        print(f"\n➕ Variants with no Polaris counterpart ({count} in {len(undocumented)} components):")
+        for key, names in undocumented.items():
+            print(f"   {key:<20} {', '.join(names)}")
+    if report['catalog_only']:
+        print(f"\n📗 Component keys with no Polaris page ({len(report['catalog_only'])}): "
+              f"{', '.join(report['catalog_only'])}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report saved to: {args.json}")
+
+    print("\n" + "=" * 80)
+    if missing:
+        scope = f" in {args.language}" if args.language else ''
+        print(f"❌ {len(missing)} documented variation(s) without code{scope}")
+        return 1
+    print("✅ Every documented variation has code")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
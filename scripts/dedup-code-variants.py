@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Find snippets repeated across code variants and report what sharing saves.
+
+This script splits every language string of every variant in
+storybook/.storybook/blocks/codeVariants.ts into lines, addresses each
+line by its hash, and reports how many bytes storing repeated lines once
+would save, per component and in total.
+
+Usage:
+    python3 scripts/dedup-code-variants.py [--top N] [--json REPORT] [--emit [PATH] [--force]]
+
+With --emit, it also writes codeVariants.dedup.ts: shared fragments plus
+per-variant references, with a getCodeVariants() that reassembles the
+code on lookup (same signature as the one in codeVariants.ts).
+
+Bundles ship gzipped, so --emit refuses (exit 1) when the deduplicated
+payload is not smaller than the raw one after gzip; --force writes it
+anyway.
+"""
+
+import argparse
+import json
+import sys
+
+from code_variants.catalog import load_catalog
+from code_variants.dedup import DEDUP_FILE, FragmentStore
+from code_variants.fileio import atomic_write
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Report and emit deduplicated code variants.')
+    parser.add_argument('--top', type=int, default=10, help='components and fragments to list')
+    parser.add_argument('--json', metavar='REPORT', help='write the full report as JSON')
+    parser.add_argument('--emit', nargs='?', const=str(DEDUP_FILE), metavar='PATH',
+                        help=f'write the deduplicated module (default: {DEDUP_FILE.name})')
+    parser.add_argument('--force', action='store_true',
+                        help='emit even if the module is not smaller gzipped')
+    args = parser.parse_args()
+
+    store = FragmentStore.from_catalog(load_catalog())
+    mismatched = store.verify()
+    if mismatched:
+        print(f"\n❌ Error: {len(mismatched)} variants do not reassemble, e.g. {mismatched[0]}")
+        return 1
+
+    report = store.report()
+    raw, dedup = report['raw_bytes'], report['dedup_bytes']
+    print(f"\n📦 {report['variants']} variants, {report['fragments']} shared fragments")
+    print(f"   Raw payload:          {raw:>12,} bytes")
+    print(f"   Deduplicated payload: {dedup:>12,} bytes")
+    print(f"   Saved:                {raw - dedup:>12,} bytes ({(raw - dedup) / raw * 100:.1f}%)")
+    raw_gzip, dedup_gzip = report['raw_gzip_bytes'], report['dedup_gzip_bytes']
+    print(f"   Gzipped:              {raw_gzip:>12,} -> {dedup_gzip:,} bytes")
+    gzip_wins = dedup_gzip < raw_gzip
+    if not gzip_wins:
+        print(f"   ⚠️  Gzipped payload grows by {dedup_gzip - raw_gzip:,} bytes "
+              f"({(dedup_gzip - raw_gzip) / raw_gzip * 100:+.1f}%): "
+              f"gzip already removes the repeated lines")
+
+    components = sorted(report['components'].items(), key=lambda item: item[1]['saved_bytes'],
+                        reverse=True)
+    print(f"\n🏆 Top {args.top} components by bytes saved:")
+    for export_name, sizes in components[:args.top]:
+        share = sizes['saved_bytes'] / sizes['raw_bytes'] * 100 if sizes['raw_bytes'] else 0
+        print(f"   {export_name:<40} {sizes['saved_bytes']:>10,} / {sizes['raw_bytes']:>10,} ({share:.0f}%)")
+
+    print(f"\n🔁 Top {args.top} shared fragments:")
+    for fragment in report['top_fragments'][:args.top]:
+        print(f"   {fragment['uses']:>4}× {fragment['bytes']:>6,} bytes  {fragment['preview']}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n📄 Report saved to: {args.json}")
+
+    if args.emit:
+        if not gzip_wins and not args.force:
+            print(f"\n❌ Not writing {args.emit}: the gzipped payload is not smaller than the raw one")
+            print("   Pass --force to write it anyway")
+            return 1
+        atomic_write(args.emit, store.render_module().encode())
+        print(f"\n✅ Wrote {args.emit}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Remove code variants that no story can reach from codeVariants.ts.
+
+Builds the set of reachable variants from every getCodeVariants() call and
+<MultiLanguageCode> element under storybook/stories, then removes the
+unreachable variants, and the examples objects with nothing reachable
+together with their getCodeVariants() mapping entries, in one atomic
+write. See scripts/code_variants/gc.py for what pins a variant.
+
+Usage:
+    python3 scripts/gc-code-variants.py [--dry-run] [--keep COMPONENT[/VARIANT] ...]
+                                        [--file PATH] [--json REPORT]
+
+Options:
+    --dry-run  Report what would be removed and the bytes reclaimed
+    --keep     Never remove this component (or one of its variants); repeatable
+    --file     codeVariants.ts to collect (default: storybook/.storybook/blocks/codeVariants.ts)
+    --json     Write the report as JSON
+
+The write is journaled: `python3 scripts/code-variants-journal.py undo`
+restores everything it removed.
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from code_variants.catalog import CatalogError, load_catalog
+from code_variants.gc import collect
+from code_variants.paths import REPO_ROOT, VARIANTS_FILE
+
+
+def _kb(size):
+    return f"{size / 1024:,.1f} KB"
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Remove unreachable code variants.')
+    parser.add_argument('--dry-run', action='store_true', help='report without writing')
+    parser.add_argument('--keep', action='append', default=[], metavar='COMPONENT[/VARIANT]',
+                        help='never remove this component or variant')
+    parser.add_argument('--file', default=str(VARIANTS_FILE), help='codeVariants.ts to collect')
+    parser.add_argument('--json', metavar='REPORT', help='write the report as JSON')
+    args = parser.parse_args()
+
+    catalog = load_catalog(args.file)
+    size = catalog.stamp['size']
+    result = collect(catalog, keep=args.keep)
+
+    print("=" * 80)
+    print("🧹 CODE VARIANT GARBAGE COLLECTION" + (" (dry run)" if args.dry_run else ""))
+    print("=" * 80)
+    print(f"References scanned: {len(result.references)}")
+
+    if result.dynamic:
+        print(f"\n❌ {len(result.dynamic)} call(s) with a non-literal component key could reach "
+              f"any variant; nothing removed:")
+        for ref in result.dynamic:
+            print(f"   {os.path.relpath(ref.file, REPO_ROOT)}:{ref.line}")
+        return 1
+
+    if result.pinned:
+        print(f"\n📌 Kept whole ({len(result.pinned)}):")
+        for name, reason in sorted(result.pinned.items()):
+            print(f"   {name:<36} {reason}")
+
+    by_export = {}
+    for item in result.garbage:
+        by_export.setdefault(item.export, []).append(item)
+    if by_export:
+        print("\n🗑️  Unreachable:")
+    for name, items in by_export.items():
+        keys = ', '.join(items[0].component_keys) or 'not in the mapping table'
+        if items[0].variant is None:
+            print(f"   {name} ({keys}): whole object, {_kb(items[0].size)}")
+            continue
+        print(f"   {name} ({keys}): {len(items)} variant(s), {_kb(sum(i.size for i in items))}")
+        for item in items:
+            print(f"      - {item.variant:<34} {_kb(item.size):>10}")
+
+    reclaimed = sum(item.size for item in result.garbage)
+    objects = sum(1 for item in result.garbage if item.variant is None)
+    variants = len(result.garbage) - objects
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'file': args.file, 'bytes': size, 'reclaimed': reclaimed,
+                       'garbage': [item._asdict() for item in result.garbage],
+                       'pinned': result.pinned}, f, indent=2)
+        print(f"\n💾 Report saved to: {args.json}")
+
+    print("\n" + "=" * 80)
+    if not result.garbage:
+        print("✅ Every variant is reachable")
+        return 0
+    summary = (f"{objects} examples object(s) and {variants} variant(s), "
+               f"{_kb(reclaimed)} of {_kb(size)} ({reclaimed / size * 100:.1f}%)")
+    if args.dry_run:
+        print(f"📝 Would remove {summary}")
+        return 0
+
+    try:
+        catalog.apply_edits(result.edits)
+    except CatalogError as e:
+        print(f"❌ Nothing written: {e}")
+        return 1
+    print(f"✅ Removed {summary} from {os.path.relpath(catalog.path, REPO_ROOT)}")
+    print("   Undo with: python3 scripts/code-variants-journal.py undo")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
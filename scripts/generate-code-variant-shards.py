@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Split codeVariants.ts into per-component, lazily imported modules.
+
+This script reads storybook/.storybook/blocks/codeVariants.ts and writes
+storybook/.storybook/blocks/codeVariants.shards/:
+
+- one `<componentKey>.ts` module per entry of the getCodeVariants() table
+- `index.ts` with an async, import()-based getCodeVariants()
+- `MultiLanguageCode.tsx`, which suspends while its shard loads
+
+Usage:
+    python3 scripts/generate-code-variant-shards.py [--out DIR]
+
+Stories that switch to the shard index only pay for the component being
+viewed instead of the whole ~2 MB variants module.
+"""
+
+import argparse
+import sys
+
+from code_variants.catalog import load_catalog
+from code_variants.shards import SHARDS_DIR, write_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate per-component code variant modules.')
+    parser.add_argument('--out', default=str(SHARDS_DIR), help='output directory')
+    args = parser.parse_args()
+
+    catalog = load_catalog()
+    report = write_shards(catalog, args.out)
+
+    shard_count = len(catalog.mapping)
+    print(f"\n🧩 Generated {shard_count} component shards in {args.out}")
+    print(f"   ✍️  written:   {len(report['written'])}")
+    print(f"   ✓  unchanged: {len(report['unchanged'])}")
+    if report['removed']:
+        print(f"   🗑️  removed:   {len(report['removed'])} ({', '.join(report['removed'])})")
+
+    unmapped = sorted(set(catalog.exports) - set(catalog.mapping.values()))
+    if unmapped:
+        print(f"\n⚠️  Not in the getCodeVariants() table, so not sharded: {', '.join(unmapped)}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
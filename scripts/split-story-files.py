@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""
+Split oversized .stories.tsx files into smaller files with pruned imports.
+
+Story files over the budget in storybook/PERFORMANCE_SOLUTIONS.md (20 KB,
+10-15 imported components) slow Vite's transform step down and were
+disabled by hand. This script analyzes every story file, works out which
+imports each story actually uses, and plans how to bring each
+over-budget file back within the budget:
+
+- prune  drop unused imports in place (enough for files just over)
+- split  move the meta into <Name>.meta.tsx and the stories into
+         <Name>.<FirstStory>.stories.tsx parts, each titled
+         '<title>/<First Story>' and importing only what it uses
+
+Without --write it only reports the plan. No story is lost: every plan is
+checked before anything is written (see code_variants/splitter.py).
+
+Usage:
+    python3 scripts/split-story-files.py [PATH ...] [--write] [--include-disabled]
+                                         [--max-bytes N] [--max-components N] [--json REPORT]
+
+Options:
+    PATH                Story files or directories (default: storybook/stories)
+    --write             Write the planned files and remove the originals
+    --include-disabled  Also plan *.stories.tsx.disabled files; their parts are
+                        written enabled
+    --max-bytes         Byte budget per story file (default: 20000)
+    --max-components    Imported components per story file (default: 15)
+    --json              Write the plans as JSON
+
+Exit code is 1 when a file is over budget and --write was not given, or
+when a file could not be planned.
+
+Example:
+    python3 scripts/split-story-files.py storybook/stories/guides --write
+    python3 scripts/verify-code-variants.py
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from code_variants import lexer
+from code_variants.fileio import atomic_write
+from code_variants.paths import REPO_ROOT, STORIES_DIR
+from code_variants.splitter import (MAX_BYTES, MAX_COMPONENTS, SplitError, analyze_story_file,
+                                    plan_split)
+
+ACTION_ICONS = {'prune': '✂️ ', 'split': '🪓', 'over-budget': '⚠️ '}
+
+
+def find_candidates(paths, include_disabled=False):
+    """Story files under `paths` (files are taken as given), sorted."""
+    suffixes = ('.stories.tsx', '.stories.tsx.disabled') if include_disabled else ('.stories.tsx',)
+    found = []
+    for path in paths:
+        if os.path.isfile(path):
+            found.append(os.path.abspath(path))
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = [d for d in dirs if d != 'node_modules' and not d.startswith('.')]
+            found.extend(os.path.join(root, name) for name in files if name.endswith(suffixes))
+    return sorted(found)
+
+
+def write_plan(plan):
+    """Write a plan's outputs, then remove the files it replaces."""
+    for path in plan.outputs:
+        if os.path.exists(path) and path not in plan.removes and path != plan.path:
+            raise SplitError(f"{_relative(path)} already exists")
+    for path, text in plan.outputs.items():
+        atomic_write(path, text.encode())
+    for path in plan.removes:
+        if path not in plan.outputs:
+            os.unlink(path)
+
+
+def _relative(path):
+    return os.path.relpath(path, REPO_ROOT)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Split oversized story files within a budget.')
+    parser.add_argument('paths', nargs='*', default=[str(STORIES_DIR)],
+                        help='story files or directories (default: storybook/stories)')
+    parser.add_argument('--write', action='store_true', help='write the planned files')
+    parser.add_argument('--include-disabled', action='store_true',
+                        help='also plan *.stories.tsx.disabled files')
+    parser.add_argument('--max-bytes', type=int, default=MAX_BYTES, help='byte budget per file')
+    parser.add_argument('--max-components', type=int, default=MAX_COMPONENTS,
+                        help='imported components per file')
+    parser.add_argument('--json', metavar='REPORT', help='write the plans as JSON')
+    args = parser.parse_args()
+
+    files = find_candidates(args.paths, args.include_disabled)
+    print("=" * 80)
+    print(f"📏 STORY FILE BUDGET: {args.max_bytes:,} bytes, {args.max_components} components "
+          f"({len(files)} files)")
+    print("=" * 80)
+
+    plans = []
+    failures = []
+    for path in files:
+        try:
+            plan = plan_split(analyze_story_file(path), args.max_bytes, args.max_components)
+        except (lexer.LexError, SplitError) as e:
+            failures.append((path, str(e)))
+            print(f"\n❌ {_relative(path)}: {e}")
+            continue
+        if plan.action == 'ok':
+            continue
+        plans.append(plan)
+        print(f"\n{ACTION_ICONS[plan.action]} {plan.action:<11} {_relative(path)} "
+              f"({plan.size / 1024:.1f} KB, {plan.components} components)")
+        if plan.reason:
+            print(f"   {plan.reason}")
+        for part in plan.parts:
+            over = part.size > args.max_bytes or part.components > args.max_components
+            print(f"   {'⚠️ ' if over else '✅'} {os.path.basename(part.path):<60} "
+                  f"{part.size / 1024:>5.1f} KB {part.components:>3} components "
+                  f"{len(part.stories):>3} stories")
+        if args.write and plan.outputs:
+            try:
+                write_plan(plan)
+            except (OSError, SplitError) as e:
+                failures.append((path, str(e)))
+                print(f"   ❌ Not written: {e}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump([{'file': _relative(plan.path), 'action': plan.action, 'bytes': plan.size,
+                        'components': plan.components, 'reason': plan.reason,
+                        'parts': [{'file': _relative(part.path), 'title': part.title,
+                                   'stories': part.stories, 'bytes': part.size,
+                                   'components': part.components} for part in plan.parts]}
+                       for plan in plans], f, indent=2)
+        print(f"\n💾 Report saved to: {args.json}")
+
+    counts = {}
+    for plan in plans:
+        counts[plan.action] = counts.get(plan.action, 0) + 1
+    summary = ', '.join(f"{count} {action}" for action, count in sorted(counts.items()))
+    print("\n" + "=" * 80)
+    if not plans and not failures:
+        print("✅ Every story file is within budget")
+        return 0
+    verb = 'Applied' if args.write else 'Planned'
+    print(f"{'✅' if args.write and not failures else '📝'} {verb}: {summary or 'nothing'}"
+          + (f", {len(failures)} failed" if failures else ''))
+    if not args.write:
+        print("   Run again with --write to apply, then verify-code-variants.py")
+    return 1 if failures or not args.write else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
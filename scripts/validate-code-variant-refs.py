@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Validate story getCodeVariants() calls against codeVariants.ts.
+
+verify-code-variants.py only checks that a story calls getCodeVariants();
+this script checks that each call's component key and example actually
+exist, so no story silently renders the "not yet available" fallback.
+
+Usage:
+    python3 scripts/validate-code-variant-refs.py [--unused] [--stories] [--json REPORT]
+
+Options:
+    --unused    List every defined variant that no story refers to
+    --stories   List stories whose call does not name the variant matching
+                the story (e.g. WithError using 'default')
+    --json      Write the full report (every call site and story) as JSON
+
+Exit code is 1 when any call is dangling (unknown component or example).
+"""
+
+import argparse
+import json
+import sys
+import time
+
+from code_variants.catalog import load_catalog
+from code_variants.coverage import find_story_files
+from code_variants.paths import REPO_ROOT, STORIES_DIR
+from code_variants.xref import DYNAMIC, UNKNOWN_COMPONENT, UNKNOWN_EXAMPLE, cross_reference
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Cross-reference getCodeVariants() calls.')
+    parser.add_argument('--unused', action='store_true', help='list unused variants')
+    parser.add_argument('--stories', action='store_true', help='list non-exact story matches')
+    parser.add_argument('--json', metavar='REPORT', help='write the full report as JSON')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    catalog = load_catalog()
+    report = cross_reference(catalog, find_story_files(STORIES_DIR), REPO_ROOT)
+    elapsed = (time.perf_counter() - start) * 1000
+    totals = report['totals']
+
+    print("=" * 80)
+    print("🔗 CODE VARIANT CROSS-REFERENCE")
+    print("=" * 80)
+    print(f"Story files scanned:        {totals['files']}")
+    print(f"getCodeVariants() calls:    {totals['calls']}")
+    print(f"  resolved:                 {totals['ok']}")
+    print(f"  unknown component:        {totals[UNKNOWN_COMPONENT]}")
+    print(f"  unknown example:          {totals[UNKNOWN_EXAMPLE]}")
+    print(f"  non-literal arguments:    {totals[DYNAMIC]}")
+    print(f"Stories with a call:        {totals['stories']}")
+    print(f"  exact variant:            {totals['exact']}")
+    print(f"  exact variant available:  {totals['exact_available']}")
+    print(f"Defined variants:           {totals['defined']} ({totals['unused']} unused)")
+    print("=" * 80)
+
+    dangling = [call for call in report['calls'] if call['status'] in (UNKNOWN_COMPONENT, UNKNOWN_EXAMPLE)]
+    if dangling:
+        print(f"\n❌ DANGLING REFERENCES ({len(dangling)}):")
+        for call in dangling:
+            where = f"{call['file']}:{call['line']}"
+            what = f"getCodeVariants('{call['component']}', '{call['example']}')"
+            print(f"   {where:<70} {what} [{call['status']}]")
+
+    dynamic = [call for call in report['calls'] if call['status'] == DYNAMIC]
+    if dynamic:
+        print(f"\n⚠️  NON-LITERAL ARGUMENTS ({len(dynamic)}), not checked:")
+        for call in dynamic:
+            print(f"   {call['file']}:{call['line']}")
+
+    if args.stories:
+        candidates = [story for story in report['stories'] if story['exact_available']]
+        print(f"\n🎯 STORIES THAT COULD USE THEIR EXACT VARIANT ({len(candidates)}):")
+        for story in candidates:
+            print(f"   {story['file']}:{story['line']}  {story['story']}: "
+                  f"'{story['example']}' -> '{story['story'][:1].lower() + story['story'][1:]}'")
+
+    if args.unused:
+        print(f"\n🗑️  UNUSED VARIANTS ({totals['unused']}):")
+        for component, examples in sorted(report['unused'].items()):
+            print(f"   {component}: {', '.join(examples)}")
+
+    if report['unmapped']:
+        print(f"\n⚠️  Not in the getCodeVariants() table (unreachable): {', '.join(report['unmapped'])}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report saved to: {args.json}")
+
+    print(f"\n⏱️  Cross-referenced in {elapsed:.0f} ms")
+    if dangling:
+        print(f"❌ VALIDATION FAILED - {len(dangling)} dangling references")
+        return 1
+    print("✅ VALIDATION PASSED - every call resolves")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
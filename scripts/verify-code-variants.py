@@ -6,7 +6,34 @@ This script scans all .stories.tsx files and verifies that every story
 has code variants (either at meta-level or story-level).
 
 Usage:
-    python3 scripts/verify-code-variants.py
+    python3 scripts/verify-code-variants.py [--incremental] [--jobs N] [--daemon] [--profile [TRACE]]
+                                            [--dir NAME ... | --all-dirs]
+    python3 scripts/verify-code-variants.py --shard I/N [--partial PATH] [--incremental] [--jobs N]
+    python3 scripts/verify-code-variants.py --merge PARTIAL [PARTIAL ...]
+
+Options:
+    --dir NAME      Story directory under storybook/stories to check
+                    (repeatable; default: components)
+    --all-dirs      Check components, charts, business-patterns, cin7-dsl
+                    and guides
+    --shard I/N     Parse only shard I of N (files split by a hash of their
+                    repository path, the same on every machine) and write a
+                    compact partial report instead of the full one
+    --partial PATH  Where --shard writes its partial report
+                    (default: code-variants-report.shard-I-of-N.json)
+    --merge         Combine the partial reports of all N shards into the
+                    same summary, report and exit code as a single run
+    --incremental   Reuse parsed results for files whose fingerprint
+                    (mtime, size, hash) is unchanged since the last run;
+                    only changed files are re-parsed
+    --jobs N        Worker processes used to parse changed files
+                    (default: CPU count)
+    --daemon        Get the results from a running code-variants-daemon.py,
+                    which keeps every story parsed in memory (falls back to
+                    a local scan if no daemon is running)
+    --profile       Time every phase and file (read, scan, summarize, ...),
+                    print a sorted summary and write a Chrome trace; files
+                    are parsed in this process so each one is measured
 
 The script will output:
 - Total coverage statistics
@@ -17,109 +44,168 @@ Run this after adding new stories or components to ensure code examples
 are provided for all variants (React, ExtJS, Vanilla JS, TypeScript).
 """
 
+import argparse
 import os
-import re
 import json
-from pathlib import Path
-
-def extract_stories_from_file(file_path):
-    """Extract all story names and their code variant status from a file."""
-    with open(file_path, 'r') as f:
-        content = f.read()
-
-    # Check if file has meta-level code variants
-    meta_section = content.split('export default meta')[0] if 'export default meta' in content else ''
-    meta_has_variants = 'codeVariants: getCodeVariants(' in meta_section
-
-    # Find all story exports
-    story_pattern = r'export const (\w+): Story'
-    stories = re.findall(story_pattern, content)
-
-    # For each story, check if it has code variants
-    story_details = []
-    for i, story in enumerate(stories):
-        # Find the position of this story export
-        story_pos = content.find(f'export const {story}: Story')
-
-        # Find the position of the next story (or end of file)
-        if i + 1 < len(stories):
-            next_story_pos = content.find(f'export const {stories[i+1]}: Story')
-        else:
-            next_story_pos = len(content)
-
-        # Extract just this story's section
-        story_section = content[story_pos:next_story_pos]
-
-        # Check if getCodeVariants appears anywhere in this story's section
-        has_story_level_variants = 'getCodeVariants(' in story_section
-
-        story_details.append({
-            'name': story,
-            'has_variants': meta_has_variants or has_story_level_variants,
-            'level': 'meta' if meta_has_variants and not has_story_level_variants else ('story' if has_story_level_variants else 'none')
-        })
 
-    return story_details, meta_has_variants
+from code_variants import tracing
+from code_variants.coverage import (STORY_DIRS, extract_stories_from_file, find_story_files,
+                                    merge_partials, partial_report, select_shard, summarize)
+from code_variants.filecache import FileCache
+
+# Bump when extract_stories_from_file() output changes
+STORY_CACHE_VERSION = 2
+
+def _parse_story_file(file_path):
+    story_details, meta_has_variants = extract_stories_from_file(file_path)
+    return [story_details, meta_has_variants]
+
+def parse_story_files(file_paths, incremental=False, jobs=None):
+    """
+    Parse story files, reusing cached results for unchanged files.
+
+    Args:
+        file_paths: Paths of the .stories.tsx files to parse
+        incremental: Use the on-disk fingerprint cache
+        jobs: Worker processes for cache misses (None = CPU count)
+
+    Returns:
+        Dict mapping file path to (story_details, meta_has_variants)
+    """
+    cache = FileCache('verify-stories', STORY_CACHE_VERSION) if incremental else None
+    results = {}
+    misses = []
+    for file_path in file_paths:
+        hit, value = cache.get(file_path) if cache else (False, None)
+        if hit:
+            results[file_path] = value
+        else:
+            misses.append(file_path)
+
+    if len(misses) > 1 and jobs != 1 and not tracing.enabled():
+        # Imported lazily: a warm incremental run never needs a pool
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            parsed = pool.map(_parse_story_file, misses, chunksize=max(1, len(misses) // 32))
+            results.update(zip(misses, parsed))
+    else:
+        results.update((file_path, _parse_story_file(file_path)) for file_path in misses)
+
+    if cache:
+        for file_path in misses:
+            cache.put(file_path, results[file_path])
+        # A shard or a --dir run sees only some files; keep the others' entries
+        scanned = set(file_paths)
+        cache.prune([path for path in cache.entries if path in scanned or os.path.exists(path)])
+        cache.save()
+    return results
+
+def find_stories(base_path, dirs):
+    """Every .stories.tsx path in the given storybook/stories directories."""
+    all_files = []
+    for name in dirs:
+        all_files.extend(find_story_files(os.path.join(base_path, 'storybook/stories', name)))
+    return all_files
 
-def scan_storybook_directory(base_path):
+def scan_storybook_directory(base_path, incremental=False, jobs=None, dirs=('components',)):
     """Scan all .stories.tsx files and collect statistics."""
-    stories_dir = os.path.join(base_path, 'storybook/stories/components')
-
-    all_files = []
-    for root, dirs, files in os.walk(stories_dir):
-        for file in files:
-            if file.endswith('.stories.tsx'):
-                all_files.append(os.path.join(root, file))
-
-    total_stories = 0
-    stories_with_variants = 0
-    stories_without_variants = []
-    files_summary = []
-
-    for file_path in sorted(all_files):
-        rel_path = os.path.relpath(file_path, base_path)
-        story_details, meta_has_variants = extract_stories_from_file(file_path)
-
-        file_total = len(story_details)
-        file_with_variants = sum(1 for s in story_details if s['has_variants'])
-        file_without_variants = [s['name'] for s in story_details if not s['has_variants']]
-
-        total_stories += file_total
-        stories_with_variants += file_with_variants
-
-        if file_without_variants:
-            stories_without_variants.append({
-                'file': rel_path,
-                'stories': file_without_variants
-            })
-
-        files_summary.append({
-            'file': rel_path,
-            'total': file_total,
-            'with_variants': file_with_variants,
-            'without_variants': len(file_without_variants),
-            'meta_level': meta_has_variants,
-            'coverage': f"{(file_with_variants/file_total*100):.1f}%" if file_total > 0 else "0%"
-        })
-
-    return {
-        'total_files': len(all_files),
-        'total_stories': total_stories,
-        'stories_with_variants': stories_with_variants,
-        'stories_without_variants': total_stories - stories_with_variants,
-        'missing_details': stories_without_variants,
-        'files_summary': files_summary,
-    }
+    all_files = find_stories(base_path, dirs)
+    parsed = parse_story_files(all_files, incremental, jobs)
+    with tracing.phase('summarize'):
+        return summarize(parsed, base_path)
+
+def parse_shard_spec(value):
+    """argparse type for --shard: 'I/N' -> (I, N) with 1 <= I <= N."""
+    try:
+        index, count = (int(part) for part in value.split('/'))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected I/N, got {value!r}")
+    if not 1 <= index <= count:
+        raise argparse.ArgumentTypeError(f"shard {value} is not between 1/{count} and {count}/{count}")
+    return index, count
+
+def run_shard(base_path, shard, dirs, partial_file, incremental=False, jobs=None):
+    """Parse one shard's story files and write its partial report."""
+    index, count = shard
+    files = select_shard(find_stories(base_path, dirs), base_path, index, count)
+    parsed = parse_story_files(files, incremental, jobs)
+    partial_file = partial_file or os.path.join(base_path, f'code-variants-report.shard-{index}-of-{count}.json')
+    with tracing.phase('write-report') as span, open(partial_file, 'w') as f:
+        json.dump(partial_report(parsed, base_path, shard, dirs), f, separators=(',', ':'))
+        span['bytes'] = f.tell()
+
+    results = summarize(parsed, base_path)
+    print("=" * 80)
+    print(f"📦 SHARD {index}/{count}: {', '.join(dirs)}")
+    print("=" * 80)
+    print(f"Files scanned:              {results['total_files']}")
+    print(f"Stories found:              {results['total_stories']}")
+    print(f"Stories WITHOUT variants:   {results['stories_without_variants']}")
+    print(f"\n💾 Partial report saved to: {partial_file}")
+    print("   Combine all shards with: python3 scripts/verify-code-variants.py --merge <partials>")
+    return 0
+
+def load_partials(paths, base_path):
+    """Read partial reports and merge them into parsed results."""
+    partials = []
+    for path in paths:
+        with open(path) as f:
+            partials.append(json.load(f))
+    return merge_partials(partials, base_path), partials[0]['dirs']
 
 def main():
+    parser = argparse.ArgumentParser(description='Verify Storybook code variant coverage.')
+    parser.add_argument('--incremental', action='store_true',
+                        help='only re-parse story files that changed since the last run')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='worker processes for parsing (default: CPU count)')
+    parser.add_argument('--daemon', action='store_true',
+                        help='ask a running code-variants-daemon.py instead of parsing')
+    parser.add_argument('--dir', action='append', choices=STORY_DIRS, dest='dirs', metavar='NAME',
+                        help=f"story directory to check, repeatable ({', '.join(STORY_DIRS)}; default: components)")
+    parser.add_argument('--all-dirs', action='store_true', help='check every story directory')
+    parser.add_argument('--shard', type=parse_shard_spec, metavar='I/N',
+                        help='parse only shard I of N and write a partial report')
+    parser.add_argument('--partial', metavar='PATH', help='where --shard writes its partial report')
+    parser.add_argument('--merge', nargs='+', metavar='PARTIAL',
+                        help='combine the partial reports of every shard')
+    tracing.add_profile_argument(parser)
+    args = parser.parse_args()
+    if args.shard and (args.merge or args.daemon):
+        parser.error('--shard cannot be combined with --merge or --daemon')
+    if args.merge and (args.dirs or args.all_dirs):
+        parser.error('--merge takes the directories from the partial reports')
+    dirs = list(STORY_DIRS) if args.all_dirs else args.dirs or ['components']
+    if args.profile is not None:
+        tracing.enable('verify-code-variants', args.profile or None)
+
     # Get base path relative to this script
     script_dir = os.path.dirname(os.path.abspath(__file__))
     base_path = os.path.dirname(script_dir)
 
     print("🔍 Verifying Storybook code variant coverage...\n")
 
+    if args.shard:
+        return run_shard(base_path, args.shard, dirs, args.partial, args.incremental, args.jobs)
+
     # Scan all stories
-    results = scan_storybook_directory(base_path)
+    results = None
+    if args.merge:
+        try:
+            parsed, dirs = load_partials(args.merge, base_path)
+        except (OSError, ValueError, KeyError) as e:
+            print(f"❌ Cannot merge partial reports: {e}")
+            return 2
+        print(f"🧩 Merged {len(args.merge)} partial report(s): {', '.join(dirs)}\n")
+        results = summarize(parsed, base_path)
+    elif args.daemon:
+        from code_variants.daemon import DaemonUnavailable, request
+        try:
+            results = request('coverage', dirs=[f'storybook/stories/{name}' for name in dirs])
+        except DaemonUnavailable as e:
+            print(f"⚠️  {e}; scanning locally\n")
+    if results is None:
+        results = scan_storybook_directory(base_path, args.incremental, args.jobs, dirs)
 
     # Print summary
     print("=" * 80)
@@ -158,8 +244,9 @@ def main():
 
     # Save detailed results to JSON
     output_file = os.path.join(base_path, 'code-variants-report.json')
-    with open(output_file, 'w') as f:
+    with tracing.phase('write-report') as span, open(output_file, 'w') as f:
         json.dump(results, f, indent=2)
+        span['bytes'] = f.tell()
     print(f"\n💾 Detailed report saved to: {output_file}")
 
     # Final verdict
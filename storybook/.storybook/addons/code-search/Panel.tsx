@@ -0,0 +1,186 @@
+import React, { useEffect, useMemo, useState } from 'react';
+import { AddonPanel } from '@storybook/components';
+import { styled } from '@storybook/theming';
+import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
+import { vscDarkPlus } from 'react-syntax-highlighter/dist/esm/styles/prism';
+import { Language, SearchHit, SearchIndex, loadSearchIndex, search } from './searchIndex';
+
+const Layout = styled.div({
+  display: 'flex',
+  flexDirection: 'column',
+  height: '100%',
+  fontFamily: 'system-ui, -apple-system, sans-serif',
+  fontSize: '13px',
+});
+
+const Toolbar = styled.div({
+  display: 'flex',
+  gap: '8px',
+  padding: '8px 12px',
+  borderBottom: '1px solid rgba(0, 0, 0, 0.1)',
+});
+
+const QueryInput = styled.input({
+  flex: 1,
+  padding: '6px 10px',
+  border: '1px solid rgba(0, 0, 0, 0.2)',
+  borderRadius: '4px',
+  fontFamily: "'Monaco', 'Menlo', 'Ubuntu Mono', monospace",
+  fontSize: '13px',
+});
+
+const Body = styled.div({
+  display: 'flex',
+  flex: 1,
+  minHeight: 0,
+});
+
+const Results = styled.ul({
+  width: '320px',
+  margin: 0,
+  padding: 0,
+  listStyle: 'none',
+  overflow: 'auto',
+  borderRight: '1px solid rgba(0, 0, 0, 0.1)',
+});
+
+const Result = styled.li<{ selected: boolean }>(({ selected }) => ({
+  padding: '6px 12px',
+  cursor: 'pointer',
+  background: selected ? 'rgba(30, 167, 253, 0.12)' : 'transparent',
+  '&:hover': {
+    background: 'rgba(30, 167, 253, 0.08)',
+  },
+}));
+
+const Status = styled.div({
+  padding: '12px',
+  color: '#666',
+});
+
+const languageLabels: Record<Language, string> = {
+  react: 'React',
+  vanilla: 'Vanilla JS',
+  extjs: 'ExtJS',
+  typescript: 'TypeScript',
+};
+
+const highlighterLanguages: Record<Language, string> = {
+  react: 'jsx',
+  vanilla: 'javascript',
+  extjs: 'javascript',
+  typescript: 'typescript',
+};
+
+// Component code comes from the content-hashed assets (scripts/build-code-variant-assets.py)
+const assetsUrl = new URL('code-variants/', document.baseURI);
+let manifest: Promise<{ components: Record<string, { url: string }> }> | null = null;
+
+async function loadCode(hit: SearchHit): Promise<string> {
+  if (!manifest) {
+    manifest = fetch(new URL('manifest.json', assetsUrl)).then((response) => {
+      if (!response.ok) {
+        throw new Error('Code assets not built; run scripts/build-code-variant-assets.py');
+      }
+      return response.json();
+    });
+    manifest.catch(() => {
+      manifest = null;
+    });
+  }
+  const entry = (await manifest).components[hit.component];
+  const response = await fetch(new URL(entry.url, assetsUrl));
+  const examples = await response.json();
+  return examples[hit.example][hit.language];
+}
+
+interface SearchPanelProps {
+  active: boolean;
+}
+
+export const SearchPanel: React.FC<SearchPanelProps> = ({ active }) => {
+  const [index, setIndex] = useState<SearchIndex | null>(null);
+  const [error, setError] = useState<string | null>(null);
+  const [query, setQuery] = useState('');
+  const [language, setLanguage] = useState<Language | ''>('');
+  const [selected, setSelected] = useState<SearchHit | null>(null);
+  const [code, setCode] = useState<string | null>(null);
+
+  // The index is only fetched once the panel has been opened
+  useEffect(() => {
+    if (active && !index) {
+      loadSearchIndex().then(setIndex, (e: Error) => setError(e.message));
+    }
+  }, [active, index]);
+
+  const hits = useMemo(
+    () => (index ? search(index, query, language || null) : []),
+    [index, query, language]
+  );
+
+  useEffect(() => {
+    setCode(null);
+    if (selected) {
+      loadCode(selected).then(setCode, (e: Error) => setCode(`// ${e.message}`));
+    }
+  }, [selected]);
+
+  if (!active) {
+    return null;
+  }
+
+  return (
+    <AddonPanel active={active}>
+      <Layout>
+        <Toolbar>
+          <QueryInput
+            placeholder="Search code examples, e.g. Ext.create button, onAction"
+            value={query}
+            onChange={(event) => setQuery(event.target.value)}
+          />
+          <select value={language} onChange={(event) => setLanguage(event.target.value as Language | '')}>
+            <option value="">All languages</option>
+            {(Object.keys(languageLabels) as Language[]).map((key) => (
+              <option key={key} value={key}>
+                {languageLabels[key]}
+              </option>
+            ))}
+          </select>
+        </Toolbar>
+        {error ? (
+          <Status>{error}</Status>
+        ) : !index ? (
+          <Status>Loading search index…</Status>
+        ) : (
+          <Body>
+            <Results>
+              {query && !hits.length && <Status>No matches</Status>}
+              {hits.map((hit) => (
+                <Result
+                  key={`${hit.component}/${hit.example}/${hit.language}`}
+                  selected={selected === hit}
+                  onClick={() => setSelected(hit)}
+                >
+                  <strong>{hit.component}</strong> / {hit.example}
+                  <span style={{ float: 'right', color: '#999' }}>{languageLabels[hit.language]}</span>
+                </Result>
+              ))}
+            </Results>
+            <div style={{ flex: 1, overflow: 'auto' }}>
+              {selected && code !== null && (
+                <SyntaxHighlighter
+                  language={highlighterLanguages[selected.language]}
+                  style={vscDarkPlus}
+                  customStyle={{ margin: 0, padding: '16px', minHeight: '100%', fontSize: '13px' }}
+                  showLineNumbers
+                >
+                  {code}
+                </SyntaxHighlighter>
+              )}
+            </div>
+          </Body>
+        )}
+      </Layout>
+    </AddonPanel>
+  );
+};
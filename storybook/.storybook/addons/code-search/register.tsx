@@ -0,0 +1,14 @@
+import React from 'react';
+import { addons, types } from '@storybook/manager-api';
+import { SearchPanel } from './Panel';
+
+const ADDON_ID = 'cin7/code-search';
+
+// Register the addon
+addons.register(ADDON_ID, () => {
+  addons.add(`${ADDON_ID}/panel`, {
+    type: types.PANEL,
+    title: 'Code Search',
+    render: ({ active }) => <SearchPanel active={!!active} />,
+  });
+});
@@ -0,0 +1,147 @@
+// Query side of the code example search index.
+// The index is built by scripts/build-code-variant-search.py; the tokenizing
+// and ranking rules here must match scripts/code_variants/search.py.
+
+export type Language = 'react' | 'vanilla' | 'extjs' | 'typescript';
+
+export interface SearchIndex {
+  version: number;
+  languages: Language[];
+  components: string[];
+  // [component index, example key]; doc id = example * languages.length + language
+  examples: [number, string][];
+  terms: string[];
+  // Delta-encoded doc ids, parallel to terms
+  postings: number[][];
+}
+
+export interface SearchHit {
+  component: string;
+  example: string;
+  language: Language;
+  // Query terms that matched a whole indexed term rather than a prefix
+  score: number;
+}
+
+const INDEX_VERSION = 1;
+const MAX_TERM_LENGTH = 48;
+
+// Served from storybook/public/code-variants (main.ts staticDirs)
+const indexUrl = new URL('code-variants/search-index.json', document.baseURI);
+
+let loading: Promise<SearchIndex> | null = null;
+
+// Fetch (once) the index; nothing is downloaded until the panel is opened
+export function loadSearchIndex(): Promise<SearchIndex> {
+  if (!loading) {
+    loading = fetch(indexUrl).then(async (response) => {
+      if (!response.ok) {
+        throw new Error(`Search index not found (${response.status}); run pnpm generate:code-variants`);
+      }
+      const index = (await response.json()) as SearchIndex;
+      if (index.version !== INDEX_VERSION) {
+        throw new Error(`Search index version ${index.version}, expected ${INDEX_VERSION}`);
+      }
+      return index;
+    });
+    loading.catch(() => {
+      loading = null;
+    });
+  }
+  return loading;
+}
+
+const CHAIN = /[A-Za-z_$][\w$]*(?:\s*\??\.\s*[A-Za-z_$][\w$]*)*/g;
+const DOT = /\s*\??\.\s*/;
+
+// Each identifier or dotted chain of the query, lowercased
+export function queryTerms(query: string): string[] {
+  const terms: string[] = [];
+  for (const match of query.matchAll(CHAIN)) {
+    const term = match[0].split(DOT).join('.').toLowerCase().slice(0, MAX_TERM_LENGTH);
+    if (term.length > 1 && !terms.includes(term)) {
+      terms.push(term);
+    }
+  }
+  return terms;
+}
+
+function lowerBound(terms: string[], term: string): number {
+  let lo = 0;
+  let hi = terms.length;
+  while (lo < hi) {
+    const mid = (lo + hi) >> 1;
+    if (terms[mid] < term) {
+      lo = mid + 1;
+    } else {
+      hi = mid;
+    }
+  }
+  return lo;
+}
+
+// doc id -> 2 when the term matched whole, 1 for a prefix match only
+function matches(index: SearchIndex, term: string): Map<number, number> {
+  const found = new Map<number, number>();
+  for (let i = lowerBound(index.terms, term); i < index.terms.length && index.terms[i].startsWith(term); i++) {
+    const exact = index.terms[i] === term ? 2 : 1;
+    let doc = 0;
+    for (const delta of index.postings[i]) {
+      doc += delta;
+      if ((found.get(doc) ?? 0) < exact) {
+        found.set(doc, exact);
+      }
+    }
+  }
+  return found;
+}
+
+// Examples matching every query term, best first
+export function search(
+  index: SearchIndex,
+  query: string,
+  language: Language | null = null,
+  limit = 50
+): SearchHit[] {
+  const terms = queryTerms(query);
+  if (!terms.length) {
+    return [];
+  }
+  const count = index.languages.length;
+  const wanted = language ? index.languages.indexOf(language) : -1;
+
+  let scores: Map<number, number> | null = null;
+  for (const term of terms) {
+    const found = matches(index, term);
+    const next = new Map<number, number>();
+    if (scores === null) {
+      for (const [doc, match] of found) {
+        if (wanted < 0 || doc % count === wanted) {
+          next.set(doc, match - 1);
+        }
+      }
+    } else {
+      for (const [doc, score] of scores) {
+        const match = found.get(doc);
+        if (match) {
+          next.set(doc, score + match - 1);
+        }
+      }
+    }
+    scores = next;
+    if (!scores.size) {
+      return [];
+    }
+  }
+
+  const ranked = [...scores!].sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+  return ranked.slice(0, limit || ranked.length).map(([doc, score]) => {
+    const [component, example] = index.examples[Math.floor(doc / count)];
+    return {
+      component: index.components[component],
+      example,
+      language: index.languages[doc % count],
+      score,
+    };
+  });
+}
@@ -1,11 +1,14 @@
 import { Tab } from '@headlessui/react';
-import { useState } from 'react';
+import { useEffect, useState } from 'react';
 import { Prism as SyntaxHighlighter } from 'react-syntax-highlighter';
 import { tomorrow } from 'react-syntax-highlighter/dist/esm/styles/prism';
 
+// Code text, or a loader for code that is fetched when its tab is opened
+export type CodeSource = string | (() => Promise<string>);
+
 interface CodeTab {
   title: string;
-  code: string;
+  code: CodeSource;
   language?: string;
 }
 
@@ -17,7 +20,8 @@ export function Code({ code }: CodeProps) {
   const [selectedIndex, setSelectedIndex] = useState(0);
   const [copied, setCopied] = useState(false);
 
-  const handleCopy = (text: string) => {
+  const handleCopy = async (source: CodeSource) => {
+    const text = typeof source === 'string' ? source : await source();
     navigator.clipboard.writeText(text);
     setCopied(true);
     setTimeout(() => setCopied(false), 2000);
@@ -150,7 +154,38 @@ export function Code({ code }: CodeProps) {
   );
 }
 
-function HighlightedCode({ code, language }: { code: string; language?: string }) {
+function HighlightedCode({ code: source, language }: { code: CodeSource; language?: string }) {
+  const [loaded, setLoaded] = useState<string | null>(null);
+
+  useEffect(() => {
+    if (typeof source === 'string') {
+      return;
+    }
+    let cancelled = false;
+    setLoaded(null);
+    source().then(
+      (text) => !cancelled && setLoaded(text),
+      (error) => !cancelled && setLoaded(`// ${error.message}`)
+    );
+    return () => {
+      cancelled = true;
+    };
+  }, [source]);
+
+  const code = typeof source === 'string' ? source : loaded;
+  if (code === null) {
+    return (
+      <div style={{
+        padding: '16px',
+        fontFamily: 'var(--font-family-sans)',
+        fontSize: 'var(--font-size-sm, 14px)',
+        color: 'var(--color-gray-600, #4b5563)'
+      }}>
+        Loading code...
+      </div>
+    );
+  }
+
   const lang = language || detectLanguage(code);
 
   return (
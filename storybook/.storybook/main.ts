@@ -23,6 +23,10 @@ const config: StorybookConfig = {
       },
     },
   },
+  // Content-hashed code examples (scripts/build-code-variant-assets.py, run by
+  // the prebuild/predev hooks); served as-is so their names survive the
+  // cache-breaking asset names below
+  staticDirs: [{ from: '../public/code-variants', to: '/code-variants' }],
   docs: {
     autodocs: true,
     // Enhanced docs configuration for Cin7 DSL
@@ -54,6 +58,8 @@ const config: StorybookConfig = {
     // NUCLEAR CACHE BREAKING - Force bundle regeneration
     config.build = {
       ...config.build,
+      // Source maps for scripts/analyze-variant-bundle.py (STORYBOOK_SOURCEMAP=true)
+      sourcemap: process.env.STORYBOOK_SOURCEMAP === 'true' ? true : config.build?.sourcemap,
       // Force new chunk hashes with timestamp
       rollupOptions: {
         ...config.build?.rollupOptions,
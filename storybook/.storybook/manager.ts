@@ -2,3 +2,4 @@
 // This is where custom addons get registered
 
 import './addons/code-panels/register.tsx';
+import './addons/code-search/register.tsx';
@@ -3,12 +3,18 @@
 Script to add Icon component code variants to codeVariants.ts
 This script inserts icon examples between avatarExamples and mediacardExamples
 and adds icon mapping to the examples object.
+
+Pass --profile [TRACE] to time each phase and write a Chrome trace.
 """
 
-import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+from code_variants import tracing
+from code_variants.catalog import CatalogError, load_catalog
 
-# Path to the file
-FILE_PATH = '.storybook/blocks/codeVariants.ts'
+tracing.enable_from_argv('add-icon-variants', sys.argv[1:])
 
 # Icon examples content (split into smaller chunks for readability due to size of code)
 ICON_EXAMPLES_HEADER = """
@@ -16,33 +22,22 @@ ICON_EXAMPLES_HEADER = """
 export const iconExamples: Record<string, CodeVariant> = {
 """
 
-# Read the current file
-print("Reading codeVariants.ts...")
-with open(FILE_PATH, 'r') as f:
-    content = f.read()
+# Load the indexed catalog (parsed once, then served from the on-disk cache)
+print("Loading codeVariants.ts catalog...")
+catalog = load_catalog()
 
 # Check if icon examples already exist
-if 'export const iconExamples' in content:
+if 'iconExamples' in catalog.exports:
     print("Icon examples already exist in the file. Skipping...")
     exit(0)
 
-# Find the insertion point (after avatarExamples closes, before mediacardExamples)
-# Look for the pattern: }`\n  }\n};\n\n// MediaCard Component Examples
-pattern = r'(`\n  }\n};\n\n)(// MediaCard Component Examples\nexport const mediacardExamples)'
-match = re.search(pattern, content)
-
-if not match:
+# The icon block goes right after avatarExamples, before mediacardExamples
+if 'avatarExamples' not in catalog.exports:
     print("ERROR: Could not find insertion point in file")
-    print("Looking for pattern between avatarExamples and mediacardExamples")
-    # Try to show what's around line 15179
-    lines = content.split('\n')
-    if len(lines) > 15179:
-        print("\nLines around 15179:")
-        for i in range(max(0, 15175), min(len(lines), 15185)):
-            print(f"{i+1}: {lines[i][:80]}")
+    print("Looking for avatarExamples, which icon examples are inserted after")
     exit(1)
 
-print(f"Found insertion point at position {match.start()}")
+print(f"Found insertion point at byte {catalog.exports['avatarExamples']['end']}")
 
 # Create icon examples content (abbreviated due to size - we'll use Edit tool after)
 icon_content = ICON_EXAMPLES_HEADER + """  default: {
@@ -121,28 +116,14 @@ export default IconExample;`
 
 """
 
-# Insert the icon examples
-new_content = content[:match.start() + len(match.group(1))] + icon_content + match.group(2) + content[match.end():]
-
-# Now find where to add the icon mapping in the examples object
-# Look for the pattern in getCodeVariants function
-mapping_pattern = r'(avatar: avatarExamples,\n)'
-mapping_match = re.search(mapping_pattern, new_content)
-
-if mapping_match:
-    print(f"Found mapping insertion point at position {mapping_match.start()}")
-    # Insert icon mapping after avatar mapping
-    new_content = (new_content[:mapping_match.end()] +
-                   "    icon: iconExamples,\n" +
-                   new_content[mapping_match.end():])
-    print("Added icon mapping to examples object")
-else:
-    print("WARNING: Could not find mapping insertion point. Manual addition may be needed.")
-
-# Write the updated content
-print("Writing updated file...")
-with open(FILE_PATH, 'w') as f:
-    f.write(new_content)
+# Insert the icon examples and register them after the avatar mapping
+try:
+    catalog.insert_export(icon_content, after='avatarExamples',
+                          component_key='icon', export_name='iconExamples')
+except CatalogError as e:
+    print(f"ERROR: {e}")
+    exit(1)
+print("Added icon mapping to examples object")
 
 print("✓ Successfully added default icon example")
 print("NOTE: Only the 'default' variant was added. You need to add the remaining 7 variants:")
@@ -2,13 +2,21 @@
 """
 Script to add comprehensive code variants for ContextualSaveBar component.
 This script safely inserts new variants into the codeVariants.ts file.
+
+Pass --profile [TRACE] to time each phase and write a Chrome trace.
 """
 
 import os
 import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'scripts'))
+from code_variants import tracing
+from code_variants.catalog import CatalogError, load_catalog
+from code_variants.paths import VARIANTS_FILE
 
 # Path to the codeVariants.ts file
-CODE_VARIANTS_FILE = ".storybook/blocks/codeVariants.ts"
+CODE_VARIANTS_FILE = str(VARIANTS_FILE)
 
 # New variants to add (we'll insert these before the closing brace of contextualsavebarExamples)
 NEW_VARIANTS = """,
@@ -81,7 +89,7 @@ function CustomMessageExample() {
       {isDirty && (
         <div style={{ position: 'absolute', bottom: 0, left: 0, right: 0 }}>
           <ContextualSaveBar
-            message={`Changes to ${changedFields || 'fields'}`}
+            message={\\`Changes to \\${changedFields || 'fields'}\\`}
             saveAction={{
               content: 'Save product',
               onAction: handleSave,
@@ -324,7 +332,7 @@ function CustomMessageExample(): JSX.Element {
       {isDirty && (
         <div style={{ position: 'absolute', bottom: 0, left: 0, right: 0 }}>
           <ContextualSaveBar
-            message={`Changes to ${changedFields || 'fields'}`}
+            message={\\`Changes to \\${changedFields || 'fields'}\\`}
             saveAction={{
               content: 'Save product',
               onAction: handleSave,
@@ -344,33 +352,31 @@ export default CustomMessageExample;`
   }"""
 
 def main():
+    tracing.enable_from_argv('add_contextual_savebar_variants', sys.argv[1:])
+
     # Check if file exists
     if not os.path.exists(CODE_VARIANTS_FILE):
         print(f"Error: {CODE_VARIANTS_FILE} not found!")
         return 1
 
-    # Read the file
-    with open(CODE_VARIANTS_FILE, 'r') as f:
-        content = f.read()
+    # Load the indexed catalog instead of scanning the whole file
+    catalog = load_catalog(CODE_VARIANTS_FILE)
 
-    # Find the insertion point (right before the closing brace of contextualsavebarExamples)
-    # We're looking for the pattern: export default ContextualSaveBarExample;`\n  }\n};
-    search_pattern = "export default ContextualSaveBarExample;`\n  }\n};"
-
-    if search_pattern not in content:
+    if 'contextualsavebarExamples' not in catalog.exports:
         print("Error: Could not find the insertion point!")
-        print("Searching for pattern:", repr(search_pattern))
+        print("Looking for export:", repr('contextualsavebarExamples'))
         return 1
 
-    # Insert the new variants
-    new_content = content.replace(
-        search_pattern,
-        f"export default ContextualSaveBarExample;`\n  }}{NEW_VARIANTS}\n}};"
-    )
+    if catalog.has_variant('contextualsavebar', 'withCustomMessage'):
+        print("⏭️  'withCustomMessage' already exists, nothing to do")
+        return 0
 
-    # Write the updated content
-    with open(CODE_VARIANTS_FILE, 'w') as f:
-        f.write(new_content)
+    # Insert the new variants right before the closing brace of contextualsavebarExamples
+    try:
+        catalog.insert_variants('contextualsavebarExamples', NEW_VARIANTS)
+    except CatalogError as e:
+        print(f"Error: {e}")
+        return 1
 
     print(f"✅ Successfully added 'withCustomMessage' variant to {CODE_VARIANTS_FILE}")
     print("   Total variants for ContextualSaveBar: 2 (default, withCustomMessage)")
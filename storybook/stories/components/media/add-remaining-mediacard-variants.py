@@ -2,12 +2,18 @@
 """
 Script to add remaining MediaCard variants to codeVariants.ts
 This adds 10 more variants after 'sizeVariations'
+
+Pass --profile [TRACE] to time each phase and write a Chrome trace.
 """
 
-import re
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[4] / 'scripts'))
+from code_variants import tracing
+from code_variants.catalog import CatalogError, load_catalog
 
-# Path to the codeVariants.ts file
-file_path = "/Users/karo/Library/Mobile Documents/com~apple~CloudDocs/Github/cin7-design-system-library/storybook/.storybook/blocks/codeVariants.ts"
+tracing.enable_from_argv('add-remaining-mediacard-variants', sys.argv[1:])
 
 # The remaining variants content to insert
 # This should be inserted after the closing of sizeVariations variant and before the closing of mediacardExamples
@@ -116,29 +122,21 @@ const LandscapeModeExample: React.FC = () => {
 export default LandscapeModeExample;`
   }"""
 
-# Read the file
-with open(file_path, 'r', encoding='utf-8') as f:
-    content = f.read()
-
-# Find the pattern to insert after - right after sizeVariations variant closing
-# We're looking for the end of sizeVariations which is:
-# export default SizeVariationsExample;`
-#   }
-# And we want to insert before the closing brace of mediacardExamples
-
-# Find the insertion point
-pattern = r"(export default SizeVariationsExample;`\n  }\n)(};\n\n// Thumbnail Component Examples)"
-replacement = r"\1" + remaining_variants + r"\n\2"
-
-# Replace
-new_content = re.sub(pattern, replacement, content)
+# Load the indexed catalog (parsed once, then served from the on-disk cache)
+catalog = load_catalog()
 
-if new_content == content:
+# The new variants go after sizeVariations, i.e. at the end of mediacardExamples
+if not catalog.has_variant('mediacard', 'sizeVariations'):
     print("ERROR: Pattern not found. File was not modified.")
-    print("Looking for pattern around 'export default SizeVariationsExample'")
+    print("Looking for the 'sizeVariations' variant in mediacardExamples")
+elif catalog.has_variant('mediacard', 'landscape'):
+    print("SKIPPED: 'landscape' variant already exists in mediacardExamples")
 else:
-    # Write back
-    with open(file_path, 'w', encoding='utf-8') as f:
-        f.write(new_content)
+    try:
+        catalog.insert_variants('mediacard', remaining_variants)
+    except CatalogError as e:
+        print(f"ERROR: {e}")
+        print("File was not modified.")
+        sys.exit(1)
     print("SUCCESS: Added landscape variant to codeVariants.ts")
     print("Added 1 variant. 9 more to go.")